@@ -0,0 +1,265 @@
+"""
+Scale benchmark: initial sync and steady-state cycles against the fake API.
+
+    python -m bench.benchmark                       # 1k, 10k, 100k leads
+    python -m bench.benchmark --sizes 1000 --latency 0.02 --engine async
+
+Each size runs in a fresh process (so peak RSS is per size) against one
+fake server process, through the phases:
+
+- initial_sync:   create a card for every lead
+- cycle (cold):   first run_sync_cycle of the process
+- cycle (idle):   nothing changed since the last cycle
+- cycle (churn):  --churn of the leads edited and of the cards moved
+
+For every phase it reports wall time, requests the server saw, bytes
+transferred (both directions, headers included) and the process's peak
+RSS so far.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from bench.fake_server import (
+    BOARD_ID,
+    TODO_LIST_ID,
+    DONE_LIST_ID,
+    add_server_arguments,
+    server_options,
+)
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _admin(server_url, path, payload=None):
+    """
+    Call a fake-server admin endpoint (GET without payload, else POST).
+    """
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(server_url + path, data=data, method="POST" if data else "GET")
+    with urllib.request.urlopen(request, timeout=600) as response:
+        return json.loads(response.read())
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux (bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run(result):
+    if asyncio.iscoroutine(result):
+        return asyncio.run(result)
+    return result
+
+
+def run_phases(server_url, size, engine, churn):
+    """
+    Child process: run every phase and return their measurements.
+
+    Config is read from the environment at import time, so the sync
+    service is only imported here, after the parent has set it up.
+    """
+    from config import Config
+    from logging_config import configure_logging
+    configure_logging(Config.LOG_LEVEL, Config.LOG_FORMAT, Config.LOG_RECORD_SAMPLE_EVERY)
+
+    if engine == "async":
+        from services.async_sync_service import AsyncSyncService
+        service = AsyncSyncService()
+    else:
+        from services.sync_service import SyncService
+        service = SyncService()
+
+    changed = max(1, int(size * churn))
+    phases = [
+        ("initial_sync", service.initial_sync, None),
+        ("cycle (cold)", service.run_sync_cycle, None),
+        ("cycle (idle)", service.run_sync_cycle, None),
+        ("cycle (churn)", service.run_sync_cycle, {"records": changed, "cards": changed}),
+    ]
+
+    results = []
+    for name, step, mutation in phases:
+        if mutation:
+            _admin(server_url, "/_mutate", mutation)
+        _admin(server_url, "/_stats/reset", {})
+
+        started = time.perf_counter()
+        _run(step())
+        wall = time.perf_counter() - started
+
+        stats = _admin(server_url, "/_stats")
+        results.append({
+            "size": size,
+            "phase": name,
+            "wall_seconds": round(wall, 3),
+            "requests": stats["requests"],
+            "throttled": stats["throttled"],
+            "faults": stats["faults"],
+            "bytes_sent": stats["bytes_received"],
+            "bytes_received": stats["bytes_sent"],
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+        })
+    return results
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(args):
+    port = _free_port()
+    command = [sys.executable, "-m", "bench.fake_server", "--port", str(port), "--leads", "0"]
+    for option, value in server_options(args).items():
+        command += [f"--{option.replace('_', '-')}", str(value)]
+
+    process = subprocess.Popen(command, cwd=REPO_ROOT, stdout=subprocess.DEVNULL)
+    server_url = f"http://127.0.0.1:{port}"
+
+    # Wait for it to accept connections
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            _admin(server_url, "/_stats")
+            return process, server_url
+        except OSError:
+            if time.monotonic() > deadline or process.poll() is not None:
+                process.kill()
+                raise RuntimeError("Fake API server did not start")
+            time.sleep(0.1)
+
+
+def _child_env(args, server_url, workdir):
+    env = dict(os.environ)
+    env.update({
+        "AIRTABLE_API_URL": f"{server_url}/v0",
+        "TRELLO_API_URL": f"{server_url}/1",
+        "AIRTABLE_API_KEY": "patBENCHMARK",
+        "AIRTABLE_BASE_ID": "appBENCHMARK",
+        "AIRTABLE_TABLE_NAME": "Leads",
+        "TRELLO_API_KEY": "benchmark",
+        "TRELLO_TOKEN": "benchmark",
+        "TRELLO_BOARD_ID": BOARD_ID,
+        "TRELLO_LIST_TODO_ID": TODO_LIST_ID,
+        "TRELLO_LIST_DONE_ID": DONE_LIST_ID,
+        "SYNC_STATE_PATH": os.path.join(workdir, "sync_state.json"),
+        "LINK_INDEX_PATH": os.path.join(workdir, "sync_links.db"),
+        "OUTBOX_PATH": os.path.join(workdir, "sync_outbox.db"),
+        "AIRTABLE_INCREMENTAL": str(args.incremental).lower(),
+        "TRELLO_CHANGE_FEED": str(args.change_feed).lower(),
+        # Client-side limits are what we'd be measuring otherwise
+        "AIRTABLE_RATE_LIMIT": str(args.client_rate),
+        "AIRTABLE_RATE_BURST": str(args.client_rate),
+        "TRELLO_RATE_LIMIT": str(args.client_rate),
+        "TRELLO_RATE_BURST": str(args.client_rate),
+    })
+    return env
+
+
+def run_size(args, server_url, size, log):
+    """
+    Parent: reseed the server and run one size in a fresh child process.
+    """
+    _admin(server_url, "/_reset", {"leads": size, "seed": args.seed})
+
+    with tempfile.TemporaryDirectory() as workdir:
+        result_path = os.path.join(workdir, "result.json")
+        command = [
+            sys.executable, "-m", "bench.benchmark", "--child",
+            "--server", server_url,
+            "--sizes", str(size),
+            "--engine", args.engine,
+            "--churn", str(args.churn),
+            "--result", result_path,
+        ]
+        completed = subprocess.run(
+            command,
+            cwd=REPO_ROOT,
+            env=_child_env(args, server_url, workdir),
+            stdout=log,
+            stderr=subprocess.STDOUT
+        )
+        if completed.returncode != 0:
+            print(f"✗ {size} leads: benchmark process failed (exit {completed.returncode})")
+            return []
+        with open(result_path) as f:
+            return json.load(f)
+
+
+def print_table(results):
+    header = (f"{'leads':>7}  {'phase':<14} {'wall s':>8} {'requests':>9} {'KB out':>9} "
+              f"{'KB in':>10} {'429s':>5} {'5xx':>5} {'RSS MB':>7}")
+    print(header)
+    print("─" * len(header))
+    for row in results:
+        print(f"{row['size']:>7}  {row['phase']:<14} {row['wall_seconds']:>8.2f} "
+              f"{row['requests']:>9} {row['bytes_sent'] / 1024:>9.0f} "
+              f"{row['bytes_received'] / 1024:>10.0f} {row['throttled']:>5} {row['faults']:>5} "
+              f"{row['peak_rss_mb']:>7.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync benchmark against the local fake API")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated lead counts")
+    parser.add_argument("--engine", choices=("threads", "async"), default="threads")
+    parser.add_argument("--churn", type=float, default=0.01,
+                        help="Fraction of leads edited (and cards moved) before the churn cycle")
+    parser.add_argument("--incremental", action="store_true", help="AIRTABLE_INCREMENTAL=true")
+    parser.add_argument("--change-feed", action="store_true", help="TRELLO_CHANGE_FEED=true")
+    parser.add_argument("--client-rate", type=float, default=1000,
+                        help="Client-side rate limit per API (requests/s)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--log", help="Write the sync output here (default: discarded)")
+    add_server_arguments(parser)
+    # Internal: one size in a child process
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--server", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+
+    if args.child:
+        results = run_phases(args.server, sizes[0], args.engine, args.churn)
+        with open(args.result, "w") as f:
+            json.dump(results, f)
+        return
+
+    process, server_url = _start_server(args)
+    log = open(args.log, "w") if args.log else subprocess.DEVNULL
+    results = []
+
+    try:
+        for size in sizes:
+            print(f"⏱ {size} leads ({args.engine} engine)...")
+            results.extend(run_size(args, server_url, size, log))
+    finally:
+        process.terminate()
+        process.wait()
+        if args.log:
+            log.close()
+
+    print()
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
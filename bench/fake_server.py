@@ -0,0 +1,667 @@
+"""
+Local stand-in for the Airtable and Trello endpoints the sync uses.
+
+Point the clients at it with AIRTABLE_API_URL / TRELLO_API_URL:
+
+    python -m bench.fake_server --leads 1000 --port 8765
+    AIRTABLE_API_URL=http://127.0.0.1:8765/v0 \
+    TRELLO_API_URL=http://127.0.0.1:8765/1 python main.py init
+
+Emulated:
+- Airtable: list records (offset/pageSize, fields[], the filterByFormula
+  shapes the clients build), PATCH one record, PATCH up to 10 records,
+  webhook payloads
+- Trello: board cards, list cards, board actions (since - an action ID
+  or a date -, before, limit), get/create/update card, fields= projection,
+  text custom fields (list/create on the board, set a card's value,
+  customFieldItems=true on card reads)
+
+Plus per-request latency, per-API rate limits (429 + Retry-After) and
+random 429/5xx fault injection. Admin endpoints (not counted in stats):
+
+- GET  /_stats          request/byte counters since the last reset
+- POST /_stats/reset    zero the counters
+- POST /_reset          reseed: {"leads": N}
+- POST /_mutate         churn: {"records": N, "cards": N}
+"""
+import argparse
+import bisect
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Board and list IDs the fake board is seeded with
+BOARD_ID = "b" * 24
+TODO_LIST_ID = "1" * 24
+DONE_LIST_ID = "2" * 24
+
+LEAD_STATUSES = ("NEW", "CONTACTED", "IN_PROGRESS", "QUALIFIED", "LOST")
+LEAD_SOURCES = ("Website", "Referral", "Conference", "Cold outreach")
+LAST_MODIFIED_FIELD = "Last Modified"
+
+# Airtable batch PATCH limit
+MAX_BATCH_RECORDS = 10
+
+RECORD_ID_PATTERN = re.compile(r"RECORD_ID\(\)\s*=\s*'(rec\w+)'")
+IS_AFTER_PATTERN = re.compile(r"IS_AFTER\((\{.+?\}|CREATED_TIME\(\)),\s*DATETIME_PARSE\('([^']+)'\)\)")
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+class TokenBucket:
+    """
+    Server-side rate limit: `rate` requests per second, bursts of `rate`.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class FakeStore:
+    """
+    Records, cards and board actions, guarded by one lock.
+
+    Records and actions are kept in ID order (IDs are zero-padded
+    counters), so offsets and `since` cursors are plain list positions.
+    """
+
+    def __init__(self, leads=0, seed=0):
+        self.lock = threading.Lock()
+        self.reset(leads, seed)
+
+    def reset(self, leads, seed=0):
+        with self.lock:
+            self.random = random.Random(seed)
+            self.record_ids = itertools.count(1)
+            self.card_ids = itertools.count(1)
+            self.action_ids = itertools.count(1)
+            self.records = {}
+            self.record_order = []
+            self.cards = {}
+            self.custom_fields = []
+            # {card_id: {field_id: text}}
+            self.card_field_values = {}
+            self.actions = []
+            self.action_order = []
+            self.webhook_payloads = []
+
+            stamp = _now()
+            for number in range(leads):
+                record_id = f"rec{next(self.record_ids):014d}"
+                self.records[record_id] = {
+                    "id": record_id,
+                    "createdTime": stamp,
+                    "fields": {
+                        "Name": f"Lead {number}",
+                        "Status": self.random.choice(LEAD_STATUSES),
+                        "Email": f"lead{number}@example.com",
+                        "Source": self.random.choice(LEAD_SOURCES),
+                        # Long text the sync never reads (field projection)
+                        "Notes": "Lorem ipsum dolor sit amet. " * 8,
+                        LAST_MODIFIED_FIELD: stamp,
+                    },
+                }
+                self.record_order.append(record_id)
+
+    # ----- Airtable -----
+
+    def list_records(self, formula=None, fields=None, offset=0, page_size=100):
+        with self.lock:
+            if formula:
+                matches = self._filter_records(formula)
+                page = matches[offset:offset + page_size]
+                total = len(matches)
+            else:
+                page = [self.records[record_id] for record_id in self.record_order[offset:offset + page_size]]
+                total = len(self.record_order)
+            page = [_project_record(record, fields) for record in page]
+        return page, offset + page_size < total
+
+    def _filter_records(self, formula):
+        record_ids = RECORD_ID_PATTERN.findall(formula)
+        if record_ids:
+            records = [self.records[record_id] for record_id in record_ids if record_id in self.records]
+        else:
+            records = [self.records[record_id] for record_id in self.record_order]
+
+        after = IS_AFTER_PATTERN.search(formula)
+        if after:
+            field, since = after.groups()
+            if field == "CREATED_TIME()":
+                records = [record for record in records if record['createdTime'] > since]
+            else:
+                records = [record for record in records if record['fields'].get(field[1:-1], '') > since]
+        return records
+
+    def update_records(self, updates):
+        """
+        Apply [(record_id, fields)]; None if any record doesn't exist.
+        """
+        with self.lock:
+            if any(record_id not in self.records for record_id, _ in updates):
+                return None
+            updated = []
+            stamp = _now()
+            for record_id, fields in updates:
+                record = self.records[record_id]
+                record['fields'].update(fields)
+                record['fields'][LAST_MODIFIED_FIELD] = stamp
+                updated.append(_project_record(record, None))
+            return updated
+
+    # ----- Trello -----
+
+    def list_cards(self, list_id=None, fields=None, custom_items=False):
+        with self.lock:
+            return [
+                self._card_payload(card, fields, custom_items)
+                for card in self.cards.values()
+                if list_id is None or card['idList'] == list_id
+            ]
+
+    def get_card(self, card_id, fields=None, custom_items=False):
+        with self.lock:
+            card = self.cards.get(card_id)
+            return self._card_payload(card, fields, custom_items) if card else None
+
+    def _card_payload(self, card, fields, custom_items):
+        payload = _project_card(card, fields)
+        if custom_items:
+            payload['customFieldItems'] = [
+                {"idCustomField": field_id, "idModel": card['id'], "value": {"text": text}}
+                for field_id, text in self.card_field_values.get(card['id'], {}).items()
+            ]
+        return payload
+
+    def list_custom_fields(self):
+        with self.lock:
+            return [dict(field) for field in self.custom_fields]
+
+    def create_custom_field(self, name, field_type):
+        with self.lock:
+            field = {
+                "id": f"cf{len(self.custom_fields) + 1:022x}",
+                "idModel": BOARD_ID,
+                "modelType": "board",
+                "name": name,
+                "type": field_type,
+            }
+            self.custom_fields.append(field)
+            return dict(field)
+
+    def set_card_field(self, card_id, field_id, text):
+        with self.lock:
+            if card_id not in self.cards or not any(field['id'] == field_id for field in self.custom_fields):
+                return None
+            self.card_field_values.setdefault(card_id, {})[field_id] = text
+            return {"idCustomField": field_id, "idModel": card_id, "value": {"text": text}}
+
+    def create_card(self, name, desc, list_id):
+        with self.lock:
+            card_id = f"{next(self.card_ids):024x}"
+            card = {
+                "id": card_id,
+                "name": name,
+                "desc": desc,
+                "idList": list_id,
+                "idBoard": BOARD_ID,
+                "closed": False,
+                "dateLastActivity": _now(),
+            }
+            self.cards[card_id] = card
+            self._record_action("createCard", {"id": card_id, "name": name}, list={"id": list_id})
+            return dict(card)
+
+    def update_card(self, card_id, changes):
+        with self.lock:
+            card = self.cards.get(card_id)
+            if card is None:
+                return None
+            card.update(changes)
+            card['dateLastActivity'] = _now()
+            extra = {"listAfter": {"id": changes['idList']}} if 'idList' in changes else {}
+            self._record_action("updateCard", {"id": card_id, **changes}, **extra)
+            return dict(card)
+
+    def list_actions(self, since=None, before=None, limit=50):
+        with self.lock:
+            if since and "-" in since:
+                # A date instead of an action ID, as Trello also accepts
+                since = next(
+                    (action['id'] for action in reversed(self.actions) if action['date'] <= since),
+                    None
+                )
+            start = bisect.bisect_right(self.action_order, since) if since else 0
+            end = bisect.bisect_left(self.action_order, before) if before else len(self.actions)
+            # Newest first, like Trello
+            return self.actions[max(start, end - limit):end][::-1]
+
+    def _record_action(self, action_type, card, **data):
+        action_id = f"{next(self.action_ids):024x}"
+        self.actions.append({
+            "id": action_id,
+            "type": action_type,
+            "date": _now(),
+            "data": {"card": card, **data},
+        })
+        self.action_order.append(action_id)
+
+    # ----- Churn -----
+
+    def mutate(self, records=0, cards=0):
+        """
+        Simulate users: edit `records` random leads in Airtable and drag
+        `cards` random cards into the DONE list on Trello.
+        """
+        with self.lock:
+            record_ids = self.random.sample(self.record_order, min(records, len(self.record_order)))
+            card_ids = self.random.sample(list(self.cards), min(cards, len(self.cards)))
+
+        for record_id in record_ids:
+            self.update_records([(record_id, {"Status": self.random.choice(LEAD_STATUSES[:4])})])
+        for card_id in card_ids:
+            self.update_card(card_id, {"idList": DONE_LIST_ID})
+
+        if record_ids:
+            with self.lock:
+                self.webhook_payloads.append({
+                    "timestamp": _now(),
+                    "changedTablesById": {
+                        "tblFake": {"changedRecordsById": {record_id: {} for record_id in record_ids}}
+                    },
+                })
+        return {"records": len(record_ids), "cards": len(card_ids)}
+
+
+def _project_record(record, fields):
+    if not fields:
+        return {**record, "fields": dict(record['fields'])}
+    return {
+        "id": record['id'],
+        "createdTime": record['createdTime'],
+        "fields": {name: value for name, value in record['fields'].items() if name in fields},
+    }
+
+
+def _project_card(card, fields):
+    if not fields:
+        return dict(card)
+    return {"id": card['id'], **{name: card[name] for name in fields if name in card}}
+
+
+class RequestStats:
+    """
+    Counters for everything except the admin endpoints.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = {}
+            self.throttled = 0
+            self.faults = 0
+            self.bytes_received = 0
+            self.bytes_sent = 0
+
+    def record(self, endpoint, received, sent, throttled=False, fault=False):
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.bytes_received += received
+            self.bytes_sent += sent
+            self.throttled += throttled
+            self.faults += fault
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "requests": sum(self.requests.values()),
+                "by_endpoint": dict(self.requests),
+                "throttled": self.throttled,
+                "faults": self.faults,
+                "bytes_received": self.bytes_received,
+                "bytes_sent": self.bytes_sent,
+            }
+
+
+class FakeAPIHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so the clients' pooled sessions behave like production
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes - don't let Nagle +
+    # delayed ACKs add ~40ms to every response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def end_headers(self):
+        # Count response header bytes before they're flushed
+        self._sent += sum(len(chunk) for chunk in getattr(self, '_headers_buffer', []))
+        super().end_headers()
+
+    def _handle(self, method):
+        self._sent = 0
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        body = self._read_body()
+        received = len(self.raw_requestline) + len(str(self.headers)) + len(body)
+
+        if url.path.startswith("/_"):
+            return self._admin(method, url.path, body)
+
+        server = self.server
+        api = "airtable" if url.path.startswith("/v0/") else "trello"
+        endpoint = f"{api} {method} {_endpoint_shape(url.path)}"
+        throttled = fault = False
+
+        if server.latency:
+            time.sleep(server.latency * (1 + server.random.uniform(-0.2, 0.2)))
+
+        limiter = server.limiters.get(api)
+        if (limiter and not limiter.try_acquire()) or server.random.random() < server.throttle_rate:
+            throttled = True
+            self._send({"error": {"type": "RATE_LIMITED"}}, 429,
+                       headers={"Retry-After": str(server.retry_after)})
+        elif server.random.random() < server.error_rate:
+            fault = True
+            self._send({"error": {"type": "SERVER_ERROR"}}, 503)
+        elif api == "airtable":
+            self._airtable(method, url.path, query, body)
+        else:
+            self._trello(method, url.path, query, body)
+
+        server.stats.record(endpoint, received, self._sent, throttled, fault)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, payload, status=200, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        self._sent += len(data)
+
+    def _not_found(self, path):
+        self._send({"error": "NOT_FOUND", "path": path}, 404)
+
+    def _admin(self, method, path, body):
+        server = self.server
+        params = json.loads(body or b"{}")
+        if method == "GET" and path == "/_stats":
+            return self._send(server.stats.snapshot())
+        if method == "POST" and path == "/_stats/reset":
+            server.stats.reset()
+            return self._send({"ok": True})
+        if method == "POST" and path == "/_reset":
+            server.store.reset(int(params.get("leads", 0)), int(params.get("seed", 0)))
+            server.stats.reset()
+            return self._send({"ok": True, "leads": len(server.store.records)})
+        if method == "POST" and path == "/_mutate":
+            return self._send(server.store.mutate(int(params.get("records", 0)), int(params.get("cards", 0))))
+        self._not_found(path)
+
+    def _airtable(self, method, path, query, body):
+        store = self.server.store
+        parts = path.strip("/").split("/")
+
+        # /v0/bases/{base}/webhooks/{id}/payloads
+        if method == "GET" and len(parts) == 6 and parts[1] == "bases" and parts[5] == "payloads":
+            cursor = int(query.get("cursor", ["1"])[0])
+            payloads = store.webhook_payloads[cursor - 1:]
+            return self._send({
+                "payloads": payloads,
+                "cursor": cursor + len(payloads),
+                "mightHaveMore": False,
+            })
+
+        # /v0/{base}/{table}
+        if len(parts) == 3:
+            if method == "GET":
+                offset = int(query.get("offset", ["0"])[0])
+                page_size = min(int(query.get("pageSize", ["100"])[0]), 100)
+                records, more = store.list_records(
+                    formula=query.get("filterByFormula", [None])[0],
+                    fields=query.get("fields[]"),
+                    offset=offset,
+                    page_size=page_size
+                )
+                payload = {"records": records}
+                if more:
+                    payload["offset"] = str(offset + page_size)
+                return self._send(payload)
+
+            if method == "PATCH":
+                items = json.loads(body or b"{}").get("records", [])
+                if len(items) > MAX_BATCH_RECORDS:
+                    return self._send({"error": {"type": "INVALID_RECORDS"}}, 422)
+                records = store.update_records([(item['id'], item.get('fields', {})) for item in items])
+                if records is None:
+                    return self._send({"error": {"type": "ROW_DOES_NOT_EXIST"}}, 422)
+                return self._send({"records": records})
+
+        # /v0/{base}/{table}/{record}
+        if len(parts) == 4 and method == "PATCH":
+            fields = json.loads(body or b"{}").get("fields", {})
+            records = store.update_records([(parts[3], fields)])
+            if records is None:
+                return self._send({"error": {"type": "ROW_DOES_NOT_EXIST"}}, 404)
+            return self._send(records[0])
+
+        self._not_found(path)
+
+    def _trello(self, method, path, query, body):
+        store = self.server.store
+        parts = path.strip("/").split("/")
+        fields = query["fields"][0].split(",") if "fields" in query else None
+        custom_items = query.get("customFieldItems", ["false"])[0] == "true"
+
+        def param(name):
+            return query[name][0] if name in query else None
+
+        # /1/boards/{board}/cards, /1/lists/{list}/cards
+        if method == "GET" and len(parts) == 4 and parts[3] == "cards":
+            if parts[1] == "boards":
+                return self._send(store.list_cards(fields=fields, custom_items=custom_items))
+            if parts[1] == "lists":
+                return self._send(store.list_cards(list_id=parts[2], fields=fields,
+                                                   custom_items=custom_items))
+
+        # /1/boards/{board}/customFields, /1/customFields
+        if method == "GET" and len(parts) == 4 and parts[1] == "boards" and parts[3] == "customFields":
+            return self._send(store.list_custom_fields())
+        if method == "POST" and parts[1:] == ["customFields"]:
+            params = json.loads(body or b"{}")
+            return self._send(store.create_custom_field(params.get("name"), params.get("type")))
+
+        # /1/cards/{card}/customField/{field}/item
+        if method == "PUT" and len(parts) == 6 and parts[1] == "cards" and parts[3] == "customField":
+            value = json.loads(body or b"{}").get("value") or {}
+            item = store.set_card_field(parts[2], parts[4], value.get("text"))
+            if item is None:
+                return self._not_found(path)
+            return self._send(item)
+
+        # /1/boards/{board}/actions
+        if method == "GET" and len(parts) == 4 and parts[1] == "boards" and parts[3] == "actions":
+            return self._send(store.list_actions(
+                since=param("since"),
+                before=param("before"),
+                limit=int(param("limit") or 50)
+            ))
+
+        # /1/cards
+        if method == "POST" and parts[1:] == ["cards"]:
+            return self._send(store.create_card(param("name"), param("desc") or "", param("idList")))
+
+        # /1/cards/{card}
+        if len(parts) == 3 and parts[1] == "cards":
+            if method == "GET":
+                card = store.get_card(parts[2], fields, custom_items)
+            elif method == "PUT":
+                changes = {name: query[name][0] for name in ("name", "desc", "idList") if name in query}
+                card = store.update_card(parts[2], changes)
+            else:
+                card = None
+            if card is None:
+                return self._not_found(path)
+            return self._send(card)
+
+        self._not_found(path)
+
+
+def _endpoint_shape(path):
+    """
+    Path with IDs replaced, so stats group by endpoint (/1/cards/{id}).
+    """
+    parts = path.strip("/").split("/")
+    if parts[0] == "v0":
+        if len(parts) >= 3 and parts[1] == "bases":
+            return "/v0/bases/{base}/webhooks/{id}/payloads"
+        return "/v0/{base}/{table}" + ("/{record}" if len(parts) == 4 else "")
+    shape = ["1"] + [part if index % 2 == 0 else "{id}" for index, part in enumerate(parts[1:])]
+    return "/" + "/".join(shape)
+
+
+class FakeAPIServer(ThreadingHTTPServer):
+    """
+    Threaded fake API. Behaviour knobs:
+
+    - latency: seconds added to every request (±20% jitter)
+    - airtable_rate / trello_rate: requests per second before 429s
+      (0 = unlimited)
+    - throttle_rate / error_rate: fraction of requests answered with a
+      random 429 / 503
+    - retry_after: Retry-After seconds sent with 429s
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, leads=0, latency=0.0, airtable_rate=0, trello_rate=0,
+                 throttle_rate=0.0, error_rate=0.0, retry_after=1.0, seed=0):
+        super().__init__(address, FakeAPIHandler)
+        self.store = FakeStore(leads, seed)
+        self.stats = RequestStats()
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.limiters = {}
+        if airtable_rate:
+            self.limiters["airtable"] = TokenBucket(airtable_rate)
+        if trello_rate:
+            self.limiters["trello"] = TokenBucket(trello_rate)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(host="127.0.0.1", port=0, **options):
+    """
+    Start a FakeAPIServer on a background thread (port 0 = any free port).
+
+    Returns:
+        The running server - call shutdown() when done
+    """
+    server = FakeAPIServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_server_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds added to every request")
+    parser.add_argument("--airtable-rate", type=float, default=0,
+                        help="Airtable requests/s before 429s (0 = unlimited)")
+    parser.add_argument("--trello-rate", type=float, default=0,
+                        help="Trello requests/s before 429s (0 = unlimited)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with a random 429")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with a 503")
+    parser.add_argument("--retry-after", type=float, default=1.0,
+                        help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def server_options(args):
+    return {
+        "latency": args.latency,
+        "airtable_rate": args.airtable_rate,
+        "trello_rate": args.trello_rate,
+        "throttle_rate": args.throttle_rate,
+        "error_rate": args.error_rate,
+        "retry_after": args.retry_after,
+        "seed": args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Airtable/Trello API for local runs and benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--leads", type=int, default=100, help="Airtable leads to seed")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeAPIServer((args.host, args.port), leads=args.leads, **server_options(args))
+    print(f"🧪 Fake API on {server.url} ({args.leads} leads)")
+    print(f"   AIRTABLE_API_URL={server.url}/v0")
+    print(f"   TRELLO_API_URL={server.url}/1")
+    print(f"   TRELLO_BOARD_ID={BOARD_ID}")
+    print(f"   TRELLO_LIST_TODO_ID={TODO_LIST_ID}")
+    print(f"   TRELLO_LIST_DONE_ID={DONE_LIST_ID}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Fake API stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,242 @@
+import logging
 import requests
+import time
+from clients.http_session import get_session
+from clients.rate_limiter import get_rate_limiter, parse_retry_after
 from config import Config
+from logging_config import PER_RECORD
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Airtable accepts at most 10 records per create/update request
+AIRTABLE_BATCH_SIZE = 10
 
 class AirtableClient:
    
     
-    def __init__(self):
-        self.base_url = f"https://api.airtable.com/v0/{Config.AIRTABLE_BASE_ID}/{Config.AIRTABLE_TABLE_NAME}"
+    def __init__(self, fields=None, base_id=None, table_name=None, api_key=None, decode=None):
+        """
+        Args:
+            fields: Optional field names to fetch (Airtable fields[]);
+                    None fetches every column
+            base_id, table_name, api_key: Table to sync (default: from Config)
+            decode: Optional record dict → model (e.g. Lead.from_api),
+                    applied to each page as it is decoded; None returns
+                    the raw dicts
+        """
+        base_id = base_id or Config.AIRTABLE_BASE_ID
+        table_name = table_name or Config.AIRTABLE_TABLE_NAME
+        api_key = api_key or Config.AIRTABLE_API_KEY
+        
+        self.base_url = f"{Config.AIRTABLE_API_URL}/{base_id}/{table_name}"
+        self.webhooks_url = f"{Config.AIRTABLE_API_URL}/bases/{base_id}/webhooks"
+        self.fields = list(fields) if fields else None
+        self.decode = decode
         self.headers = {
-            "Authorization": f"Bearer {Config.AIRTABLE_API_KEY}",
+            "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        
+        # Pooled keep-alive connections + transport retries, shared by
+        # every AirtableClient in the process
+        self.session = get_session(
+            "airtable",
+            pool_size=Config.HTTP_POOL_SIZE,
+            max_retries=Config.HTTP_MAX_RETRIES,
+            backoff_factor=Config.HTTP_BACKOFF_FACTOR,
+            backoff_jitter=Config.HTTP_BACKOFF_JITTER
+        )
+        self.timeout = Config.AIRTABLE_TIMEOUT_SECONDS
+        
+        # Shared with every other AirtableClient using this token
+        self.rate_limiter = get_rate_limiter(
+            "Airtable",
+            rate=Config.AIRTABLE_RATE_LIMIT,
+            capacity=Config.AIRTABLE_RATE_BURST,
+            default_pause=Config.AIRTABLE_THROTTLE_PAUSE_SECONDS,
+            key=api_key
+        )
     
-    def get_all_records(self):
+    def _request(self, method, url, **kwargs):
+        """
+        Send a request through the shared Airtable rate limiter.
+        
+        429 responses are retried once the limiter's back-off has passed;
+        any other response (including errors) goes back to the caller.
+        """
+        endpoint = self._endpoint(url)
+        
+        for attempt in range(Config.RATE_LIMIT_MAX_RETRIES + 1):
+            if attempt:
+                METRICS.record_retry("airtable", "rate_limited")
+            self.rate_limiter.acquire()
+            
+            started = time.perf_counter()
+            try:
+                response = self.session.request(
+                    method,
+                    url,
+                    headers=self.headers,
+                    timeout=self.timeout,
+                    **kwargs
+                )
+            except requests.exceptions.RequestException:
+                METRICS.record_request("airtable", method, endpoint, time.perf_counter() - started)
+                raise
+            METRICS.record_request("airtable", method, endpoint, time.perf_counter() - started, response)
+            
+            if response.status_code != 429:
+                self.rate_limiter.on_success()
+                return response
+            
+            self.rate_limiter.on_throttled(
+                parse_retry_after(response.headers.get('Retry-After'))
+            )
+        
+        return response
+    
+    def _endpoint(self, url):
+        """
+        Metrics label for a request URL (IDs left out).
+        """
+        if url == self.base_url:
+            return "records"
+        if url.startswith(self.webhooks_url):
+            return "webhooks/{id}/payloads"
+        return "records/{id}"
+    
+    def get_all_records(self, filter_formula=None):
         """
         Fetch all records from Airtable with pagination handling.
+        
+        Holds the whole result in memory - use iter_record_pages() to
+        process large tables page by page instead.
+        
+        Args:
+            filter_formula: Optional Airtable formula - only matching
+                            records are returned (server-side filter)
         """
         all_records = []
-        offset = None
         
         try:
-            while True:
-                # Build URL with optional offset parameter for pagination
-                params = {"offset": offset} if offset else {}
-                
-                response = requests.get(
-                    self.base_url,
-                    headers=self.headers,
-                    params=params,
-                    timeout=10
-                )
-                
-                # Raise exception for 4xx/5xx status codes
-                
-                response.raise_for_status()
-                
-                data = response.json()
-                records = data.get('records', [])
-                all_records.extend(records)  
-                
-                # Check if there are more pages
-                offset = data.get('offset')
-                if not offset:
-                    break
+            for records in self.iter_record_pages(filter_formula):
+                all_records.extend(records)
             
-            print(f"✓ Fetched {len(all_records)} records from Airtable")
+            logger.info("✓ Fetched %d records from Airtable", len(all_records))
             return all_records
             
         except requests.exceptions.RequestException as e:
-            print(f"✗ Error fetching Airtable records: {e}")
+            logger.error("✗ Error fetching Airtable records: %s", e)
             return []
     
+    def iter_record_pages(self, filter_formula=None):
+        """
+        Yield records one page (up to 100) at a time.
+        
+        Only the current page is held in memory; the next page is requested
+        when the caller asks for it.
+        
+        Raises:
+            requests.exceptions.RequestException if a page fails - the
+            caller decides what a partial read means
+        """
+        offset = None
+        
+        while True:
+            records, offset = self.get_records_page(offset, filter_formula)
+            yield records
+            
+            # Check if there are more pages
+            if not offset:
+                break
+    
+    def get_records_page(self, offset=None, filter_formula=None):
+        """
+        Fetch one page (up to 100 records).
+        
+        Returns:
+            (records, next_offset) - next_offset is None on the last page
+        
+        Raises:
+            requests.exceptions.RequestException on failure
+        """
+        # Build URL with optional offset parameter for pagination
+        params = {"offset": offset} if offset else {}
+        if filter_formula:
+            params["filterByFormula"] = filter_formula
+        if self.fields:
+            # Projection: skip columns the sync never reads (long text etc.)
+            params["fields[]"] = self.fields
+        
+        response = self._request("GET", self.base_url, params=params)
+        
+        # Raise exception for 4xx/5xx status codes
+        response.raise_for_status()
+        
+        data = response.json()
+        records = data.get('records', [])
+        if self.decode:
+            # The page's dicts are dropped as soon as they are converted
+            records = [self.decode(record) for record in records]
+        return records, data.get('offset')
+    
+    def get_records_modified_since(self, since, last_modified_field):
+        """
+        Fetch only records modified after an ISO-8601 timestamp.
+        
+        Args:
+            since: Watermark like "2024-01-31T12:00:00.000Z"
+            last_modified_field: Name of the "Last modified time" field
+        """
+        formula = f"IS_AFTER({{{last_modified_field}}}, DATETIME_PARSE('{since}'))"
+        return self.get_all_records(filter_formula=formula)
+    
+    def get_records_by_ids(self, record_ids, chunk_size=50):
+        """
+        Fetch specific records by ID.
+        
+        Uses OR(RECORD_ID()=...) formulas, chunked so the query string
+        stays well below URL length limits.
+        """
+        record_ids = list(record_ids)
+        records = []
+        
+        for start in range(0, len(record_ids), chunk_size):
+            chunk = record_ids[start:start + chunk_size]
+            terms = ",".join(f"RECORD_ID()='{record_id}'" for record_id in chunk)
+            records.extend(self.get_all_records(filter_formula=f"OR({terms})"))
+        
+        return records
+    
+    def get_webhook_payloads(self, webhook_id, cursor=None):
+        """
+        Fetch one page of change payloads for an Airtable webhook.
+        
+        Airtable's webhook notification is only a ping; the actual changes
+        are listed here, starting at `cursor`.
+        
+        Returns:
+            (payloads, next_cursor, might_have_more), or None on error
+        """
+        url = f"{self.webhooks_url}/{webhook_id}/payloads"
+        params = {"cursor": cursor} if cursor else {}
+        
+        try:
+            response = self._request("GET", url, params=params)
+            
+            response.raise_for_status()
+            data = response.json()
+            return (
+                data.get('payloads', []),
+                data.get('cursor', cursor),
+                data.get('mightHaveMore', False)
+            )
+            
+        except requests.exceptions.RequestException as e:
+            logger.error("✗ Error fetching Airtable webhook payloads: %s", e)
+            return None
+    
     def update_record_status(self, record_id, status):
         """
         Update a single record's status field.
@@ -67,19 +254,115 @@ class AirtableClient:
         }
         
         try:
-            response = requests.patch(
+            response = self._request(
+                "PATCH",
                 url,
-                headers=self.headers,
-                json=payload,  # 'json' parameter auto-serializes dict to JSON
-                timeout=10
+                json=payload  # 'json' parameter auto-serializes dict to JSON
             )
             
             response.raise_for_status()
-            print(f"✓ Updated Airtable record {record_id} to status: {status}")
+            logger.debug("✓ Updated Airtable record %s to status: %s", record_id, status,
+                         extra=PER_RECORD)
             return response.json()
             
         except requests.exceptions.RequestException as e:
-            print(f"✗ Error updating Airtable record {record_id}: {e}")
+            logger.error("✗ Error updating Airtable record %s: %s", record_id, e)
             return None
-
-
+    
+    def update_records(self, updates, max_retries=2):
+        """
+        Update many records with multi-record PATCH (10 per request).
+        
+        Args:
+            updates: {record_id: {field: value}} - e.g. {"rec1": {"Status": "QUALIFIED"}}
+            max_retries: Extra attempts for records that failed
+        
+        Returns:
+            (updated, failed) - updated is {record_id: record} from Airtable,
+            failed is {record_id: error message}
+        
+        A batch is all-or-nothing on Airtable's side, so when one fails the
+        retry splits it into single-record requests - one bad record (e.g.
+        deleted) no longer blocks the other nine. A single record rejected
+        with a 4xx other than 429 (422, 403, ...) won't succeed on a retry:
+        it is reported as failed straight away.
+        """
+        updated = {}
+        failed = {}
+        pending = [list(updates.items())[i:i + AIRTABLE_BATCH_SIZE]
+                   for i in range(0, len(updates), AIRTABLE_BATCH_SIZE)]
+        
+        for attempt in range(max_retries + 1):
+            retry = []
+            
+            for chunk in pending:
+                records, error, retryable = self._patch_batch(chunk)
+                
+                for record in records:
+                    updated[record['id']] = record
+                    failed.pop(record['id'], None)
+                
+                missing = [(record_id, fields) for record_id, fields in chunk
+                           if record_id not in updated]
+                for record_id, _ in missing:
+                    failed[record_id] = error or "missing from Airtable response"
+                
+                if not missing or (len(chunk) == 1 and not retryable):
+                    continue
+                if len(missing) > 1:
+                    # Isolate the bad record(s) on the next attempt
+                    retry.extend([item] for item in missing)
+                else:
+                    retry.append(missing)
+            
+            if not retry or attempt == max_retries:
+                break
+            pending = retry
+        
+        logger.debug("✓ Batch-updated %d Airtable records, %d failed",
+                     len(updated), len(failed), extra=PER_RECORD)
+        return updated, failed
+    
+    def update_records_status(self, statuses, max_retries=2):
+        """
+        Batch version of update_record_status.
+        
+        Args:
+            statuses: {record_id: status}
+        """
+        return self.update_records(
+            {record_id: {"Status": status} for record_id, status in statuses.items()},
+            max_retries=max_retries
+        )
+    
+    def _patch_batch(self, chunk):
+        """
+        PATCH up to 10 records in one request.
+        
+        Returns:
+            (records, error, retryable) - records Airtable confirmed, error
+            message or None, and whether a retry of the same request could
+            succeed (False for 4xx responses other than 429)
+        """
+        payload = {
+            "records": [
+                {"id": record_id, "fields": fields}
+                for record_id, fields in chunk
+            ]
+        }
+        
+        try:
+            response = self._request("PATCH", self.base_url, json=payload)
+            
+            response.raise_for_status()
+            return response.json().get('records', []), None, True
+            
+        except requests.exceptions.RequestException as e:
+            ids = ", ".join(record_id for record_id, _ in chunk)
+            status = e.response.status_code if e.response is not None else None
+            retryable = status is None or status == 429 or status >= 500
+            if retryable or len(chunk) > 1:
+                logger.warning("✗ Error batch-updating Airtable records %s: %s", ids, e)
+            else:
+                logger.error("✗ Airtable rejected record %s (not retried): %s", ids, e)
+            return [], str(e), retryable
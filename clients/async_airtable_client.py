@@ -0,0 +1,75 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import requests
+from clients.airtable_client import AirtableClient
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAirtableClient:
+    """
+    asyncio front-end for AirtableClient.
+    
+    Requests still go through the blocking client's pooled session and the
+    shared rate limiter, but run on a thread pool so many of them can be in
+    flight while the event loop keeps working. This keeps `requests` as the
+    only HTTP library.
+    """
+    
+    def __init__(self, executor, client=None):
+        self.client = client or AirtableClient()
+        self.executor = executor
+    
+    async def _call(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        )
+    
+    async def iter_record_pages(self, filter_formula=None):
+        """
+        Yield record pages as they arrive.
+        
+        The request for page N+1 is sent BEFORE page N is handed to the
+        caller, so fetching the next page overlaps with processing this one.
+        
+        Raises:
+            requests.exceptions.RequestException if a page fails
+        """
+        next_page = asyncio.ensure_future(
+            self._call(self.client.get_records_page, None, filter_formula)
+        )
+        fetched = 0
+        
+        while next_page is not None:
+            records, offset = await next_page
+            
+            next_page = None
+            if offset:
+                next_page = asyncio.ensure_future(
+                    self._call(self.client.get_records_page, offset, filter_formula)
+                )
+            
+            fetched += len(records)
+            yield records
+        
+        logger.info("✓ Fetched %d records from Airtable", fetched)
+    
+    async def get_all_records(self, filter_formula=None):
+        all_records = []
+        try:
+            async for records in self.iter_record_pages(filter_formula):
+                all_records.extend(records)
+        except requests.exceptions.RequestException as e:
+            logger.error("✗ Error fetching Airtable records: %s", e)
+            return []
+        return all_records
+    
+    async def get_records_by_ids(self, record_ids):
+        return await self._call(self.client.get_records_by_ids, record_ids)
+    
+    async def update_records_status(self, statuses):
+        return await self._call(self.client.update_records_status, statuses)
@@ -0,0 +1,52 @@
+import asyncio
+import contextvars
+import functools
+from clients.trello_client import TrelloClient
+
+
+class AsyncTrelloClient:
+    """
+    asyncio front-end for TrelloClient.
+    
+    Same approach as AsyncAirtableClient: the blocking client (pooled
+    session + shared rate limiter) runs on a thread pool, awaited from the
+    event loop.
+    """
+    
+    def __init__(self, executor, client=None):
+        self.client = client or TrelloClient()
+        self.executor = executor
+    
+    async def _call(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        )
+    
+    async def get_all_cards_on_board(self):
+        return await self._call(self.client.get_all_cards_on_board)
+    
+    async def get_board_cards(self, card_fields=None):
+        return await self._call(self.client.get_board_cards, card_fields=card_fields)
+    
+    async def create_card(self, name, description, list_id, link=None):
+        return await self._call(
+            self.client.create_card,
+            name=name,
+            description=description,
+            list_id=list_id,
+            link=link
+        )
+    
+    async def update_card(self, card_id, name=None, description=None, list_id=None,
+                          details=None, airtable_id=None):
+        return await self._call(
+            self.client.update_card,
+            card_id=card_id,
+            name=name,
+            description=description,
+            list_id=list_id,
+            details=details,
+            airtable_id=airtable_id
+        )
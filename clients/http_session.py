@@ -0,0 +1,70 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Methods that are safe to resend after a 5xx / read error. POST is left out
+# on purpose: a retried card create could create the card twice. Connect
+# errors (request never left the machine) are retried for every method.
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"])
+
+
+def build_session(pool_size, max_retries, backoff_factor, backoff_jitter):
+    """
+    Long-lived HTTP session with a connection pool and transport retries.
+
+    Reusing the session keeps TCP+TLS connections alive between requests,
+    so only the first request to each host pays for the handshake.
+
+    Args:
+        pool_size: Max pooled connections per host (>= number of workers)
+        max_retries: Retries for connect errors and 5xx responses
+        backoff_factor: Exponential backoff base (factor * 2^n seconds)
+        backoff_jitter: Random extra delay (0..jitter seconds) per retry
+
+    429 is deliberately not retried here - the rate limiter owns that.
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=IDEMPOTENT_METHODS,
+        backoff_factor=backoff_factor,
+        backoff_jitter=backoff_jitter,
+        respect_retry_after_header=True,
+        # Hand the last 5xx back to the caller's raise_for_status()
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+# One session per API, shared by every client instance in the process
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(name, **kwargs):
+    """
+    Shared pooled session for an API (created on first use with kwargs,
+    see build_session). Every pipeline's client reuses the same warm
+    connections.
+    """
+    with _sessions_lock:
+        if name not in _sessions:
+            _sessions[name] = build_session(**kwargs)
+        return _sessions[name]
@@ -0,0 +1,109 @@
+"""
+Compact models of the Airtable leads and Trello cards the sync works on.
+
+API responses are turned into these as each page is decoded, so only the
+fields the sync reads are kept (no per-object dict, no unused JSON keys).
+Statuses and list IDs repeat across thousands of objects and are
+interned, so every lead/card shares one copy of each.
+"""
+import sys
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Lead:
+    """
+    One Airtable lead, with the sync's defaults for missing fields.
+    """
+
+    __slots__ = ("id", "name", "status", "email", "source", "modified")
+
+    def __init__(self, record_id, name="Unnamed Lead", status="NEW", email="",
+                 source="", modified=None):
+        self.id = record_id
+        self.name = name
+        self.status = _intern(status)
+        self.email = email
+        self.source = source
+        # Raw "Last modified" timestamp (incremental mode only)
+        self.modified = modified
+
+    def __repr__(self):
+        return f"Lead({self.id!r}, {self.name!r}, {self.status!r})"
+
+    @classmethod
+    def from_api(cls, record, modified_field=None):
+        """
+        Build a Lead from an Airtable record dict.
+
+        Args:
+            modified_field: Name of the "Last modified time" field to keep
+        """
+        fields = record.get('fields', {})
+        return cls(
+            record['id'],
+            name=fields.get('Name', 'Unnamed Lead'),
+            status=fields.get('Status', 'NEW'),
+            email=fields.get('Email', ''),
+            source=fields.get('Source', ''),
+            modified=fields.get(modified_field) if modified_field else None
+        )
+
+
+class Card:
+    """
+    One Trello card: only the fields the sync reads.
+    """
+
+    __slots__ = ("id", "name", "desc", "list_id", "last_activity", "link")
+
+    def __init__(self, card_id, name="", desc="", list_id=None, last_activity=None,
+                 link=None):
+        self.id = card_id
+        self.name = name
+        self.desc = desc
+        self.list_id = _intern(list_id)
+        # Raw dateLastActivity timestamp
+        self.last_activity = last_activity
+        # Airtable ID from the link custom field, if the card has one
+        self.link = link
+
+    def __repr__(self):
+        return f"Card({self.id!r}, {self.name!r}, list={self.list_id!r})"
+
+    @classmethod
+    def from_api(cls, data, link_field_id=None):
+        """
+        Build a Card from a Trello card dict.
+
+        Args:
+            link_field_id: Custom field holding the Airtable ID (read from
+                           the card's customFieldItems)
+        """
+        link = None
+        if link_field_id:
+            for item in data.get('customFieldItems') or ():
+                if item.get('idCustomField') == link_field_id:
+                    link = (item.get('value') or {}).get('text') or None
+                    break
+        return cls(
+            data['id'],
+            name=data.get('name', ''),
+            desc=data.get('desc', ''),
+            list_id=data.get('idList'),
+            last_activity=data.get('dateLastActivity'),
+            link=link
+        )
+
+    def apply_change(self, change):
+        """
+        Patch in a partial card dict (change feed / webhook action).
+        """
+        if 'name' in change:
+            self.name = change['name']
+        if 'desc' in change:
+            self.desc = change['desc']
+        if 'idList' in change:
+            self.list_id = _intern(change['idList'])
@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket with adaptive rate.
+
+    Every API request takes one token. Tokens refill at `rate` per second up
+    to `capacity` (the allowed burst). When the API answers 429 we stop
+    handing out tokens until Retry-After has passed and halve the rate;
+    each successful request then nudges the rate back up towards the
+    configured ceiling. This lets us run at the real API limit instead of
+    sleeping a guessed constant after every call.
+    """
+
+    def __init__(self, name, rate, capacity=None, min_rate=None, default_pause=1.0):
+        self.name = name
+        # Pause after a 429 that came without a Retry-After header
+        self.default_pause = default_pause
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = float(min_rate) if min_rate else self.max_rate / 10
+        self.capacity = float(capacity) if capacity else self.max_rate
+
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a request may be sent.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+    def on_success(self):
+        """
+        Additive increase: recover ~5% of the ceiling per good response.
+        """
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def on_throttled(self, retry_after=None):
+        """
+        Multiplicative decrease after a 429, plus a pause for Retry-After
+        (or default_pause if the API didn't say).
+        """
+        pause = retry_after if retry_after is not None else self.default_pause
+
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+
+        logger.warning("⚠ %s rate limited - pausing %.1fs, rate now %.2f req/s",
+                       self.name, pause, self.rate)
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+
+def parse_retry_after(value):
+    """
+    Retry-After header as seconds (it may be a number or an HTTP date).
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# One limiter per API and credential, shared by every client instance in
+# the process
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name, rate, capacity=None, default_pause=1.0, key=None):
+    """
+    Shared limiter for an API (created on first use).
+
+    Args:
+        key: Credential the limit applies to (API token) - clients with
+             the same token share one budget, whatever they sync
+    """
+    with _limiters_lock:
+        if (name, key) not in _limiters:
+            _limiters[(name, key)] = RateLimiter(
+                name, rate, capacity, default_pause=default_pause
+            )
+        return _limiters[(name, key)]
@@ -1,6 +1,34 @@
+import contextvars
+import logging
 import requests
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from clients.http_session import get_session
+from clients.rate_limiter import get_rate_limiter, parse_retry_after
 from config import Config
+from logging_config import PER_RECORD
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Board actions that can change a card we care about
+CARD_CHANGE_ACTIONS = (
+    "createCard",
+    "copyCard",
+    "updateCard",
+    "deleteCard",
+    "moveCardToBoard",
+    "moveCardFromBoard",
+)
+
+# Metadata footer ("---METADATA---\nAIRTABLE_ID: rec123"), matched only
+# where its marker starts
+METADATA_FOOTER = re.compile(
+    re.escape(Config.METADATA_MARKER) + r"\s*" + re.escape(Config.AIRTABLE_ID_PREFIX)
+    + r"\s*(rec[A-Za-z0-9]+)"
+)
 
 class TrelloClient:
     """
@@ -8,50 +36,415 @@ class TrelloClient:
     Includes special logic for parsing metadata from card descriptions.
     """
     
-    def __init__(self):
+    def __init__(self, card_fields=None, board_id=None, api_key=None, token=None, decode=None,
+                 link_field_name=None):
+        """
+        Args:
+            card_fields: Optional card fields to fetch (Trello fields=);
+                         None fetches full card objects
+            board_id, api_key, token: Board to sync (default: from Config)
+            decode: Optional card dict → model (e.g. Card.from_api),
+                    applied to every card as it is decoded; None returns
+                    the raw dicts
+            link_field_name: Text custom field that holds each card's
+                             Airtable ID (created on the board if missing);
+                             None keeps the link in the description only
+        """
+        token = token or Config.TRELLO_TOKEN
+        
         # Trello uses query parameters for auth (not headers)
         self.auth_params = {
-            "key": Config.TRELLO_API_KEY,
-            "token": Config.TRELLO_TOKEN
+            "key": api_key or Config.TRELLO_API_KEY,
+            "token": token
         }
-        self.base_url = "https://api.trello.com/1"
+        self.base_url = Config.TRELLO_API_URL
+        self.board_id = board_id or Config.TRELLO_BOARD_ID
+        self.card_fields = ",".join(card_fields) if card_fields else None
+        self.decode = decode
+        
+        # Looked up (or created) before the first card request
+        self.link_field_name = link_field_name
+        self.link_field_id = None
+        self._link_field_lock = threading.Lock()
+        
+        # Pooled keep-alive connections + transport retries, shared by
+        # every TrelloClient in the process
+        self.session = get_session(
+            "trello",
+            pool_size=Config.HTTP_POOL_SIZE,
+            max_retries=Config.HTTP_MAX_RETRIES,
+            backoff_factor=Config.HTTP_BACKOFF_FACTOR,
+            backoff_jitter=Config.HTTP_BACKOFF_JITTER
+        )
+        self.timeout = Config.TRELLO_TIMEOUT_SECONDS
+        
+        # Shared with every other TrelloClient using this token
+        # (Trello limits requests per token)
+        self.rate_limiter = get_rate_limiter(
+            "Trello",
+            rate=Config.TRELLO_RATE_LIMIT,
+            capacity=Config.TRELLO_RATE_BURST,
+            default_pause=Config.TRELLO_THROTTLE_PAUSE_SECONDS,
+            key=token
+        )
     
-    def get_all_cards_on_board(self):
+    def _request(self, method, url, **kwargs):
         """
-        Fetch all cards from the Trello board.
+        Send a request through the shared Trello rate limiter.
+        
+        429 responses are retried once the limiter's back-off has passed;
+        any other response (including errors) goes back to the caller.
         """
-        url = f"{self.base_url}/boards/{Config.TRELLO_BOARD_ID}/cards"
+        endpoint = self._endpoint(url)
         
-        try:
-            response = requests.get(
-                url,
-                params=self.auth_params,
-                timeout=10
+        for attempt in range(Config.RATE_LIMIT_MAX_RETRIES + 1):
+            if attempt:
+                METRICS.record_retry("trello", "rate_limited")
+            self.rate_limiter.acquire()
+            
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except requests.exceptions.RequestException:
+                METRICS.record_request("trello", method, endpoint, time.perf_counter() - started)
+                raise
+            METRICS.record_request("trello", method, endpoint, time.perf_counter() - started, response)
+            
+            if response.status_code != 429:
+                self.rate_limiter.on_success()
+                return response
+            
+            self.rate_limiter.on_throttled(
+                parse_retry_after(response.headers.get('Retry-After'))
             )
+        
+        return response
+    
+    def _endpoint(self, url):
+        """
+        Metrics label for a request URL: boards/{id}/cards, cards/{id}, ...
+        """
+        parts = url[len(self.base_url):].strip("/").split("/")
+        return "/".join("{id}" if index % 2 else part for index, part in enumerate(parts))
+    
+    def _decode_card(self, card):
+        return self.decode(card) if self.decode else card
+    
+    def _decode_cards(self, cards):
+        return [self.decode(card) for card in cards] if self.decode else cards
+    
+    def _card_params(self, card_fields=None):
+        """
+        Auth params plus the card field projection, if any, and the link
+        custom field values.
+        
+        Raises:
+            requests.exceptions.RequestException if the link field can't
+            be looked up
+        """
+        params = dict(self.auth_params)
+        card_fields = ",".join(card_fields) if card_fields else self.card_fields
+        if card_fields:
+            params["fields"] = card_fields
+        if self.link_field_name:
+            self.resolve_link_field()
+            params["customFieldItems"] = "true"
+        return params
+    
+    def resolve_link_field(self):
+        """
+        ID of the link custom field, creating the field on the board the
+        first time.
+        
+        Raises:
+            requests.exceptions.RequestException on failure
+        """
+        with self._link_field_lock:
+            if self.link_field_id:
+                return self.link_field_id
+            
+            url = f"{self.base_url}/boards/{self.board_id}/customFields"
+            response = self._request("GET", url, params=self.auth_params)
+            response.raise_for_status()
+            for field in response.json():
+                if field.get('name') == self.link_field_name and field.get('type') == 'text':
+                    self.link_field_id = field['id']
+                    return self.link_field_id
             
+            response = self._request("POST", f"{self.base_url}/customFields", params=self.auth_params, json={
+                "idModel": self.board_id,
+                "modelType": "board",
+                "name": self.link_field_name,
+                "type": "text",
+                "pos": "bottom",
+                "display_cardFront": False,
+            })
             response.raise_for_status()
-            cards = response.json()
-            print(f"✓ Fetched {len(cards)} cards from Trello")
+            self.link_field_id = response.json()['id']
+            logger.info("✓ Created Trello custom field '%s' for card links", self.link_field_name)
+            return self.link_field_id
+    
+    def set_card_link(self, card_id, airtable_id):
+        """
+        Store a card's Airtable ID in the link custom field.
+        
+        Returns:
+            True, or None on failure
+        """
+        try:
+            url = f"{self.base_url}/cards/{card_id}/customField/{self.resolve_link_field()}/item"
+            response = self._request("PUT", url, params=self.auth_params,
+                                     json={"value": {"text": airtable_id}})
+            
+            response.raise_for_status()
+            return True
+            
+        except requests.exceptions.RequestException as e:
+            logger.error("✗ Error linking Trello card %s: %s", card_id, e)
+            return None
+    
+    def get_all_cards_on_board(self):
+        """
+        Fetch all cards from the Trello board.
+        """
+        try:
+            cards = self.get_board_cards()
+            logger.info("✓ Fetched %d cards from Trello", len(cards))
             return cards
             
         except requests.exceptions.RequestException as e:
-            print(f"✗ Error fetching Trello cards: {e}")
+            logger.error("✗ Error fetching Trello cards: %s", e)
             return []
     
+    def get_board_cards(self, card_fields=None):
+        """
+        Fetch all cards from the Trello board.
+        
+        Args:
+            card_fields: Fields to fetch instead of the client's projection
+        
+        Raises:
+            requests.exceptions.RequestException on failure
+        """
+        url = f"{self.base_url}/boards/{self.board_id}/cards"
+        response = self._request("GET", url, params=self._card_params(card_fields))
+        
+        response.raise_for_status()
+        return self._decode_cards(response.json())
+    
+    def get_cards_in_list(self, list_id):
+        """
+        Fetch the open cards of one list (per-list endpoint).
+        
+        Raises:
+            requests.exceptions.RequestException on failure
+        """
+        url = f"{self.base_url}/lists/{list_id}/cards"
+        response = self._request("GET", url, params=self._card_params())
+        
+        response.raise_for_status()
+        return self._decode_cards(response.json())
+    
+    def get_cards_in_lists(self, list_ids):
+        """
+        Fetch the cards of several lists concurrently.
+        
+        Returns:
+            All cards of the given lists, or None if any list failed (a
+            partial result would look like cards had left the lists)
+        """
+        list_ids = list(list_ids)
+        if not list_ids:
+            return []
+        
+        try:
+            with ThreadPoolExecutor(max_workers=len(list_ids)) as pool:
+                futures = [
+                    pool.submit(contextvars.copy_context().run, self.get_cards_in_list, list_id)
+                    for list_id in list_ids
+                ]
+                pages = [future.result() for future in futures]
+        except requests.exceptions.RequestException as e:
+            logger.error("✗ Error fetching Trello list cards: %s", e)
+            return None
+        
+        cards = [card for page in pages for card in page]
+        logger.info("✓ Fetched %d cards from %d Trello lists", len(cards), len(list_ids))
+        return cards
+    
+    def get_card(self, card_id, card_fields=None):
+        """
+        Fetch a single card (used for cards first seen in the change feed).
+        
+        Args:
+            card_fields: Fields to fetch instead of the client's projection
+        """
+        url = f"{self.base_url}/cards/{card_id}"
+        
+        try:
+            response = self._request("GET", url, params=self._card_params(card_fields))
+            
+            response.raise_for_status()
+            return self._decode_card(response.json())
+            
+        except requests.exceptions.RequestException as e:
+            logger.error("✗ Error fetching Trello card %s: %s", card_id, e)
+            return None
+    
+    def get_board_actions(self, since=None, limit=1000):
+        """
+        Fetch card actions on the board newer than a cursor.
+        
+        Args:
+            since: Action ID (or ISO date) - only newer actions are returned.
+                   None returns the latest page only.
+            limit: Page size (Trello max is 1000)
+        
+        Returns:
+            Actions newest-first, or None if the request failed
+        """
+        url = f"{self.base_url}/boards/{self.board_id}/actions"
+        all_actions = []
+        before = None
+        
+        try:
+            while True:
+                params = {
+                    **self.auth_params,
+                    "filter": ",".join(CARD_CHANGE_ACTIONS),
+                    "limit": limit,
+                }
+                if since:
+                    params["since"] = since
+                if before:
+                    params["before"] = before
+                
+                response = self._request("GET", url, params=params)
+                
+                response.raise_for_status()
+                actions = response.json()
+                all_actions.extend(actions)
+                
+                # Full page means there may be older actions left to read
+                if not since or len(actions) < limit:
+                    break
+                before = actions[-1]['id']
+            
+            return all_actions
+            
+        except requests.exceptions.RequestException as e:
+            logger.error("✗ Error fetching Trello board actions: %s", e)
+            return None
+    
+    def card_changes_from_actions(self, actions):
+        """
+        Fold board actions into per-card changes.
+        
+        Args:
+            actions: Actions newest-first (as returned by get_board_actions)
+        
+        Returns:
+            (changes, removed_ids) - changes is {card_id: partial card dict}
+            with only the fields the actions told us about (id, name,
+            idList, desc); removed_ids are cards that left the board.
+        """
+        changes = {}
+        removed_ids = set()
+        
+        # Apply oldest first so later actions win
+        for action in reversed(actions):
+            action_type = action.get('type')
+            data = action.get('data', {})
+            card_data = data.get('card') or {}
+            card_id = card_data.get('id')
+            if not card_id:
+                continue
+            
+            if action_type in ('deleteCard', 'moveCardFromBoard') or card_data.get('closed'):
+                removed_ids.add(card_id)
+                changes.pop(card_id, None)
+                continue
+            
+            removed_ids.discard(card_id)
+            change = changes.setdefault(card_id, {'id': card_id})
+            
+            for field in ('name', 'desc', 'idList'):
+                if field in card_data:
+                    change[field] = card_data[field]
+            
+            # Moves carry the new list in listAfter, creates in list
+            list_data = data.get('listAfter') or data.get('list')
+            if list_data and list_data.get('id'):
+                change['idList'] = list_data['id']
+        
+        return changes, removed_ids
+    
     def extract_airtable_id_from_description(self, description):
         """
-        Parse the Airtable ID from card description using regex.
+        Parse the Airtable ID from the card description's metadata footer.
         
+        The footer is appended last, so its marker is searched from the
+        end and the precompiled pattern only runs there - the rest of the
+        text is never scanned. A description without the marker (e.g. a
+        user deleted it) has no link.
         """
+        match = self._match_metadata_footer(description)
+        return match.group(1) if match else None
+    
+    def _match_metadata_footer(self, description):
         if not description:
             return None
         
-        pattern = r'AIRTABLE_ID:\s*(rec[A-Za-z0-9]+)'
-        match = re.search(pattern, description)
- 
-        return match.group(1) if match else None
+        start = description.rfind(Config.METADATA_MARKER)
+        if start < 0:
+            return None
+        
+        return METADATA_FOOTER.match(description, start)
     
-    def create_card(self, name, description, list_id):
+    def split_generated_description(self, description):
+        """
+        Split a card description around the part this sync writes: the
+        paragraph right above the metadata footer (the content passed to
+        build_card_description_with_metadata) and the footer itself.
+        
+        Returns:
+            (before, content, after) - user text above the block, the
+            generated content, user text after the footer; None if the
+            description has no footer
+        """
+        match = self._match_metadata_footer(description)
+        if match is None:
+            return None
+        
+        above = description[:match.start()].rstrip()
+        cut = above.rfind("\n\n")
+        if cut < 0:
+            return "", above, description[match.end():]
+        return above[:cut].rstrip(), above[cut + 2:], description[match.end():]
+    
+    def replace_generated_description(self, description, content, airtable_id):
+        """
+        Rewrite the generated content and footer of a description, keeping
+        whatever a user wrote above or below them. A description whose
+        footer was removed keeps all of its text, with the block appended.
+        """
+        generated = self.build_card_description_with_metadata(content, airtable_id)
+        parts = self.split_generated_description(description)
+        if parts is None:
+            before, after = (description or "").rstrip(), ""
+        else:
+            before, _, after = parts
+        
+        return (f"{before}\n\n" if before else "") + generated + after
+    
+    def linked_airtable_id(self, card):
+        """
+        Airtable ID a card is linked to: its link custom field, or the
+        description footer for cards that don't have one (yet).
+        """
+        return card.link or self.extract_airtable_id_from_description(card.desc)
+    
+    def create_card(self, name, description, list_id, link=None):
         """
         Create a new Trello card.
         
@@ -59,6 +452,8 @@ class TrelloClient:
             name: Card title
             description: Card description (will contain metadata footer)
             list_id: Which list to create the card in
+            link: Airtable ID to store in the link custom field (only with
+                  link_field_name; the footer stays as a fallback)
         
         """
         url = f"{self.base_url}/cards"
@@ -73,25 +468,32 @@ class TrelloClient:
         }
         
         try:
-            response = requests.post(
-                url,
-                params=params,
-                timeout=10
-            )
+            response = self._request("POST", url, params=params)
             
             response.raise_for_status()
             card = response.json()
-            print(f"✓ Created Trello card: {name}")
-            return card
+            logger.debug("✓ Created Trello card: %s", name, extra=PER_RECORD)
             
         except requests.exceptions.RequestException as e:
-            print(f"✗ Error creating Trello card '{name}': {e}")
+            logger.error("✗ Error creating Trello card '%s': %s", name, e)
             return None
+        
+        # A card whose field write failed is still linked by its footer
+        if link and self.link_field_name and self.set_card_link(card['id'], link):
+            card['customFieldItems'] = [{'idCustomField': self.link_field_id, 'value': {'text': link}}]
+        return self._decode_card(card)
     
-    def update_card(self, card_id, name=None, description=None, list_id=None):
+    def update_card(self, card_id, name=None, description=None, list_id=None,
+                    details=None, airtable_id=None):
         """
         Update an existing Trello card.
         Args are optional - only updates fields that are provided.
+        
+        Args:
+            details: New generated content for the description (footer
+                     from airtable_id). Only the sync's own block is
+                     replaced, user notes around it are kept - costs one
+                     GET for the current description.
         """
         url = f"{self.base_url}/cards/{card_id}"
         
@@ -107,18 +509,21 @@ class TrelloClient:
             params["idList"] = list_id
         
         try:
-            response = requests.put(
-                url,
-                params=params,
-                timeout=10
-            )
+            if details is not None:
+                current = self._request("GET", url, params={**self.auth_params, "fields": "desc"})
+                current.raise_for_status()
+                params["desc"] = self.replace_generated_description(
+                    current.json().get('desc'), details, airtable_id
+                )
+            
+            response = self._request("PUT", url, params=params)
             
             response.raise_for_status()
-            print(f"✓ Updated Trello card: {card_id}")
-            return response.json()
+            logger.debug("✓ Updated Trello card: %s", card_id, extra=PER_RECORD)
+            return self._decode_card(response.json())
             
         except requests.exceptions.RequestException as e:
-            print(f"✗ Error updating Trello card {card_id}: {e}")
+            logger.error("✗ Error updating Trello card %s: %s", card_id, e)
             return None
     
     def build_card_description_with_metadata(self, content, airtable_id):
@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -10,6 +11,10 @@ class Config:
     Think of this like exporting const CONFIG in JS.
     """
     
+    # API endpoints (override to point at a local stand-in, e.g. bench/fake_server.py)
+    AIRTABLE_API_URL = os.getenv('AIRTABLE_API_URL', 'https://api.airtable.com/v0').rstrip('/')
+    TRELLO_API_URL = os.getenv('TRELLO_API_URL', 'https://api.trello.com/1').rstrip('/')
+    
     # Airtable Settings
     AIRTABLE_API_KEY = os.getenv('AIRTABLE_API_KEY')
     AIRTABLE_BASE_ID = os.getenv('AIRTABLE_BASE_ID')
@@ -24,11 +29,126 @@ class Config:
     
     # Sync Settings
     SYNC_INTERVAL_SECONDS = int(os.getenv('SYNC_INTERVAL_SECONDS', 30))
+    # Adaptive polling: drop to the minimum after a busy cycle, back off
+    # towards the maximum while idle (SYNC_INTERVAL_SECONDS is the start)
+    SYNC_ADAPTIVE = os.getenv('SYNC_ADAPTIVE', 'true').lower() == 'true'
+    SYNC_MIN_INTERVAL_SECONDS = int(os.getenv('SYNC_MIN_INTERVAL_SECONDS', 5))
+    SYNC_MAX_INTERVAL_SECONDS = int(os.getenv('SYNC_MAX_INTERVAL_SECONDS', 300))
+    SYNC_BACKOFF_FACTOR = float(os.getenv('SYNC_BACKOFF_FACTOR', 2.0))
+    
+    # Where sync cursors (e.g. the Airtable watermark) survive restarts
+    SYNC_STATE_PATH = os.getenv('SYNC_STATE_PATH', '.sync_state.json')
+    
+    # SQLite index of Airtable record ↔ Trello card links
+    LINK_INDEX_PATH = os.getenv('LINK_INDEX_PATH', 'sync_links.db')
+    
+    # SQLite journal of writes in flight - replayed on startup after a crash
+    OUTBOX_PATH = os.getenv('OUTBOX_PATH', 'sync_outbox.db')
+    
+    # Incremental Airtable fetch: only pull records modified since the last
+    # cycle. Needs a "Last modified time" field on the table.
+    AIRTABLE_INCREMENTAL = os.getenv('AIRTABLE_INCREMENTAL', 'false').lower() == 'true'
+    AIRTABLE_LAST_MODIFIED_FIELD = os.getenv('AIRTABLE_LAST_MODIFIED_FIELD', 'Last Modified')
+    # Re-read this many seconds before the watermark to absorb clock skew
+    AIRTABLE_WATERMARK_OVERLAP_SECONDS = int(os.getenv('AIRTABLE_WATERMARK_OVERLAP_SECONDS', 60))
+    
+    # Trello change feed: read board actions since the last cycle instead of
+    # listing every card
+    TRELLO_CHANGE_FEED = os.getenv('TRELLO_CHANGE_FEED', 'false').lower() == 'true'
+    # Standalone reverse pass (python main.py reverse): only look at
+    # trigger-list cards active since the last reverse pass
+    TRELLO_REVERSE_ACTIVITY_FILTER = os.getenv('TRELLO_REVERSE_ACTIVITY_FILTER', 'false').lower() == 'true'
+    
+    # Rate limits (token bucket per API, shared by all requests)
+    # Airtable: ~5 req/s per base, 30s penalty after a 429
+    AIRTABLE_RATE_LIMIT = float(os.getenv('AIRTABLE_RATE_LIMIT', 5))
+    AIRTABLE_RATE_BURST = float(os.getenv('AIRTABLE_RATE_BURST', 5))
+    AIRTABLE_THROTTLE_PAUSE_SECONDS = float(os.getenv('AIRTABLE_THROTTLE_PAUSE_SECONDS', 30))
+    # Trello: 100 requests per 10s per token
+    TRELLO_RATE_LIMIT = float(os.getenv('TRELLO_RATE_LIMIT', 10))
+    TRELLO_RATE_BURST = float(os.getenv('TRELLO_RATE_BURST', 10))
+    TRELLO_THROTTLE_PAUSE_SECONDS = float(os.getenv('TRELLO_THROTTLE_PAUSE_SECONDS', 10))
+    # HTTP transport (one pooled keep-alive session per client)
+    AIRTABLE_TIMEOUT_SECONDS = float(os.getenv('AIRTABLE_TIMEOUT_SECONDS', 10))
+    TRELLO_TIMEOUT_SECONDS = float(os.getenv('TRELLO_TIMEOUT_SECONDS', 10))
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+    # Retries for connect errors / 5xx, with exponential backoff + jitter
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 3))
+    HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5))
+    HTTP_BACKOFF_JITTER = float(os.getenv('HTTP_BACKOFF_JITTER', 0.5))
+    
+    # Worker threads for outbound writes (rate limits still apply)
+    WRITE_WORKERS = int(os.getenv('WRITE_WORKERS', 4))
+    # Backfill (main.py backfill): creates per checkpoint / progress line
+    BACKFILL_CHUNK_SIZE = int(os.getenv('BACKFILL_CHUNK_SIZE', 200))
+    # How many times one request is retried after a 429
+    RATE_LIMIT_MAX_RETRIES = int(os.getenv('RATE_LIMIT_MAX_RETRIES', 5))
+    
+    # Multi-pipeline mode: JSON file listing many table ↔ board pairs
+    # (see services/pipelines.py). Empty = the single pair above.
+    PIPELINES_PATH = os.getenv('PIPELINES_PATH', '')
+    # Pipelines syncing at the same time (they share WRITE_WORKERS and
+    # the per-token rate limits)
+    PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', 4))
+    
+    # Sharding: SHARD_COUNT > 1 lets several workers split the work by
+    # hash of the record ID (SHARD_BY=record) or of the pipeline name
+    # (SHARD_BY=pipeline, needs PIPELINES_PATH). Leases live in a SQLite
+    # file every worker on the host shares.
+    SHARD_COUNT = int(os.getenv('SHARD_COUNT', 1))
+    SHARD_BY = os.getenv('SHARD_BY', 'record').lower()
+    SHARD_LEASE_PATH = os.getenv('SHARD_LEASE_PATH', 'sync_shards.db')
+    # A dead worker's shards are taken over after this long
+    SHARD_LEASE_SECONDS = int(os.getenv('SHARD_LEASE_SECONDS', 60))
+    # A claimed card create blocks other workers this long (> one cycle)
+    SHARD_CREATE_CLAIM_SECONDS = int(os.getenv('SHARD_CREATE_CLAIM_SECONDS', 600))
+    WORKER_ID = os.getenv('WORKER_ID') or f"{socket.gethostname()}-{os.getpid()}"
+    
+    # Sync engine: "threads" (SyncService) or "async" (AsyncSyncService)
+    SYNC_ENGINE = os.getenv('SYNC_ENGINE', 'threads').lower()
+    # Max concurrent requests for the async engine (keep <= HTTP_POOL_SIZE)
+    ASYNC_MAX_IN_FLIGHT = int(os.getenv('ASYNC_MAX_IN_FLIGHT', 8))
+    
+    # Webhook receiver (python main.py serve)
+    WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+    WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', 8080))
+    # Public base URL the webhooks were registered with (Trello signs
+    # body + callback URL, so it must match exactly)
+    WEBHOOK_PUBLIC_URL = os.getenv('WEBHOOK_PUBLIC_URL', '').rstrip('/')
+    # Trello app secret / Airtable webhook macSecretBase64
+    TRELLO_WEBHOOK_SECRET = os.getenv('TRELLO_WEBHOOK_SECRET')
+    AIRTABLE_WEBHOOK_MAC_SECRET = os.getenv('AIRTABLE_WEBHOOK_MAC_SECRET')
+    # Wait for this much quiet before syncing a burst of events...
+    WEBHOOK_DEBOUNCE_SECONDS = float(os.getenv('WEBHOOK_DEBOUNCE_SECONDS', 0.5))
+    # ...but never hold an event longer than this
+    WEBHOOK_MAX_DELAY_SECONDS = float(os.getenv('WEBHOOK_MAX_DELAY_SECONDS', 5))
+    # Full polling cycle as a safety net for missed webhooks
+    WEBHOOK_RECONCILE_SECONDS = int(os.getenv('WEBHOOK_RECONCILE_SECONDS', 900))
+    
+    # Metrics endpoint for continuous / serve mode (0 disables it):
+    # GET /metrics (Prometheus text) and /metrics/cycle (last cycle, JSON)
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 9108))
+    # Append every cycle's JSON summary to this file (empty = off)
+    METRICS_SUMMARY_PATH = os.getenv('METRICS_SUMMARY_PATH', '')
+    
+    # Logging: DEBUG adds one line per record/write, INFO is one summary
+    # line per direction per cycle. LOG_FORMAT=json for log shippers.
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()
+    # At DEBUG, keep only every Nth per-record line (1 = all of them)
+    LOG_RECORD_SAMPLE_EVERY = int(os.getenv('LOG_RECORD_SAMPLE_EVERY', 1))
     
     # Metadata identifier used in Trello card descriptions
     METADATA_MARKER = "---METADATA---"
     AIRTABLE_ID_PREFIX = "AIRTABLE_ID:"
     
+    # Where cards carry their lead's Airtable ID: "description" (the
+    # metadata footer) or "custom_field" (a text custom field on the
+    # board - run `python main.py migrate-links` once after switching)
+    LINK_STORAGE = os.getenv('LINK_STORAGE', 'description').lower()
+    TRELLO_LINK_FIELD_NAME = os.getenv('TRELLO_LINK_FIELD_NAME', 'Airtable ID')
+    
     @classmethod
     def validate(cls):
         required_vars = {
@@ -46,4 +166,22 @@ class Config:
         if missing:
             raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
         
+        if cls.LINK_STORAGE not in ('description', 'custom_field'):
+            raise ValueError("LINK_STORAGE must be 'description' or 'custom_field'")
+        
+        return True
+    
+    @classmethod
+    def validate_webhooks(cls):
+        """
+        Extra settings needed by serve mode. Each webhook source is only
+        accepted when its secret is set, so at least one must be.
+        """
+        if not (cls.TRELLO_WEBHOOK_SECRET or cls.AIRTABLE_WEBHOOK_MAC_SECRET):
+            raise ValueError(
+                "Set TRELLO_WEBHOOK_SECRET and/or AIRTABLE_WEBHOOK_MAC_SECRET to run serve mode"
+            )
+        if cls.TRELLO_WEBHOOK_SECRET and not cls.WEBHOOK_PUBLIC_URL:
+            raise ValueError("WEBHOOK_PUBLIC_URL is required to verify Trello webhooks")
+        
         return True
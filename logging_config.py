@@ -0,0 +1,108 @@
+"""
+Leveled logging for the sync, as text or one JSON object per line.
+
+Modules log through the standard library (logging.getLogger(__name__));
+main.py calls configure_logging() once at startup.
+
+Per-record messages (one per lead/card/write) are logged at DEBUG with
+extra=PER_RECORD, so at INFO they cost a level check and nothing else.
+With DEBUG on, LOG_RECORD_SAMPLE_EVERY keeps only every Nth of them.
+"""
+import contextvars
+import json
+import logging
+import sys
+import threading
+from datetime import datetime, timezone
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s %(pipeline_tag)s%(message)s"
+
+# Pass as extra= to mark a message that repeats once per record
+PER_RECORD = {"per_record": True}
+
+# Pipeline whose work is being logged (multi-pipeline mode); set by the
+# pipeline runner, inherited by write workers through the context
+current_pipeline = contextvars.ContextVar("current_pipeline", default=None)
+
+
+class PipelineTag(logging.Filter):
+    """
+    Tags every message with the current pipeline, if any.
+    """
+
+    def filter(self, record):
+        record.pipeline = current_pipeline.get()
+        record.pipeline_tag = f"[{record.pipeline}] " if record.pipeline else ""
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    {"ts", "level", "logger", "msg", ...} - structured fields passed as
+    extra={"data": {...}} are merged in.
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage().strip(),
+        }
+        if getattr(record, "pipeline", None):
+            entry["pipeline"] = record.pipeline
+        data = getattr(record, "data", None)
+        if data:
+            entry.update(data)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RecordSampler(logging.Filter):
+    """
+    Lets every Nth per-record message through, counted per message
+    template (so rare messages aren't starved by frequent ones).
+    Messages not marked PER_RECORD always pass.
+    """
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = max(1, every)
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if self.every == 1 or not getattr(record, "per_record", False):
+            return True
+        with self.lock:
+            seen = self.counts.get(record.msg, 0)
+            self.counts[record.msg] = seen + 1
+        return seen % self.every == 0
+
+
+def configure_logging(level="INFO", fmt="text", sample_every=1, stream=None):
+    """
+    Send all logs to stdout (or `stream`) in the chosen format.
+
+    Args:
+        level: DEBUG, INFO, WARNING, ERROR
+        fmt: "text" (human-readable) or "json" (one object per line)
+        sample_every: Keep 1 in N per-record DEBUG messages
+    """
+    handler = logging.StreamHandler(stream or sys.stdout)
+    if fmt == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handler.addFilter(RecordSampler(sample_every))
+    handler.addFilter(PipelineTag())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+    # Connection-level chatter from the HTTP stack is never per-cycle news
+    logging.getLogger("urllib3").setLevel(logging.WARNING)
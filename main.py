@@ -1,7 +1,220 @@
+import asyncio
+import atexit
+import logging
+import queue
+import threading
 import time
 import sys
+from datetime import datetime, timezone
 from config import Config
+from logging_config import configure_logging
+from metrics import METRICS
 from services.sync_service import SyncService
+from services.async_sync_service import AsyncSyncService
+from services.scheduler import AdaptiveScheduler
+from services.metrics_server import MetricsServer
+from services.pipeline_runner import PipelineRunner
+from services.pipelines import load_pipelines
+from services.shard_coordinator import ShardCoordinator, PARTITION_PIPELINE, PARTITION_RECORD
+from services.write_executor import WriteExecutor
+from services.webhook_server import WebhookReceiver, WebhookWorker
+
+logger = logging.getLogger("sync")
+
+
+def get_option(name, default=None):
+    """
+    Value of a `--name value` command-line option, or default.
+    """
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+
+def get_engine():
+    """
+    Sync engine to use: --engine <name> on the command line, else SYNC_ENGINE.
+    """
+    return get_option("--engine", Config.SYNC_ENGINE).lower()
+
+
+def run(result):
+    """
+    Run a sync step - the async engine returns coroutines, the threaded
+    engine has already done the work.
+    """
+    if asyncio.iscoroutine(result):
+        return asyncio.run(result)
+    return result
+
+
+def start_metrics_server():
+    """
+    Expose metrics for scraping on a background thread (long-running modes).
+    """
+    if not Config.METRICS_PORT:
+        return None
+    
+    try:
+        server = MetricsServer((Config.METRICS_HOST, Config.METRICS_PORT), METRICS)
+    except OSError as e:
+        logger.warning("⚠ Metrics endpoint disabled (%s:%s: %s)", Config.METRICS_HOST, Config.METRICS_PORT, e)
+        return None
+    
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info("📈 Metrics on http://%s:%s/metrics", Config.METRICS_HOST, Config.METRICS_PORT)
+    return server
+
+
+def start_shards(multi_pipeline=False):
+    """
+    Join the other workers (SHARD_COUNT > 1) and take our share of the
+    shards. Leases are handed back when the process exits.
+    
+    Returns:
+        ShardCoordinator, or None when sharding is off
+    
+    Raises:
+        ValueError for an unusable sharding setup
+    """
+    if Config.SHARD_COUNT <= 1:
+        return None
+    if Config.SHARD_BY not in (PARTITION_RECORD, PARTITION_PIPELINE):
+        raise ValueError(f"SHARD_BY must be '{PARTITION_RECORD}' or '{PARTITION_PIPELINE}'")
+    if Config.SHARD_BY == PARTITION_PIPELINE and not multi_pipeline:
+        raise ValueError("SHARD_BY=pipeline needs PIPELINES_PATH")
+    
+    shards = ShardCoordinator(
+        Config.SHARD_LEASE_PATH,
+        Config.SHARD_COUNT,
+        Config.WORKER_ID,
+        lease_seconds=Config.SHARD_LEASE_SECONDS,
+        claim_seconds=Config.SHARD_CREATE_CLAIM_SECONDS,
+        partition=Config.SHARD_BY
+    )
+    shards.start()
+    atexit.register(shards.stop)
+    return shards
+
+
+def serve(sync_service):
+    """
+    Push mode: receive webhooks and sync only what they report, with a
+    slow full reconcile as a safety net.
+    """
+    try:
+        Config.validate_webhooks()
+    except ValueError as e:
+        logger.error("❌ Configuration error: %s", e)
+        return
+    
+    events = queue.Queue()
+    receiver = WebhookReceiver(
+        (Config.WEBHOOK_HOST, Config.WEBHOOK_PORT),
+        events,
+        public_url=Config.WEBHOOK_PUBLIC_URL,
+        trello_secret=Config.TRELLO_WEBHOOK_SECRET,
+        airtable_mac_secret=Config.AIRTABLE_WEBHOOK_MAC_SECRET
+    )
+    # Receiver threads only queue events; all syncing stays on this thread
+    threading.Thread(target=receiver.serve_forever, daemon=True).start()
+    start_metrics_server()
+    
+    logger.info("📡 Listening for webhooks on %s:%s (reconcile every %ss) - press Ctrl+C to stop",
+                Config.WEBHOOK_HOST, Config.WEBHOOK_PORT, Config.WEBHOOK_RECONCILE_SECONDS)
+    
+    worker = WebhookWorker(
+        events,
+        sync_changes=sync_service.sync_changes,
+        reconcile=lambda: run(sync_service.run_sync_cycle()),
+        debounce=Config.WEBHOOK_DEBOUNCE_SECONDS,
+        max_delay=Config.WEBHOOK_MAX_DELAY_SECONDS,
+        reconcile_interval=Config.WEBHOOK_RECONCILE_SECONDS
+    )
+    
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Webhook receiver stopped by user")
+    finally:
+        receiver.shutdown()
+
+
+def run_pipelines(engine):
+    """
+    Multi-pipeline mode (PIPELINES_PATH): every table ↔ board pair in the
+    file, scheduled on one shared pool with shared writers, sessions and
+    rate limits. Supports the continuous loop and init.
+    """
+    try:
+        pipelines = load_pipelines(Config.PIPELINES_PATH)
+    except ValueError as e:
+        logger.error("❌ Configuration error: %s", e)
+        return
+    
+    engines = {"threads": SyncService, "async": AsyncSyncService}
+    if engine not in engines:
+        logger.error("❌ Unknown sync engine: %s (use 'threads' or 'async')", engine)
+        return
+    
+    mode = sys.argv[1] if len(sys.argv) > 1 and not sys.argv[1].startswith("--") else None
+    if mode not in (None, "init"):
+        logger.error("❌ '%s' runs a single pipeline - unset PIPELINES_PATH to use it", mode)
+        return
+    
+    try:
+        shards = start_shards(multi_pipeline=True)
+    except ValueError as e:
+        logger.error("❌ Configuration error: %s", e)
+        return
+    
+    METRICS.summary_path = Config.METRICS_SUMMARY_PATH or None
+    
+    # One write pool for all pipelines; each gets its own queue on it
+    writer = WriteExecutor(Config.WRITE_WORKERS)
+    
+    def make_service(pipeline):
+        service = engines[engine](pipeline, writer.share(), shards)
+        # A failed replay fails the pipeline's first cycle - retried later
+        service.recover_outbox()
+        return service
+    
+    runner = PipelineRunner(
+        pipelines,
+        make_service=make_service,
+        workers=Config.PIPELINE_WORKERS,
+        scheduler_options={
+            "base_interval": Config.SYNC_INTERVAL_SECONDS,
+            "min_interval": Config.SYNC_MIN_INTERVAL_SECONDS,
+            "max_interval": Config.SYNC_MAX_INTERVAL_SECONDS,
+            "backoff_factor": Config.SYNC_BACKOFF_FACTOR,
+            "adaptive": Config.SYNC_ADAPTIVE,
+        },
+        owns=shards.owns if shards and shards.partition == PARTITION_PIPELINE else None
+    )
+    logger.info("🔀 %d pipelines (%s engine, %d at a time): %s", len(pipelines), engine,
+                Config.PIPELINE_WORKERS, ", ".join(pipeline.name for pipeline in pipelines))
+    
+    if mode == "init":
+        failed = runner.run_all(lambda service: service.initial_sync())
+        runner.shutdown()
+        if failed:
+            logger.error("❌ Initial sync failed for %d pipeline(s): %s",
+                         len(failed), ", ".join(sorted(failed)))
+        else:
+            logger.info("✅ Initial sync complete for every pipeline. Exiting.")
+        return
+    
+    start_metrics_server()
+    logger.info("🔁 Starting continuous sync - press Ctrl+C to stop")
+    try:
+        runner.run_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Sync stopped by user")
+    finally:
+        runner.shutdown()
 
 def main():
     """
@@ -9,56 +222,180 @@ def main():
     
     Modes:
     - python main.py init      : Run initial sync only
+    - python main.py backfill  : Resumable initial sync for large bases
+                                 (checkpoints, progress + ETA); stage it
+                                 with --limit N and --since <ISO date>
+    - python main.py migrate-links : Copy footer links into the Trello
+                                     link custom field (LINK_STORAGE=custom_field)
+    - python main.py serve     : Webhook push mode (+ periodic reconcile)
+    - python main.py reverse   : Run Trello → Airtable once, fetching only
+                                 the trigger lists (e.g. DONE)
+    - python main.py plan      : Dry run - print the operations a cycle
+                                 would perform, without writing anything
     - python main.py           : Run continuous sync loop
+    - python main.py --full-scan : Continuous loop, but start with a full
+                                   Airtable scan (ignores the watermark)
+    - python main.py --engine async : Use the asyncio engine (default:
+                                      SYNC_ENGINE, "threads")
+    
+    With PIPELINES_PATH set, the continuous loop and init run every
+    pipeline in that file instead.
     """
     
-    print("=" * 60)
-    print("  AIRTABLE ↔ TRELLO BI-DIRECTIONAL SYNC")
-    print("  Lead Tracker → Work Tracker Integration")
-    print("=" * 60)
+    configure_logging(Config.LOG_LEVEL, Config.LOG_FORMAT, Config.LOG_RECORD_SAMPLE_EVERY)
+    logger.info("AIRTABLE ↔ TRELLO BI-DIRECTIONAL SYNC (Lead Tracker → Work Tracker)")
+    
+    if Config.PIPELINES_PATH:
+        run_pipelines(get_engine())
+        return
     
     # Validate configuration
     try:
         Config.validate()
-        print("✓ Configuration validated\n")
+        logger.info("✓ Configuration validated")
+    except ValueError as e:
+        logger.error("❌ Configuration error: %s - make sure your .env file has all required variables", e)
+        return
+    
+    # Dry runs read everything; every other mode works on our shards only
+    try:
+        shards = None if sys.argv[1:2] == ["plan"] else start_shards()
     except ValueError as e:
-        print(f"❌ Configuration error: {e}")
-        print("\nMake sure your .env file has all required variables.")
+        logger.error("❌ Configuration error: %s", e)
         return
     
     # Initialize sync service
-    sync_service = SyncService()
+    engine = get_engine()
+    if engine == "async":
+        sync_service = AsyncSyncService(shards=shards)
+    elif engine == "threads":
+        sync_service = SyncService(shards=shards)
+    else:
+        logger.error("❌ Unknown sync engine: %s (use 'threads' or 'async')", engine)
+        return
+    logger.info("⚙ Sync engine: %s", engine)
+    
+    # Finish the writes a crashed run left in flight (dry runs write nothing)
+    if sys.argv[1:2] != ["plan"]:
+        try:
+            sync_service.recover_outbox()
+        except Exception as e:
+            logger.error("❌ Outbox replay failed: %s - the entries are kept for the next start", e)
+    
+    # One JSON line per cycle, in every mode
+    METRICS.summary_path = Config.METRICS_SUMMARY_PATH or None
     
     # Check if running in "init" mode
     if len(sys.argv) > 1 and sys.argv[1] == "init":
-        print("Running INITIAL SYNC mode...\n")
-        sync_service.initial_sync()
-        print("\n✅ Initial sync complete. Exiting.")
+        logger.info("Running INITIAL SYNC mode...")
+        run(sync_service.initial_sync())
+        logger.info("✅ Initial sync complete. Exiting.")
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "backfill":
+        limit = get_option("--limit")
+        if limit is not None and not limit.isdigit():
+            logger.error("❌ --limit must be a number of cards, got '%s'", limit)
+            return
+        since = get_option("--since")
+        if since is not None:
+            # Goes into an Airtable formula - only a real date may get there
+            try:
+                since = datetime.fromisoformat(since.replace('Z', '+00:00'))
+            except ValueError:
+                logger.error("❌ --since must be an ISO-8601 date (e.g. 2024-01-31), got '%s'", since)
+                return
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            since = since.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        logger.info("Running BACKFILL mode...")
+        try:
+            sync_service.backfill(
+                limit=int(limit) if limit is not None else None,
+                since=since
+            )
+        except KeyboardInterrupt:
+            logger.info("🛑 Backfill paused - run it again to resume")
+            return
+        except Exception as e:
+            logger.error("❌ Backfill failed: %s - run it again to resume", e)
+            return
+        logger.info("✅ Backfill run finished. Exiting.")
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate-links":
+        logger.info("Running LINK MIGRATION mode...")
+        try:
+            sync_service.migrate_links()
+        except Exception as e:
+            logger.error("❌ Link migration failed: %s", e)
+            return
+        logger.info("✅ Link migration complete. Exiting.")
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "plan":
+        logger.info("Running PLAN (dry run) mode - nothing will be written...")
+        try:
+            plan = sync_service.plan_cycle()
+        except Exception as e:
+            logger.error("❌ Dry run failed: %s", e)
+            return
+        print(f"\n📋 Planned operations ({len(plan)}):")
+        for op in plan:
+            print(f"  {op.describe()}")
+        print(f"\n   Summary: {plan.summary()}")
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "reverse":
+        logger.info("Running REVERSE SYNC mode (trigger lists only)...")
+        sync_service.sync_trello_to_airtable()
+        logger.info("✅ Reverse sync complete. Exiting.")
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve(sync_service)
         return
     
     # Continuous sync mode
-    print(f"🔁 Starting continuous sync (interval: {Config.SYNC_INTERVAL_SECONDS}s)")
-    print("   Press Ctrl+C to stop\n")
+    scheduler = AdaptiveScheduler(
+        base_interval=Config.SYNC_INTERVAL_SECONDS,
+        min_interval=Config.SYNC_MIN_INTERVAL_SECONDS,
+        max_interval=Config.SYNC_MAX_INTERVAL_SECONDS,
+        backoff_factor=Config.SYNC_BACKOFF_FACTOR,
+        adaptive=Config.SYNC_ADAPTIVE
+    )
+    
+    if Config.SYNC_ADAPTIVE:
+        logger.info("🔁 Starting continuous sync (adaptive interval: %s-%ss) - press Ctrl+C to stop",
+                    scheduler.min_interval, scheduler.max_interval)
+    else:
+        logger.info("🔁 Starting continuous sync (interval: %ss) - press Ctrl+C to stop",
+                    Config.SYNC_INTERVAL_SECONDS)
+    start_metrics_server()
     
     cycle_count = 0
     
+    # Explicit full scan only applies to the first cycle
+    full_scan = "--full-scan" in sys.argv
+    
     try:
         while True:
             cycle_count += 1
-            print(f"{'─' * 60}")
-            print(f"CYCLE #{cycle_count} - {time.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"{'─' * 60}")
+            logger.info("── CYCLE #%d ──", cycle_count)
             
-            sync_service.run_sync_cycle()
+            started = time.monotonic()
+            changes = run(sync_service.run_sync_cycle(full_scan=full_scan))
+            full_scan = False
             
-            print(f"⏳ Waiting {Config.SYNC_INTERVAL_SECONDS}s until next sync...")
-            time.sleep(Config.SYNC_INTERVAL_SECONDS)
+            # Next cycle is scheduled from this cycle's start time
+            decision = scheduler.record_cycle(changes, time.monotonic() - started)
+            logger.info("📊 Cycle summary: %s", decision)
+            time.sleep(decision.sleep_seconds)
             
     except KeyboardInterrupt:
-        print("\n\n🛑 Sync stopped by user")
-        print(f"   Total cycles: {cycle_count}")
-    except Exception as e:
-        print(f"\n\n❌ Fatal error: {e}")
+        logger.info("🛑 Sync stopped by user after %d cycles", cycle_count)
+    except Exception:
+        logger.exception("❌ Fatal error")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,373 @@
+"""
+In-process metrics: counters, gauges and histograms rendered in the
+Prometheus text format, plus per-cycle phase timings.
+
+Shared by the clients (request metrics) and the sync services (phases,
+cycles), like Config. Nothing here talks to the network - see
+services/metrics_server.py for the scrape endpoint.
+"""
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Cycle the current thread/task is working for. Write workers and
+# executor threads get it through contextvars.copy_context(), so
+# concurrent pipelines each count into their own cycle.
+_current_cycle = contextvars.ContextVar("sync_cycle", default=None)
+
+# Seconds - request latencies
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Seconds - sync phases and whole cycles
+PHASE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+# Seconds - change made in one system → written to the other
+PROPAGATION_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, help_text, labels=()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        # {label values: value}
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, value=1, **labels):
+        with self.registry.lock:
+            key = self._key(labels)
+            self.values[key] = self.values.get(key, 0) + value
+
+    def total(self, **labels):
+        """
+        Sum over every series matching the given labels.
+        """
+        with self.registry.lock:
+            wanted = {self.label_names.index(name): str(value) for name, value in labels.items()}
+            return sum(
+                value for key, value in self.values.items()
+                if all(key[index] == expected for index, expected in wanted.items())
+            )
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self.registry.lock:
+            self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help_text, labels=(), buckets=REQUEST_BUCKETS):
+        super().__init__(registry, name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        with self.registry.lock:
+            key = self._key(labels)
+            series = self.values.get(key)
+            if series is None:
+                # [count per bucket..., sum, count]
+                series = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, series in sorted(self.values.items()):
+            # Bucket counts are already cumulative (value <= bound)
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-2] + [series[-1]]):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {count}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class CycleMetrics:
+    """
+    What one sync cycle did: phase timings, API traffic and record counts.
+
+    Phases can be entered several times per cycle (e.g. once per Airtable
+    page) - their time adds up.
+    """
+
+    def __init__(self, kind, pipeline):
+        self.kind = kind
+        self.pipeline = pipeline
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.records = {}
+        self.requests = {}
+        self.retries = {}
+        self.throttled = {}
+        self.bytes_received = {}
+
+    def add(self, field, key, value=1):
+        bucket = getattr(self, field)
+        bucket[key] = bucket.get(key, 0) + value
+
+    def summary(self, number, changes, error=None):
+        return {
+            "cycle": number,
+            "kind": self.kind,
+            "pipeline": self.pipeline,
+            "started_at": self.started_at.isoformat(timespec="milliseconds"),
+            "duration_seconds": round(time.perf_counter() - self.started, 3),
+            "result": "failed" if error else "ok",
+            "error": error,
+            "changes": changes,
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "records": dict(self.records),
+            "requests": dict(self.requests),
+            "retries": dict(self.retries),
+            "throttled": dict(self.throttled),
+            "bytes_received": dict(self.bytes_received),
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide metrics. Thread-safe: write workers and the main thread
+    record into it at the same time.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.metrics = []
+        # Latest cycle started (None between cycles) - used by threads that
+        # don't carry a cycle context - and the last finished one
+        self.cycle = None
+        self.last_cycle = None
+        self.cycle_count = 0
+        # Optional JSON-lines file that gets every cycle summary
+        self.summary_path = None
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter(self, name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._register(Gauge(self, name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=REQUEST_BUCKETS):
+        return self._register(Histogram(self, name, help_text, labels, buckets))
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        with self.lock:
+            lines = []
+            for metric in self.metrics:
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    # ----- Cycles -----
+
+    def start_cycle(self, kind, pipeline="default"):
+        cycle = CycleMetrics(kind, pipeline)
+        _current_cycle.set(cycle)
+        with self.lock:
+            self.cycle = cycle
+        return cycle
+
+    def finish_cycle(self, changes, error=None):
+        """
+        Close the current cycle: export its phases and write its summary.
+
+        Returns:
+            The cycle summary dict (None if no cycle was running)
+        """
+        cycle = _current_cycle.get() or self.cycle
+        _current_cycle.set(None)
+        with self.lock:
+            if self.cycle is cycle:
+                self.cycle = None
+            if cycle is None:
+                return None
+            self.cycle_count += 1
+            summary = cycle.summary(self.cycle_count, changes, error)
+            self.last_cycle = summary
+
+        labels = {"kind": cycle.kind, "pipeline": cycle.pipeline}
+        for phase, seconds in cycle.phases.items():
+            PHASE_DURATION.observe(seconds, phase=phase, **labels)
+        CYCLE_DURATION.observe(summary["duration_seconds"], **labels)
+        CYCLES.inc(result=summary["result"], **labels)
+        LAST_CYCLE_TIMESTAMP.set(time.time(), **labels)
+        if changes is not None:
+            LAST_CYCLE_CHANGES.set(changes, **labels)
+
+        if self.summary_path:
+            try:
+                with open(self.summary_path, "a") as f:
+                    f.write(json.dumps(summary) + "\n")
+            except OSError as e:
+                logger.warning("⚠ Could not write cycle summary to %s: %s", self.summary_path, e)
+        return summary
+
+    def _cycle_add(self, field, key, value=1):
+        with self.lock:
+            cycle = _current_cycle.get() or self.cycle
+            if cycle is not None:
+                cycle.add(field, key, value)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time a block as one phase of the current cycle.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._cycle_add("phases", name, time.perf_counter() - started)
+
+    def timed_pages(self, name, pages):
+        """
+        Iterate pages, counting only the time spent waiting for the next
+        page as phase `name` (the caller's work on each page is excluded).
+        """
+        pages = iter(pages)
+        while True:
+            with self.phase(name):
+                page = next(pages, None)
+            if page is None:
+                return
+            yield page
+
+    def count_records(self, name, count):
+        """
+        Records/cards processed (fetched, planned, written) this cycle.
+        """
+        RECORDS_PROCESSED.inc(count, kind=name)
+        self._cycle_add("records", name, count)
+
+    # ----- API requests -----
+
+    def record_request(self, api, method, endpoint, seconds, response=None):
+        """
+        One HTTP exchange (transport retries included).
+
+        Args:
+            response: requests.Response, or None if no response came back
+        """
+        status = str(response.status_code) if response is not None else "error"
+        API_REQUESTS.inc(api=api, method=method, endpoint=endpoint, status=status)
+        API_LATENCY.observe(seconds, api=api, method=method, endpoint=endpoint, status=status)
+        self._cycle_add("requests", api)
+
+        if response is None:
+            return
+
+        # urllib3 keeps the retries it made for this response
+        history = getattr(getattr(response.raw, "retries", None), "history", None) or ()
+        if history:
+            self.record_retry(api, "transport", len(history))
+
+        size = response.headers.get("Content-Length")
+        size = int(size) if size and size.isdigit() else len(response.content)
+        API_BYTES.inc(size, api=api)
+        self._cycle_add("bytes_received", api, size)
+
+    def record_retry(self, api, reason, count=1):
+        API_RETRIES.inc(count, api=api, reason=reason)
+        self._cycle_add("retries", api, count)
+        if reason == "rate_limited":
+            API_THROTTLED.inc(count, api=api)
+            self._cycle_add("throttled", api, count)
+
+    def record_propagation(self, direction, changed_at):
+        """
+        Delay between a change (source system's own timestamp) and the
+        moment we wrote it to the other system.
+        """
+        if changed_at is None:
+            return
+        delay = (datetime.now(timezone.utc) - changed_at).total_seconds()
+        PROPAGATION_DELAY.observe(max(0.0, delay), direction=direction)
+
+
+METRICS = MetricsRegistry()
+
+API_REQUESTS = METRICS.counter(
+    "sync_api_requests_total", "API requests by endpoint and HTTP status",
+    ("api", "method", "endpoint", "status"))
+API_LATENCY = METRICS.histogram(
+    "sync_api_request_duration_seconds", "API request latency (transport retries included)",
+    ("api", "method", "endpoint", "status"))
+API_RETRIES = METRICS.counter(
+    "sync_api_retries_total", "Requests resent after a 5xx/connect error or a 429",
+    ("api", "reason"))
+API_THROTTLED = METRICS.counter(
+    "sync_api_throttled_total", "429 responses received", ("api",))
+API_BYTES = METRICS.counter(
+    "sync_api_received_bytes_total", "Response body bytes received (as sent on the wire)", ("api",))
+RECORDS_PROCESSED = METRICS.counter(
+    "sync_records_processed_total", "Records and cards fetched, planned and written", ("kind",))
+PHASE_DURATION = METRICS.histogram(
+    "sync_phase_duration_seconds", "Time per sync phase per cycle",
+    ("pipeline", "kind", "phase"), PHASE_BUCKETS)
+CYCLE_DURATION = METRICS.histogram(
+    "sync_cycle_duration_seconds", "Duration of whole sync cycles", ("pipeline", "kind"), PHASE_BUCKETS)
+CYCLES = METRICS.counter(
+    "sync_cycles_total", "Sync cycles by result", ("pipeline", "kind", "result"))
+LAST_CYCLE_TIMESTAMP = METRICS.gauge(
+    "sync_last_cycle_timestamp_seconds", "Unix time the last cycle finished", ("pipeline", "kind"))
+LAST_CYCLE_CHANGES = METRICS.gauge(
+    "sync_last_cycle_changes", "Changes found by the last cycle", ("pipeline", "kind"))
+PROPAGATION_DELAY = METRICS.histogram(
+    "sync_propagation_delay_seconds",
+    "Source change time → write to the other system (needs source timestamps)",
+    ("direction",), PROPAGATION_BUCKETS)
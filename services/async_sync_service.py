@@ -0,0 +1,297 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from clients.async_airtable_client import AsyncAirtableClient
+from clients.async_trello_client import AsyncTrelloClient
+from services.sync_service import SyncService
+from services.write_executor import WriteOperation
+from config import Config
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSyncService(SyncService):
+    """
+    asyncio sync engine - same entry points as SyncService, but awaitable.
+
+    Every sync decision comes from SyncService itself (same per-record
+    helpers, same snapshot, same link index); only the I/O is different:
+    - Airtable and Trello are fetched concurrently
+    - the next Airtable page is requested while the current one is synced
+    - up to ASYNC_MAX_IN_FLIGHT writes run at once, still throttled by the
+      shared per-API rate limiters, and writes to the same record/card
+      stay in order
+
+    Usage:
+        asyncio.run(AsyncSyncService().run_sync_cycle())
+    """
+
+    def __init__(self, pipeline=None, writer=None, shards=None):
+        super().__init__(pipeline, writer, shards)
+
+        self.max_in_flight = Config.ASYNC_MAX_IN_FLIGHT
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight,
+            thread_name_prefix="async-io"
+        )
+        self.async_airtable = AsyncAirtableClient(self.executor, self.airtable)
+        self.async_trello = AsyncTrelloClient(self.executor, self.trello)
+
+        # Blocking write → its awaitable twin
+        self._async_writes = {
+            self.trello.create_card: self.async_trello.create_card,
+            self.trello.update_card: self.async_trello.update_card,
+            self.airtable.update_records_status: self.async_airtable.update_records_status,
+        }
+
+    async def initial_sync(self):
+        """
+        INITIAL SYNC (async): create cards for every lead without one.
+        """
+        logger.info("🚀 INITIAL SYNC: Airtable → Trello (async engine)")
+
+        METRICS.start_cycle("initial", self.pipeline.name)
+
+        try:
+            self._reset_write_slots()
+            airtable_records, trello_cards = await asyncio.gather(
+                self._timed("airtable_fetch", self.async_airtable.get_all_records()),
+                self._timed("trello_fetch", self.async_trello.get_board_cards())
+            )
+            METRICS.count_records("airtable_records", len(airtable_records))
+            METRICS.count_records("trello_cards", len(trello_cards))
+            snapshot = self._capture_snapshot(
+                airtable_records=airtable_records,
+                trello_cards=trello_cards
+            )
+
+            logger.info("Found %d leads in Airtable, %d already synced to Trello",
+                        len(airtable_records), len(snapshot.card_by_airtable_id))
+
+            with METRICS.phase("plan"):
+                plan = self.planner.plan_initial(snapshot, airtable_records)
+            skipped_count = len(airtable_records) - len(plan)
+            self._begin_plan(plan)
+            snapshot.record_plan("forward", plan)
+
+            writes = self._journal([self._write_for_operation(op) for op in plan.card_operations()])
+            with METRICS.phase("trello_writes"):
+                created_count = self._apply_card_writes(snapshot, await self._run_writes(writes))
+
+            self._log_initial_summary(created_count, skipped_count)
+            METRICS.finish_cycle(created_count)
+
+        except Exception as e:
+            logger.error("❌ Initial sync failed: %s", e)
+            METRICS.finish_cycle(None, error=str(e))
+            raise
+
+    async def run_sync_cycle(self, full_scan=False):
+        """
+        Execute one complete bi-directional sync cycle (async).
+
+        Returns:
+            Number of changes the cycle found (None if the cycle failed)
+
+        Phases overlap here (fetches run concurrently with each other and
+        with writes), so their times can add up to more than the cycle's.
+        """
+        METRICS.start_cycle("poll", self.pipeline.name)
+        try:
+            self._reset_write_slots()
+            full_scan = full_scan or self._shards_gained()
+
+            # Start the Trello fetch; it runs while Airtable pages stream in
+            cards_task = asyncio.ensure_future(
+                self._timed("trello_fetch", self._fetch_trello_cards_async(full_scan))
+            )
+
+            if self._needs_full_airtable_scan(full_scan):
+                self.record_status_cache.clear()
+                snapshot = await self._sync_airtable_pages(cards_task)
+            else:
+                (airtable_records, _), (trello_cards, changed_card_ids) = await asyncio.gather(
+                    self._timed("airtable_fetch", self._call(self._fetch_airtable_records, full_scan)),
+                    cards_task
+                )
+                METRICS.count_records("airtable_records", len(airtable_records))
+                METRICS.count_records("trello_cards", len(trello_cards))
+                snapshot = self._capture_snapshot(
+                    airtable_records=airtable_records,
+                    trello_cards=trello_cards,
+                    known_statuses=self.record_status_cache,
+                    airtable_is_full=False,
+                    changed_card_ids=changed_card_ids
+                )
+                logger.debug("🔄 Syncing: Airtable → Trello...")
+                await self._sync_records(snapshot, airtable_records)
+
+            self._advance_airtable_watermark(snapshot)
+            await self.sync_trello_to_airtable_async(snapshot)
+            self._finish_cycle(snapshot)
+            logger.info("✅ Sync cycle completed")
+            METRICS.finish_cycle(snapshot.change_count)
+            return snapshot.change_count
+        except Exception as e:
+            logger.error("❌ Sync cycle error: %s", e)
+            METRICS.finish_cycle(None, error=str(e))
+            # Log but don't crash - continue to next cycle
+            return None
+
+    async def _fetch_trello_cards_async(self, full_scan):
+        if Config.TRELLO_CHANGE_FEED:
+            # Feed + cache bookkeeping stays in the shared blocking helper
+            return await self._call(self._fetch_trello_cards, full_scan)
+        return await self.async_trello.get_board_cards(), None
+
+    async def _sync_airtable_pages(self, cards_task):
+        """
+        Airtable → Trello over a streamed full scan.
+
+        The first Airtable page is requested right away, alongside the Trello
+        fetch; each page is synced as soon as both it and the cards are in.
+        """
+        pages = self.async_airtable.iter_record_pages()
+        first_page = asyncio.ensure_future(pages.__anext__())
+
+        trello_cards, changed_card_ids = await cards_task
+        METRICS.count_records("trello_cards", len(trello_cards))
+        snapshot = self._capture_snapshot(
+            airtable_records=[],
+            trello_cards=trello_cards,
+            known_statuses=self.record_status_cache,
+            airtable_is_full=True,
+            changed_card_ids=changed_card_ids
+        )
+
+        logger.debug("🔄 Syncing: Airtable → Trello...")
+        tasks = []
+        complete = True
+        try:
+            page = await self._timed("airtable_fetch", first_page)
+            while True:
+                # Index the page, schedule its writes, then let it go
+                METRICS.count_records("airtable_records", len(page))
+                self._add_record_page(snapshot, page)
+                tasks.extend(self._schedule_forward_writes(snapshot, page))
+                page = await self._timed("airtable_fetch", pages.__anext__())
+        except StopAsyncIteration:
+            pass
+        except requests.exceptions.RequestException as e:
+            # Partial read: sync what we have, but hold the watermark
+            logger.error("✗ Error fetching Airtable records: %s", e)
+            complete = False
+
+        await self._apply_forward_writes(snapshot, tasks, complete)
+        return snapshot
+
+    async def _sync_records(self, snapshot, records):
+        """
+        Airtable → Trello over records that are already in memory.
+        """
+        tasks = self._schedule_forward_writes(snapshot, records)
+        await self._apply_forward_writes(snapshot, tasks)
+
+    def _schedule_forward_writes(self, snapshot, records):
+        with METRICS.phase("plan"):
+            plan = self.planner.plan_forward(snapshot, records)
+        self._begin_plan(plan)
+        snapshot.record_plan("forward", plan)
+        writes = self._journal([self._write_for_operation(op) for op in plan.card_operations()])
+        return [asyncio.ensure_future(self._run_write(write)) for write in writes]
+
+    async def _apply_forward_writes(self, snapshot, tasks, complete=True):
+        try:
+            with METRICS.phase("trello_writes"):
+                operations = await asyncio.gather(*tasks)
+            self._apply_card_writes(snapshot, operations)
+            snapshot.forward_pass_complete = complete
+        finally:
+            # Flush the fast-path links recorded with commit=False
+            self.link_index.commit()
+        self._log_forward_summary(snapshot)
+
+    async def sync_trello_to_airtable_async(self, snapshot):
+        """
+        REVERSE SYNC (async): queue status changes, then send every batch
+        concurrently (one 10-record PATCH per task).
+        """
+        logger.debug("🔄 Syncing: Trello → Airtable...")
+
+        try:
+            # May look up unseen leads by ID (blocking) - run off the loop
+            plan = await self._call(self._plan_reverse, snapshot)
+        except Exception as e:
+            logger.error("✗ Trello → Airtable sync error: %s", e)
+            return
+
+        self._log_notes(plan)
+        METRICS.count_records("planned_operations", len(plan))
+        snapshot.record_plan("reverse", plan)
+
+        status_updates, card_ids = self._status_updates_from_plan(plan)
+        if not status_updates:
+            self._log_reverse_summary(snapshot)
+            return
+
+        writes = self._journal([
+            (
+                next(iter(chunk)),
+                self.airtable.update_records_status,
+                {'statuses': chunk},
+                {'record_ids': list(chunk)},
+            )
+            for chunk in self._status_update_slices(status_updates, slices=self.max_in_flight)
+        ])
+        with METRICS.phase("airtable_writes"):
+            operations = await self._run_writes(writes)
+        self._apply_status_writes(snapshot, status_updates, card_ids, operations)
+        self._log_reverse_summary(snapshot)
+
+    def _reset_write_slots(self):
+        # asyncio primitives belong to the running loop - make fresh ones
+        # for every asyncio.run()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._key_locks = {}
+
+    async def _run_writes(self, writes):
+        return await asyncio.gather(*(self._run_write(write) for write in writes))
+
+    async def _run_write(self, write):
+        """
+        Run one (key, fn, kwargs, context) write.
+
+        Writes sharing a key run one after another; everything else is only
+        bounded by the in-flight semaphore (and the rate limiters).
+        """
+        key, fn, kwargs, context = write
+        operation = WriteOperation(key, context, None)
+
+        key_lock = self._key_locks.setdefault(key, asyncio.Lock())
+        async with key_lock:
+            async with self._in_flight:
+                try:
+                    operation.result = await self._async_writes[fn](**kwargs)
+                except Exception as e:
+                    operation.error = e
+
+        return operation
+
+    async def _timed(self, phase, awaitable):
+        """
+        Await something and count the wait as a phase of the cycle.
+        """
+        with METRICS.phase(phase):
+            return await awaitable
+
+    async def _call(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Carry the cycle/pipeline context over to the worker thread
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        )
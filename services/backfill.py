@@ -0,0 +1,184 @@
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class QueuedCreate:
+    """
+    One planned card create waiting in the backfill queue.
+    """
+
+    def __init__(self, position, record_id, name, list_id, status, email, source,
+                 fingerprint, details_fingerprint):
+        self.position = position
+        self.record_id = record_id
+        self.name = name
+        self.list_id = list_id
+        self.status = status
+        self.email = email
+        self.source = source
+        self.fingerprint = fingerprint
+        self.details_fingerprint = details_fingerprint
+
+    def __repr__(self):
+        return f"QueuedCreate({self.position}: {self.record_id})"
+
+
+class BackfillQueue:
+    """
+    Durable queue of the card creates a backfill still has to make.
+
+    Filled once when a backfill starts (one pass over Airtable, one board
+    listing to skip leads that already have a card), then drained chunk
+    by chunk: a create leaves the queue once its card is linked. An
+    interrupted backfill resumes from what is left, without reading
+    Airtable or listing the board again.
+
+    Lives in the outbox database - both hold writes still to be made.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS backfill_queue (
+            position            INTEGER PRIMARY KEY AUTOINCREMENT,
+            record_id           TEXT NOT NULL UNIQUE,
+            name                TEXT NOT NULL,
+            list_id             TEXT NOT NULL,
+            status              TEXT,
+            email               TEXT,
+            source              TEXT,
+            fingerprint         TEXT,
+            details_fingerprint TEXT
+        )
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(self.SCHEMA)
+        self.conn.commit()
+
+    def add(self, operations):
+        """
+        Queue planned creates (SyncOperations), in order.
+
+        Returns:
+            Number of creates queued (a lead already queued is skipped)
+        """
+        rows = [
+            (op.record_id, op.name, op.list_id, op.status, op.email, op.source,
+             op.fingerprint, op.details_fingerprint)
+            for op in operations
+        ]
+        with self._lock:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO backfill_queue (record_id, name, list_id, status, "
+                "email, source, fingerprint, details_fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+            return self.conn.total_changes - before
+
+    def next_chunk(self, after, size):
+        """
+        Up to `size` queued creates after queue position `after`.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT position, record_id, name, list_id, status, email, source, "
+                "fingerprint, details_fingerprint FROM backfill_queue "
+                "WHERE position > ? ORDER BY position LIMIT ?",
+                (after, size)
+            ).fetchall()
+        return [QueuedCreate(*row) for row in rows]
+
+    def remove(self, record_ids):
+        rows = [(record_id,) for record_id in record_ids]
+        if not rows:
+            return
+        with self._lock:
+            self.conn.executemany("DELETE FROM backfill_queue WHERE record_id = ?", rows)
+            self.conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM backfill_queue")
+            self.conn.commit()
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM backfill_queue").fetchone()[0]
+
+
+class BackfillProgress:
+    """
+    Throughput and ETA of a backfill run.
+
+    The rate only counts this run (a resumed backfill doesn't average in
+    the time it spent stopped).
+    """
+
+    def __init__(self, total, done=0):
+        """
+        Args:
+            total: Creates in the whole backfill
+            done: Creates finished by earlier runs
+        """
+        self.total = total
+        self.done = done
+        self.done_this_run = 0
+        self.started = time.monotonic()
+
+    def update(self, done, created):
+        """
+        Args:
+            done: Creates finished so far, over all runs
+            created: Cards this chunk created
+        """
+        self.done = done
+        self.done_this_run += created
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        """
+        Cards created per second in this run.
+        """
+        elapsed = self.elapsed
+        return self.done_this_run / elapsed if elapsed > 0 else 0.0
+
+    def eta(self, remaining):
+        """
+        Seconds until `remaining` creates are done at the current rate,
+        or None before the first create.
+        """
+        rate = self.rate
+        return remaining / rate if rate > 0 else None
+
+    def describe(self, remaining):
+        percent = 100.0 * self.done / self.total if self.total else 100.0
+        eta = self.eta(remaining)
+        return (
+            f"{self.done:,}/{self.total:,} cards ({percent:.1f}%), "
+            f"{self.rate:.1f} cards/s, ETA {format_duration(eta) if eta is not None else '?'}"
+        )
+
+
+def format_duration(seconds):
+    """
+    3725 → "1h02m", 200 → "3m20s", 12.4 → "12s" (for logs)
+    """
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
@@ -0,0 +1,247 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from clients.models import Card
+
+logger = logging.getLogger(__name__)
+
+
+class LinkIndex:
+    """
+    Durable local index of Airtable record ↔ Trello card links.
+
+    Stores, per lead, the card it maps to plus what we last pushed to that
+    card (status, list, name), a fingerprint of the lead's synced fields and
+    one of the details in the card description (email, source).
+    Lookups are primary-key hits instead of regex scans over every card
+    description. The cards stay the source of truth: the index is rebuilt
+    from their link field (or description footer) when the database is
+    missing or corrupt.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS links (
+            record_id   TEXT PRIMARY KEY,
+            card_id     TEXT NOT NULL UNIQUE,
+            status      TEXT,
+            list_id     TEXT,
+            name        TEXT,
+            fingerprint TEXT,
+            updated_at  REAL,
+            details_fingerprint TEXT
+        )
+    """
+
+    COLUMNS = (
+        "record_id, card_id, status, list_id, name, fingerprint, updated_at, "
+        "details_fingerprint"
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        # Set when the index has to be rebuilt from the cards
+        self.needs_rebuild = not os.path.exists(path)
+        self.conn = self._open()
+        if self.count() == 0:
+            self.needs_rebuild = True
+
+    def _open(self):
+        conn = None
+        try:
+            conn = self._connect()
+            if conn.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+                raise sqlite3.DatabaseError("quick_check failed")
+            return conn
+        except sqlite3.DatabaseError as e:
+            # Corrupt file: move it aside and start from scratch
+            logger.warning("✗ Link index %s is corrupt (%s) - rebuilding", self.path, e)
+            if conn is not None:
+                conn.close()
+            os.replace(self.path, f"{self.path}.corrupt")
+            self.needs_rebuild = True
+            return self._connect()
+
+    def _connect(self):
+        # Writes may come from worker threads - guarded by self._lock
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(self.SCHEMA)
+        # Indexes written before description details were tracked
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(links)")}
+        if "details_fingerprint" not in columns:
+            conn.execute("ALTER TABLE links ADD COLUMN details_fingerprint TEXT")
+        conn.commit()
+        return conn
+
+    def rebuild(self, cards, linked_airtable_id):
+        """
+        Recreate the index from the cards' links (full listing required).
+
+        Args:
+            cards: Every card on the board
+            linked_airtable_id: card → Airtable ID (link field or
+                                description footer), or None
+
+        Status and fingerprint are unknown at this point, so the next cycle
+        compares every lead against its card once and fills them in.
+        """
+        rows = []
+        for card in cards:
+            record_id = linked_airtable_id(card)
+            if record_id:
+                rows.append((
+                    record_id, card.id, None,
+                    card.list_id, card.name, None, time.time(), None
+                ))
+
+        with self._lock:
+            self.conn.execute("DELETE FROM links")
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO links ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+
+        self.needs_rebuild = False
+        logger.info("✓ Rebuilt link index from the board: %d links", len(rows))
+
+    def get(self, record_id):
+        """
+        Link row for a lead as a dict, or None.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM links WHERE record_id = ?", (record_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def get_record_id(self, card_id):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT record_id FROM links WHERE card_id = ?", (card_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def cards(self):
+        """
+        {card_id: Card} (id, name and list only) for every linked card.
+
+        Lets the change feed start without listing (and downloading the
+        descriptions of) every card on the board.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT card_id, name, list_id FROM links"
+            ).fetchall()
+        return {
+            card_id: Card(card_id, name=name, list_id=list_id)
+            for card_id, name, list_id in rows
+        }
+
+    def link(self, record_id, card_id, status=None, list_id=None, name=None,
+             fingerprint=None, details_fingerprint=None, commit=True):
+        """
+        Insert or replace the link for a lead (after create / update).
+
+        details_fingerprint is None when the description's details are
+        unknown (e.g. a card first seen on the board).
+        
+        Pass commit=False when linking many leads in a loop and call
+        commit() once at the end.
+        """
+        with self._lock:
+            # A card can only belong to one lead - drop stale links first
+            self.conn.execute(
+                "DELETE FROM links WHERE card_id = ? AND record_id != ?",
+                (card_id, record_id)
+            )
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO links ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (record_id, card_id, status, list_id, name, fingerprint, time.time(),
+                 details_fingerprint)
+            )
+            if commit:
+                self.conn.commit()
+
+    def commit(self):
+        with self._lock:
+            self.conn.commit()
+
+    def observe_card(self, card_id, name=None, list_id=None):
+        """
+        Record a card change seen on Trello (change feed).
+
+        If the card no longer matches what we last synced, the fingerprint
+        is cleared so the next cycle compares the lead against it again.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT name, list_id FROM links WHERE card_id = ?", (card_id,)
+            ).fetchone()
+            if row is None:
+                return
+
+            new_name = name if name is not None else row['name']
+            new_list_id = list_id if list_id is not None else row['list_id']
+            if (new_name, new_list_id) == (row['name'], row['list_id']):
+                return
+
+            self.conn.execute(
+                "UPDATE links SET name = ?, list_id = ?, fingerprint = NULL, "
+                "updated_at = ? WHERE card_id = ?",
+                (new_name, new_list_id, time.time(), card_id)
+            )
+            self.conn.commit()
+
+    def set_status(self, record_id, status):
+        """
+        Record a status we just wrote to Airtable (reverse pass).
+        """
+        with self._lock:
+            self.conn.execute(
+                "UPDATE links SET status = ?, updated_at = ? WHERE record_id = ?",
+                (status, time.time(), record_id)
+            )
+            self.conn.commit()
+
+    def remove_card(self, card_id):
+        with self._lock:
+            self.conn.execute("DELETE FROM links WHERE card_id = ?", (card_id,))
+            self.conn.commit()
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+
+    def count_without_details(self):
+        """
+        Links with no details fingerprint yet (made before details were
+        tracked, or rebuilt from the board). Their details can only be
+        checked against the card descriptions.
+        """
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM links WHERE details_fingerprint IS NULL"
+            ).fetchone()[0]
+
+    @staticmethod
+    def fingerprint(name, status, email, source):
+        """
+        Stable hash of the lead fields the sync pushes to Trello.
+        """
+        payload = "\x1f".join(str(value or "") for value in (name, status, email, source))
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def details_fingerprint(email, source):
+        """
+        Stable hash of the lead fields written into the card description.
+        """
+        payload = "\x1f".join(str(value or "") for value in (email, source))
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
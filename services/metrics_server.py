@@ -0,0 +1,48 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PATH = "/metrics"
+CYCLE_PATH = "/metrics/cycle"
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """
+    Read-only scrape endpoint for a MetricsRegistry.
+
+    GET /metrics        - Prometheus text format
+    GET /metrics/cycle  - JSON summary of the last finished cycle
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, registry):
+        super().__init__(address, _MetricsHandler)
+        self.registry = registry
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would drown the sync output
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        registry = self.server.registry
+
+        if path == METRICS_PATH:
+            self._send(registry.render().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+        elif path == CYCLE_PATH:
+            body = json.dumps(registry.last_cycle or {}).encode("utf-8")
+            self._send(body, "application/json")
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
@@ -0,0 +1,118 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Kinds of write the outbox can hold (one per client write method)
+CREATE_CARD = "create_card"
+UPDATE_CARD = "update_card"
+UPDATE_RECORDS_STATUS = "update_records_status"
+
+
+class OutboxEntry:
+    """
+    One journaled write: what to call again, and the context needed to
+    apply its result.
+    """
+
+    def __init__(self, entry_id, kind, key, kwargs, context, created_at):
+        self.id = entry_id
+        self.kind = kind
+        self.key = key
+        self.kwargs = kwargs
+        self.context = context
+        self.created_at = created_at
+
+    def __repr__(self):
+        return f"OutboxEntry({self.id}: {self.kind} {self.key})"
+
+
+class Outbox:
+    """
+    Write-ahead journal of outbound API writes.
+
+    Every write is recorded here (in one transaction per batch) before it
+    is sent, and deleted once its outcome has been applied to the link
+    index - whether it succeeded or not, since failed writes are retried
+    by the next cycle anyway. Entries are only left behind when the
+    process dies in between, so the table holds the in-flight writes of
+    a crashed run and nothing else: replaying it on startup costs one
+    query when the last run shut down cleanly.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            id         INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind       TEXT NOT NULL,
+            key        TEXT NOT NULL,
+            kwargs     TEXT NOT NULL,
+            context    TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # Writes may be journaled from worker threads - guarded by self._lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # An entry must be on disk before its write goes out
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute(self.SCHEMA)
+        self.conn.commit()
+
+    def add(self, entries):
+        """
+        Journal writes before they are sent.
+
+        Args:
+            entries: (kind, key, kwargs, context) tuples - kwargs and
+                     context must be JSON-serializable
+
+        Returns:
+            Entry IDs, in the same order
+        """
+        now = time.time()
+        ids = []
+        with self._lock:
+            for kind, key, kwargs, context in entries:
+                cursor = self.conn.execute(
+                    "INSERT INTO entries (kind, key, kwargs, context, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (kind, str(key), json.dumps(kwargs), json.dumps(context), now)
+                )
+                ids.append(cursor.lastrowid)
+            self.conn.commit()
+        return ids
+
+    def complete(self, entry_ids):
+        """
+        Forget writes whose outcome has been applied.
+        """
+        rows = [(entry_id,) for entry_id in entry_ids if entry_id is not None]
+        if not rows:
+            return
+        with self._lock:
+            self.conn.executemany("DELETE FROM entries WHERE id = ?", rows)
+            self.conn.commit()
+
+    def pending(self):
+        """
+        Writes a previous run journaled but never completed, oldest first.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, kind, key, kwargs, context, created_at FROM entries ORDER BY id"
+            ).fetchall()
+        return [
+            OutboxEntry(entry_id, kind, key, json.loads(kwargs), json.loads(context), created_at)
+            for entry_id, kind, key, kwargs, context, created_at in rows
+        ]
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
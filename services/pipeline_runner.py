@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from logging_config import current_pipeline
+from services.scheduler import AdaptiveScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineSlot:
+    """
+    Scheduling state of one pipeline inside a PipelineRunner.
+    """
+
+    def __init__(self, pipeline, scheduler):
+        self.pipeline = pipeline
+        self.scheduler = scheduler
+        # Built on the pipeline's first cycle (a bad board fails there,
+        # not at startup)
+        self.service = None
+        self.future = None
+        self.started = 0.0
+        self.next_run = 0.0
+        self.cycles = 0
+        self.failures = 0
+
+
+class PipelineRunner:
+    """
+    Runs the sync cycles of many pipelines on one shared pool of threads.
+
+    Each pipeline keeps its own adaptive schedule; at most one cycle per
+    pipeline is in flight, and up to `workers` pipelines sync at once. The
+    clients share sessions and per-token rate limiters process-wide, so
+    all pipelines draw from the same request budget.
+
+    Failures stay with their pipeline: a cycle that raises (or can't even
+    build its service) is logged, and that pipeline alone backs off -
+    doubling its delay per consecutive failure, up to max_interval -
+    while the others keep their schedules.
+    """
+
+    def __init__(self, pipelines, make_service, workers, scheduler_options, owns=None):
+        """
+        Args:
+            pipelines: Pipelines to run
+            make_service: pipeline → SyncService / AsyncSyncService
+            workers: Max pipelines syncing at the same time
+            scheduler_options: kwargs for each pipeline's AdaptiveScheduler
+            owns: Optional pipeline name → False while another worker
+                  runs that pipeline (sharding by pipeline)
+        """
+        self.make_service = make_service
+        self.owns = owns or (lambda name: True)
+        self.min_interval = scheduler_options["min_interval"]
+        self.max_interval = scheduler_options["max_interval"]
+        self.slots = [
+            PipelineSlot(pipeline, AdaptiveScheduler(**scheduler_options))
+            for pipeline in pipelines
+        ]
+        self.pool = ThreadPoolExecutor(
+            max_workers=max(1, workers),
+            thread_name_prefix="pipeline"
+        )
+
+    def run_forever(self):
+        while True:
+            self.run_once()
+
+    def run_once(self):
+        """
+        Start every pipeline that is due, then wait until one finishes or
+        the next one becomes due.
+        """
+        now = time.monotonic()
+        for slot in self.slots:
+            if slot.future is None and slot.next_run <= now:
+                if not self.owns(slot.pipeline.name):
+                    # Another worker's - check again later
+                    slot.next_run = now + self.min_interval
+                    continue
+                slot.started = now
+                slot.future = self.pool.submit(self._run_cycle, slot)
+
+        running = [slot.future for slot in self.slots if slot.future is not None]
+        idle = [slot.next_run for slot in self.slots if slot.future is None]
+        timeout = max(0.0, min(idle) - now) if idle else None
+
+        if running:
+            wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+        else:
+            time.sleep(timeout)
+
+        for slot in self.slots:
+            if slot.future is not None and slot.future.done():
+                self._finish(slot, slot.future.result())
+
+    def run_all(self, step):
+        """
+        Run `step(service)` once for every pipeline (e.g. the initial
+        sync), on the shared pool.
+
+        Returns:
+            {pipeline name: error message} for the pipelines that failed
+        """
+        futures = {
+            slot.pipeline.name: self.pool.submit(self._run_step, slot, step)
+            for slot in self.slots
+            if self.owns(slot.pipeline.name)
+        }
+        return {
+            name: error
+            for name, error in ((name, future.result()) for name, future in futures.items())
+            if error
+        }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _service(self, slot):
+        if slot.service is None:
+            slot.service = self.make_service(slot.pipeline)
+        return slot.service
+
+    def _run_cycle(self, slot):
+        """
+        One cycle of one pipeline, on a pool thread.
+
+        Returns:
+            Changes found, or None if the cycle failed
+        """
+        token = current_pipeline.set(slot.pipeline.name)
+        try:
+            result = self._service(slot).run_sync_cycle()
+            if asyncio.iscoroutine(result):
+                result = asyncio.run(result)
+            return result
+        except Exception as e:
+            logger.error("❌ Pipeline %s failed: %s", slot.pipeline.name, e)
+            return None
+        finally:
+            current_pipeline.reset(token)
+
+    def _run_step(self, slot, step):
+        token = current_pipeline.set(slot.pipeline.name)
+        try:
+            result = step(self._service(slot))
+            if asyncio.iscoroutine(result):
+                asyncio.run(result)
+            return None
+        except Exception as e:
+            logger.error("❌ Pipeline %s failed: %s", slot.pipeline.name, e)
+            return str(e) or type(e).__name__
+        finally:
+            current_pipeline.reset(token)
+
+    def _finish(self, slot, changes):
+        """
+        Schedule a pipeline's next cycle (from the start of this one).
+        """
+        slot.future = None
+        slot.cycles += 1
+        decision = slot.scheduler.record_cycle(changes, time.monotonic() - slot.started)
+
+        if changes is None:
+            slot.failures += 1
+            delay = min(self.max_interval, decision.interval * 2 ** (slot.failures - 1))
+            logger.warning("⚠ Pipeline %s: %d failed cycle(s) in a row, retrying in %.0fs",
+                           slot.pipeline.name, slot.failures, delay)
+        else:
+            slot.failures = 0
+            delay = decision.interval
+            logger.info("📊 Pipeline %s cycle #%d: %s", slot.pipeline.name, slot.cycles, decision)
+
+        slot.next_run = slot.started + delay
@@ -0,0 +1,179 @@
+import json
+import os
+import re
+from config import Config
+
+# Airtable status → which of the pipeline's lists it goes to
+DEFAULT_STATUS_LISTS = {
+    "NEW": "todo",
+    "CONTACTED": "todo",
+    "IN_PROGRESS": "todo",
+    "QUALIFIED": "done",
+}
+# Trello list → Airtable status it triggers
+DEFAULT_LIST_STATUSES = {
+    "done": "QUALIFIED",
+}
+
+# Names end up in file names and log lines
+PIPELINE_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+DEFAULT_PIPELINE = "default"
+
+# Keys a pipelines-file entry may set
+PIPELINE_SETTINGS = (
+    "name", "airtable_base_id", "airtable_table_name", "trello_board_id",
+    "todo_list_id", "done_list_id", "status_to_list", "list_to_status",
+    "airtable_api_key", "trello_api_key", "trello_token",
+    "state_path", "link_index_path", "outbox_path",
+)
+
+
+class Pipeline:
+    """
+    One Airtable table ↔ Trello board pair: where to read and write, how
+    statuses map to lists, and where its cursors and links are kept.
+    """
+
+    def __init__(self, name, airtable_base_id, airtable_table_name, trello_board_id,
+                 todo_list_id, done_list_id, status_to_list=None, list_to_status=None,
+                 airtable_api_key=None, trello_api_key=None, trello_token=None,
+                 state_path=None, link_index_path=None, outbox_path=None):
+        self.name = name
+        self.airtable_base_id = airtable_base_id
+        self.airtable_table_name = airtable_table_name
+        self.trello_board_id = trello_board_id
+        self.todo_list_id = todo_list_id
+        self.done_list_id = done_list_id
+        self.airtable_api_key = airtable_api_key or Config.AIRTABLE_API_KEY
+        self.trello_api_key = trello_api_key or Config.TRELLO_API_KEY
+        self.trello_token = trello_token or Config.TRELLO_TOKEN
+
+        lists = {"todo": todo_list_id, "done": done_list_id}
+        # Values may name a list ("todo"/"done") or be a raw list ID
+        self.status_to_list = {
+            status: lists.get(target, target)
+            for status, target in (status_to_list or DEFAULT_STATUS_LISTS).items()
+        }
+        self.list_to_status = {
+            lists.get(source, source): status
+            for source, status in (list_to_status or DEFAULT_LIST_STATUSES).items()
+        }
+
+        self.state_path = state_path or _per_pipeline_path(Config.SYNC_STATE_PATH, name)
+        self.link_index_path = link_index_path or _per_pipeline_path(Config.LINK_INDEX_PATH, name)
+        self.outbox_path = outbox_path or _per_pipeline_path(Config.OUTBOX_PATH, name)
+
+    def __repr__(self):
+        return f"Pipeline({self.name!r}: {self.airtable_table_name} → board {self.trello_board_id})"
+
+    @classmethod
+    def from_config(cls):
+        """
+        The single pipeline described by the environment (.env).
+        """
+        return cls(
+            DEFAULT_PIPELINE,
+            airtable_base_id=Config.AIRTABLE_BASE_ID,
+            airtable_table_name=Config.AIRTABLE_TABLE_NAME,
+            trello_board_id=Config.TRELLO_BOARD_ID,
+            todo_list_id=Config.TRELLO_LIST_TODO_ID,
+            done_list_id=Config.TRELLO_LIST_DONE_ID,
+            state_path=Config.SYNC_STATE_PATH,
+            link_index_path=Config.LINK_INDEX_PATH,
+            outbox_path=Config.OUTBOX_PATH
+        )
+
+    @classmethod
+    def from_dict(cls, entry, defaults=None):
+        """
+        One entry of the pipelines file, on top of the file's "defaults".
+
+        Raises:
+            ValueError if a required setting is missing or unknown
+        """
+        settings = dict(defaults or {})
+        settings.update(entry)
+
+        name = settings.get("name")
+        if not name or not PIPELINE_NAME.match(str(name)):
+            raise ValueError(f"Pipeline name must be letters, digits, '.', '_' or '-' (got {name!r})")
+
+        unknown = set(settings) - set(PIPELINE_SETTINGS)
+        if unknown:
+            raise ValueError(f"Pipeline '{name}': unknown settings: {', '.join(sorted(unknown))}")
+
+        # Fall back to the environment for anything shared by every pipeline
+        for key, env_value in (
+            ("airtable_base_id", Config.AIRTABLE_BASE_ID),
+            ("airtable_table_name", Config.AIRTABLE_TABLE_NAME),
+        ):
+            settings.setdefault(key, env_value)
+
+        missing = [
+            key for key in ("airtable_base_id", "airtable_table_name", "trello_board_id",
+                            "todo_list_id", "done_list_id")
+            if not settings.get(key)
+        ]
+        if not (settings.get("airtable_api_key") or Config.AIRTABLE_API_KEY):
+            missing.append("airtable_api_key (or AIRTABLE_API_KEY)")
+        if not ((settings.get("trello_api_key") or Config.TRELLO_API_KEY)
+                and (settings.get("trello_token") or Config.TRELLO_TOKEN)):
+            missing.append("trello_api_key/trello_token (or TRELLO_API_KEY/TRELLO_TOKEN)")
+        if missing:
+            raise ValueError(f"Pipeline '{name}': missing {', '.join(missing)}")
+
+        return cls(**settings)
+
+
+def _per_pipeline_path(path, name):
+    # sync_links.db → sync_links.emea.db
+    root, ext = os.path.splitext(path)
+    return f"{root}.{name}{ext}"
+
+
+def load_pipelines(path):
+    """
+    Read a pipelines file:
+
+        {
+          "defaults": {"airtable_base_id": "app...", "todo_list_id": ...},
+          "pipelines": [
+            {"name": "emea", "airtable_table_name": "Leads EMEA",
+             "trello_board_id": "...", "todo_list_id": "...", "done_list_id": "...",
+             "status_to_list": {"NEW": "todo", "QUALIFIED": "done"}},
+            ...
+          ]
+        }
+
+    Returns:
+        List of Pipeline
+
+    Raises:
+        ValueError if the file can't be read or a pipeline is invalid
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Cannot read pipelines file {path}: {e}")
+
+    entries = document.get("pipelines") if isinstance(document, dict) else None
+    if not entries:
+        raise ValueError(f"Pipelines file {path} has no \"pipelines\" list")
+
+    pipelines = [Pipeline.from_dict(entry, document.get("defaults")) for entry in entries]
+
+    names = [pipeline.name for pipeline in pipelines]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate pipeline names: {', '.join(duplicates)}")
+
+    # Two pipelines on one link index / state file / outbox would corrupt
+    # each other
+    for attribute in ("state_path", "link_index_path", "outbox_path"):
+        paths = [getattr(pipeline, attribute) for pipeline in pipelines]
+        if len(set(paths)) != len(paths):
+            raise ValueError(f"Every pipeline needs its own {attribute}")
+
+    return pipelines
@@ -0,0 +1,73 @@
+class ScheduleDecision:
+    """
+    When the next cycle starts, and why (printed in the cycle summary).
+    """
+
+    def __init__(self, interval, sleep_seconds, duration, changes, reason):
+        self.interval = interval
+        self.sleep_seconds = sleep_seconds
+        self.duration = duration
+        self.changes = changes
+        self.reason = reason
+
+    def __str__(self):
+        changes = "?" if self.changes is None else self.changes
+        return (f"{changes} changes in {self.duration:.1f}s → "
+                f"next interval {self.interval:.0f}s ({self.reason}), "
+                f"sleeping {self.sleep_seconds:.1f}s")
+
+
+class AdaptiveScheduler:
+    """
+    Picks the polling interval from what the last cycle found.
+
+    - Changes found: drop straight to min_interval (a burst is likely
+      still going on)
+    - Idle cycle: multiply the interval by backoff_factor, up to
+      max_interval
+    - Failed cycle: keep the current interval
+
+    Intervals are measured from the START of a cycle, so long cycles don't
+    push the schedule back. Cycles run one after another on the caller's
+    thread, so they never overlap: a cycle that outlasts its interval is
+    simply followed by the next one right away.
+    """
+
+    def __init__(self, base_interval, min_interval, max_interval,
+                 backoff_factor=2.0, adaptive=True):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.backoff_factor = backoff_factor
+        self.adaptive = adaptive
+        self.interval = min(max(base_interval, self.min_interval), self.max_interval)
+
+        if not adaptive:
+            # Fixed schedule: always the configured interval
+            self.interval = base_interval
+
+    def record_cycle(self, changes, duration):
+        """
+        Pick the next interval after a cycle.
+
+        Args:
+            changes: Changes the cycle found (None if it failed)
+            duration: How long the cycle took, in seconds
+
+        Returns:
+            ScheduleDecision - sleep for its sleep_seconds
+        """
+        if not self.adaptive:
+            reason = "fixed"
+        elif changes is None:
+            reason = "cycle failed, unchanged"
+        elif changes > 0:
+            self.interval = self.min_interval
+            reason = "changes found"
+        elif self.interval < self.max_interval:
+            self.interval = min(self.max_interval, self.interval * self.backoff_factor)
+            reason = "idle, backing off"
+        else:
+            reason = "idle, at ceiling"
+
+        sleep_seconds = max(0.0, self.interval - duration)
+        return ScheduleDecision(self.interval, sleep_seconds, duration, changes, reason)
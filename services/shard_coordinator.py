@@ -0,0 +1,282 @@
+import logging
+import math
+import sqlite3
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# What a shard is a slice of
+PARTITION_RECORD = "record"
+PARTITION_PIPELINE = "pipeline"
+
+
+def shard_of(key, shard_count):
+    # crc32 rather than hash(): every worker process must agree
+    return zlib.crc32(str(key).encode('utf-8')) % shard_count
+
+
+class ShardCoordinator:
+    """
+    Cooperative sharding between sync workers through a shared SQLite file.
+
+    The key space (record IDs, or pipeline names) is split into
+    `shard_count` shards by hash. Each worker holds leases on its fair
+    share of them (shard_count / live workers, rounded up) and only syncs
+    keys in shards it holds. Leases expire after `lease_seconds` unless
+    renewed, so when a worker dies the others pick up its shards; when a
+    worker joins, the others release their surplus on their next refresh.
+
+    Card creates are also claimed here (create_claims), because right
+    after a handover the old and the new owner can both still see a lead
+    without a card - only the worker that wins the claim creates it.
+
+    SQLite locking needs a local file system: every worker must run on
+    the same host (or share the file through something with real locks).
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS workers (
+            worker_id  TEXT PRIMARY KEY,
+            expires_at REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS shard_leases (
+            shard      INTEGER PRIMARY KEY,
+            worker_id  TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS create_claims (
+            record_id  TEXT PRIMARY KEY,
+            worker_id  TEXT NOT NULL,
+            claimed_at REAL NOT NULL,
+            card_id    TEXT
+        )
+        """,
+    )
+
+    def __init__(self, path, shard_count, worker_id, lease_seconds=60,
+                 claim_seconds=600, partition=PARTITION_RECORD):
+        """
+        Args:
+            path: SQLite file shared by every worker
+            shard_count: Number of shards (the same for every worker)
+            worker_id: Unique name of this worker
+            lease_seconds: A lease not renewed for this long is up for grabs
+            claim_seconds: How long a create claim blocks other workers
+                           (must outlast a cycle)
+            partition: PARTITION_RECORD or PARTITION_PIPELINE
+        """
+        self.path = path
+        self.shard_count = max(1, int(shard_count))
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.claim_seconds = claim_seconds
+        self.partition = partition
+
+        self.owned = frozenset()
+        # Bumped whenever this worker picks up a shard it didn't hold
+        self.generation = 0
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.conn = self._connect()
+
+    def _connect(self):
+        # Autocommit mode - transactions are explicit BEGIN IMMEDIATE, so
+        # two workers never rebalance at the same time
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Losing the last lease renewal on power loss is harmless
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+        return conn
+
+    def _transaction(self, work):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self.conn, time.time())
+                self.conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    # ----- Leases -----
+
+    def start(self):
+        """
+        Take this worker's first shards and keep them renewed (and
+        rebalanced) on a background thread every lease_seconds / 3.
+        """
+        self.refresh()
+        self._thread = threading.Thread(target=self._heartbeat, name="shard-lease", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Hand every shard back right away (graceful shutdown).
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+        def release(conn, now):
+            conn.execute("DELETE FROM shard_leases WHERE worker_id = ?", (self.worker_id,))
+            conn.execute("DELETE FROM workers WHERE worker_id = ?", (self.worker_id,))
+
+        self._transaction(release)
+        self.owned = frozenset()
+        logger.info("✓ Released all shards of worker %s", self.worker_id)
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                self.refresh()
+            except sqlite3.Error as e:
+                # Leases run out if this keeps failing - that's the point
+                logger.warning("⚠ Could not renew shard leases: %s", e)
+
+    def refresh(self):
+        """
+        Renew our leases, then claim or release shards to get to our fair
+        share of the live workers.
+
+        Returns:
+            Shards this worker now owns
+        """
+        def rebalance(conn, now):
+            expires = now + self.lease_seconds
+            conn.execute(
+                "INSERT OR REPLACE INTO workers VALUES (?, ?)", (self.worker_id, expires)
+            )
+            conn.execute("DELETE FROM workers WHERE expires_at < ?", (now,))
+            live_workers = conn.execute("SELECT COUNT(*) FROM workers").fetchone()[0]
+            fair_share = math.ceil(self.shard_count / max(1, live_workers))
+
+            conn.execute(
+                "UPDATE shard_leases SET expires_at = ? WHERE worker_id = ?",
+                (expires, self.worker_id)
+            )
+            mine = sorted(
+                row[0] for row in conn.execute(
+                    "SELECT shard FROM shard_leases WHERE worker_id = ? AND shard < ?",
+                    (self.worker_id, self.shard_count)
+                )
+            )
+
+            # Surplus goes back (a worker joined); the newcomer takes it
+            for shard in mine[fair_share:]:
+                conn.execute(
+                    "DELETE FROM shard_leases WHERE shard = ? AND worker_id = ?",
+                    (shard, self.worker_id)
+                )
+            mine = mine[:fair_share]
+
+            if len(mine) < fair_share:
+                taken = {
+                    row[0] for row in conn.execute(
+                        "SELECT shard FROM shard_leases WHERE expires_at >= ?", (now,)
+                    )
+                }
+                for shard in range(self.shard_count):
+                    if len(mine) >= fair_share:
+                        break
+                    if shard in taken:
+                        continue
+                    conn.execute(
+                        "INSERT OR REPLACE INTO shard_leases VALUES (?, ?, ?)",
+                        (shard, self.worker_id, expires)
+                    )
+                    mine.append(shard)
+            return frozenset(mine), live_workers
+
+        owned, live_workers = self._transaction(rebalance)
+        gained = owned - self.owned
+        if gained:
+            self.generation += 1
+        if owned != self.owned:
+            logger.info("🔀 Worker %s owns shards %s of %d (%d live workers)",
+                        self.worker_id, _ranges(owned), self.shard_count, live_workers)
+        self.owned = owned
+        return owned
+
+    def owns(self, key):
+        """
+        True if `key` (record ID / pipeline name) is in one of our shards.
+        """
+        return shard_of(key, self.shard_count) in self.owned
+
+    # ----- Create claims -----
+
+    def claim_creates(self, record_ids):
+        """
+        Claim the right to create the cards of these leads.
+
+        A lead someone else claimed less than claim_seconds ago (whether
+        or not their create went through yet) is left to them.
+
+        Returns:
+            Set of the record IDs this worker may create
+        """
+        record_ids = list(record_ids)
+        if not record_ids:
+            return set()
+
+        def claim(conn, now):
+            claimed = set()
+            stale_before = now - self.claim_seconds
+            for record_id in record_ids:
+                row = conn.execute(
+                    "SELECT worker_id, claimed_at, card_id FROM create_claims WHERE record_id = ?",
+                    (record_id,)
+                ).fetchone()
+                if row is not None and row[1] >= stale_before:
+                    if row[0] != self.worker_id or row[2] is not None:
+                        continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO create_claims VALUES (?, ?, ?, NULL)",
+                    (record_id, self.worker_id, now)
+                )
+                claimed.add(record_id)
+            conn.execute("DELETE FROM create_claims WHERE claimed_at < ?", (stale_before,))
+            return claimed
+
+        return self._transaction(claim)
+
+    def complete_create(self, record_id, card_id):
+        self._transaction(lambda conn, now: conn.execute(
+            "UPDATE create_claims SET card_id = ? WHERE record_id = ? AND worker_id = ?",
+            (card_id, record_id, self.worker_id)
+        ))
+
+    def release_create(self, record_id):
+        """
+        The create failed - let any worker try again.
+        """
+        self._transaction(lambda conn, now: conn.execute(
+            "DELETE FROM create_claims WHERE record_id = ? AND worker_id = ? AND card_id IS NULL",
+            (record_id, self.worker_id)
+        ))
+
+
+def _ranges(shards):
+    """
+    {0, 1, 2, 5} → "0-2,5" (for logs)
+    """
+    parts = []
+    for shard in sorted(shards):
+        if parts and parts[-1][1] == shard - 1:
+            parts[-1][1] = shard
+        else:
+            parts.append([shard, shard])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in parts) or "none"
@@ -0,0 +1,388 @@
+from services.link_index import LinkIndex
+
+# Operation kinds, in the order a plan runs them
+CREATE = "create"
+MOVE = "move"
+UPDATE = "update"
+UPDATE_DETAILS = "update_details"
+SET_STATUS = "set_status"
+
+OPERATION_ORDER = (CREATE, MOVE, UPDATE, UPDATE_DETAILS, SET_STATUS)
+
+
+class SyncOperation:
+    """
+    One planned write.
+
+    - create:         new card for a lead (name, list_id, email, source)
+    - move:           card goes to another list (and maybe gets renamed)
+    - update:         card renamed in place
+    - update_details: only the card description is out of date
+    - set_status:     Airtable status change triggered by a card's list
+
+    Card operations with update_details set also rewrite the description
+    from email / source.
+    """
+
+    def __init__(self, kind, record_id, card_id=None, name=None, list_id=None,
+                 status=None, email='', source='', fingerprint=None, label=None,
+                 changed_at=None, details_fingerprint=None, update_details=False):
+        self.kind = kind
+        self.record_id = record_id
+        self.card_id = card_id
+        self.name = name
+        self.list_id = list_id
+        self.status = status
+        self.email = email
+        self.source = source
+        self.fingerprint = fingerprint
+        self.details_fingerprint = details_fingerprint
+        self.update_details = update_details or kind == UPDATE_DETAILS
+        # Human-readable subject (lead or card name) for logs
+        self.label = label or name or record_id
+        # Source system's timestamp of the change (for propagation metrics)
+        self.changed_at = changed_at
+
+    def describe(self):
+        if self.kind == CREATE:
+            return f"+ Create card: {self.name}"
+        details = " (+ details)" if self.update_details else ""
+        if self.kind == MOVE:
+            return f"→ Move card: {self.label} (status: {self.status}){details}"
+        if self.kind == UPDATE:
+            return f"↻ Rename card: {self.label} → {self.name}{details}"
+        if self.kind == UPDATE_DETAILS:
+            return f"✎ Update card details: {self.label}"
+        return f"↻ Mark lead as {self.status}: {self.label}"
+
+    __str__ = describe
+
+
+class SyncPlan:
+    """
+    Ordered list of operations for a cycle (or one page of it), plus the
+    bookkeeping an executor needs besides the writes.
+    """
+
+    def __init__(self, record_notes=True):
+        """
+        Args:
+            record_notes: Keep per-record notes; off when nobody will log
+                          them (tallies are always kept)
+        """
+        self.record_notes = record_notes
+        self.operations = []
+        # Leads found already in sync: (record_id, card_id, status,
+        # list_id, name, fingerprint, details_fingerprint) - lets the
+        # next cycle take the link-index fast path
+        self.confirmed = []
+        # Decisions worth logging, in the order they were made, as
+        # (template, args) - only kept with record_notes, and only
+        # formatted if someone logs them
+        self.notes = []
+        # Counts for the cycle summary: records / checked (inputs looked
+        # at) and why the rest needed no write (up_to_date, lost, ...)
+        self.tally = {}
+        # {card_id: list_id} after the plan's card operations
+        self.planned_list_ids = {}
+
+    def note(self, template, *args):
+        if self.record_notes:
+            self.notes.append((template, args))
+
+    def count(self, key, template=None, *args):
+        """
+        Tally one record/card, optionally noting why.
+        """
+        self.tally[key] = self.tally.get(key, 0) + 1
+        if template:
+            self.note(template, *args)
+
+    def card_operations(self):
+        return [op for op in self.operations if op.kind != SET_STATUS]
+
+    def status_operations(self):
+        return [op for op in self.operations if op.kind == SET_STATUS]
+
+    def counts(self):
+        counts = dict.fromkeys(OPERATION_ORDER, 0)
+        for op in self.operations:
+            counts[op.kind] += 1
+        return counts
+
+    def summary(self):
+        counts = self.counts()
+        return ", ".join(f"{counts[kind]} {kind}" for kind in OPERATION_ORDER)
+
+    def __len__(self):
+        return len(self.operations)
+
+    def __iter__(self):
+        return iter(self.operations)
+
+
+class SyncPlanner:
+    """
+    Turns a SyncSnapshot into a SyncPlan.
+
+    Pure: no API calls and no writes - it only reads the snapshot and the
+    `is_unchanged` fast-path check. That makes a plan safe to print as a
+    dry run and cheap to benchmark, and leaves batching, parallelism and
+    rate limiting entirely to the executor.
+    """
+
+    def __init__(self, status_to_list_map, list_to_status_map,
+                 default_list_id, done_list_id, is_unchanged,
+                 record_changed_at=None, owns_record=None, details_changed=None,
+                 has_linked_card=None, record_notes=None):
+        """
+        Args:
+            status_to_list_map: {airtable_status: trello_list_id}
+            list_to_status_map: {trello_list_id: airtable_status}
+            default_list_id: List for statuses missing from the map
+            done_list_id: Cards here are never moved by the forward pass
+            is_unchanged: (record_id, card, fingerprint) -> True when the
+                          lead and card match what we last synced
+            record_changed_at: Optional lead -> when the lead was last
+                               edited (copied onto its operations)
+            owns_record: Optional record_id -> False for leads another
+                         worker syncs (sharding); they are left alone
+            details_changed: Optional (record_id, card,
+                             details_fingerprint) -> True when the card
+                             description no longer matches the lead's
+                             email / source
+            has_linked_card: Optional record_id -> True when the lead is
+                             already linked to a card; such a lead never
+                             gets a second card, even if its card is
+                             missing from the snapshot
+            record_notes: Optional () -> True when plans should keep their
+                          per-record notes (e.g. only while DEBUG logging
+                          is on); default: always
+        """
+        self.status_to_list_map = status_to_list_map
+        self.list_to_status_map = list_to_status_map
+        self.default_list_id = default_list_id
+        self.done_list_id = done_list_id
+        self.is_unchanged = is_unchanged
+        self.record_changed_at = record_changed_at or (lambda lead: None)
+        self.owns_record = owns_record or (lambda record_id: True)
+        self.details_changed = details_changed or (lambda record_id, card, details: False)
+        self.has_linked_card = has_linked_card or (lambda record_id: False)
+        self.record_notes = record_notes or (lambda: True)
+
+    def new_plan(self):
+        return SyncPlan(record_notes=self.record_notes())
+
+    def plan_initial(self, snapshot, records, plan=None):
+        """
+        Initial sync: a card for every lead that has none (LOST skipped).
+        """
+        plan = plan or self.new_plan()
+        creates = {}
+
+        for lead in records:
+            if not self.owns_record(lead.id):
+                plan.count("other_shard")
+                continue
+            plan.count("records")
+
+            if lead.status == "LOST":
+                plan.count("lost", "  ⊝ Skipping LOST lead: %s", lead.name)
+                continue
+
+            # IDEMPOTENCY CHECK: Skip if already exists
+            if snapshot.get_card(lead.id):
+                plan.count("already_synced", "  ✓ Already synced: %s", lead.name)
+                continue
+            if self.has_linked_card(lead.id):
+                plan.count("card_missing", "  ⚠ Linked card not on the board, not creating another: %s", lead.name)
+                continue
+
+            creates[lead.id] = self._create(lead)
+
+        self._add(plan, creates.values())
+        return plan
+
+    def plan_forward(self, snapshot, records, plan=None):
+        """
+        Airtable → Trello: create, move or rename cards to match leads.
+
+        IMPORTANT: cards already in the DONE list are never touched
+        (DONE = user manually marked complete, takes priority).
+        """
+        plan = plan or self.new_plan()
+        # One card operation per lead - a record listed twice keeps its last state
+        operations = {}
+
+        for lead in records:
+            record_id = lead.id
+            if not self.owns_record(record_id):
+                plan.count("other_shard")
+                continue
+            operations.pop(record_id, None)
+            plan.count("records")
+
+            # Skip LOST leads
+            if lead.status == "LOST":
+                plan.count("lost")
+                continue
+
+            existing_card = snapshot.get_card(record_id)
+            fingerprint = _fingerprint(lead)
+
+            # FAST PATH: lead unchanged since we last synced it, and the
+            # card still looks exactly like we left it
+            if existing_card and self.is_unchanged(record_id, existing_card, fingerprint):
+                plan.count("up_to_date", "  ✓ Up-to-date: %s", lead.name)
+                continue
+
+            if not existing_card:
+                # A linked card missing from the listing is not a lead
+                # without a card - creating one would duplicate it
+                if self.has_linked_card(record_id):
+                    plan.count("card_missing", "  ⚠ Linked card not on the board, not creating another: %s", lead.name)
+                    continue
+                operations[record_id] = self._create(lead, fingerprint)
+                continue
+
+            current_list_id = existing_card.list_id
+            current_name = existing_card.name
+
+            if current_list_id == self.done_list_id:
+                plan.count("done_list", "  🔒 Skipping (in DONE list): %s", lead.name)
+                continue
+
+            target_list_id = self._target_list(lead.status)
+            new_name = _card_name(lead)
+            details = _details_fingerprint(lead)
+            details_changed = self.details_changed(record_id, existing_card, details)
+
+            if current_list_id != target_list_id:
+                kind = MOVE
+            elif current_name != new_name:
+                kind = UPDATE
+            elif details_changed:
+                kind = UPDATE_DETAILS
+            else:
+                plan.count("up_to_date", "  ✓ Up-to-date: %s", lead.name)
+                # Remember it's in sync so next cycle takes the fast path
+                plan.confirmed.append((
+                    record_id, existing_card.id, lead.status,
+                    current_list_id, current_name, fingerprint, details
+                ))
+                continue
+
+            operations[record_id] = SyncOperation(
+                kind,
+                record_id,
+                card_id=existing_card.id,
+                name=new_name,
+                list_id=target_list_id,
+                status=lead.status,
+                email=lead.email,
+                source=lead.source,
+                fingerprint=fingerprint,
+                label=lead.name,
+                changed_at=self.record_changed_at(lead),
+                details_fingerprint=details,
+                update_details=details_changed
+            )
+
+        self._add(plan, operations.values())
+        return plan
+
+    def plan_reverse(self, snapshot, plan=None):
+        """
+        Trello → Airtable: cards in a trigger list (DONE) set their lead's
+        status (QUALIFIED).
+
+        Cards are judged by the list they will be in once the plan's card
+        operations have run, so a forward move and a status change never
+        contradict each other. Statuses of leads outside an incremental
+        delta must already be loaded into the snapshot.
+        """
+        plan = plan or self.new_plan()
+        statuses = {}
+
+        for card in snapshot.reverse_sync_candidates():
+            plan.count("checked")
+            card_name = card.name or 'Unknown'
+            card_list_id = plan.planned_list_ids.get(card.id, card.list_id)
+
+            # Linked Airtable ID (parsed once when the snapshot was built)
+            airtable_id = snapshot.get_airtable_id(card.id)
+            if not airtable_id or not self.owns_record(airtable_id):
+                continue
+
+            # Lead no longer exists in Airtable (or couldn't be loaded)
+            if not snapshot.has_record(airtable_id):
+                continue
+
+            # Check if this list triggers a status update
+            if card_list_id not in self.list_to_status_map:
+                continue
+
+            desired_status = self.list_to_status_map[card_list_id]
+
+            # IDEMPOTENCY: Only update if different
+            if snapshot.get_record_status(airtable_id) == desired_status:
+                plan.count("already_status", "  ✓ Already %s: %s", desired_status, card_name)
+                continue
+
+            # Several cards for one lead: the first one decides
+            if airtable_id in statuses:
+                continue
+
+            statuses[airtable_id] = SyncOperation(
+                SET_STATUS,
+                airtable_id,
+                card_id=card.id,
+                status=desired_status,
+                label=card_name
+            )
+
+        self._add(plan, statuses.values())
+        return plan
+
+    def _create(self, lead, fingerprint=None):
+        return SyncOperation(
+            CREATE,
+            lead.id,
+            name=_card_name(lead),
+            list_id=self._target_list(lead.status),
+            status=lead.status,
+            email=lead.email,
+            source=lead.source,
+            fingerprint=fingerprint or _fingerprint(lead),
+            label=lead.name,
+            changed_at=self.record_changed_at(lead),
+            details_fingerprint=_details_fingerprint(lead)
+        )
+
+    def _target_list(self, status):
+        return self.status_to_list_map.get(status, self.default_list_id)
+
+    def _add(self, plan, operations):
+        """
+        Append operations in execution order (creates, moves, renames,
+        status changes) and record where cards end up.
+        """
+        new_operations = sorted(operations, key=lambda op: OPERATION_ORDER.index(op.kind))
+        for op in new_operations:
+            plan.note("  %s", op)
+            if op.card_id and op.kind in (MOVE, UPDATE, UPDATE_DETAILS):
+                plan.planned_list_ids[op.card_id] = op.list_id
+        plan.operations.extend(new_operations)
+        plan.operations.sort(key=lambda op: OPERATION_ORDER.index(op.kind))
+
+
+def _card_name(lead):
+    return f"{lead.name} - {lead.status}"
+
+
+def _fingerprint(lead):
+    return LinkIndex.fingerprint(lead.name, lead.status, lead.email, lead.source)
+
+
+def _details_fingerprint(lead):
+    return LinkIndex.details_fingerprint(lead.email, lead.source)
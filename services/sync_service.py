@@ -1,7 +1,43 @@
-from clients.airtable_client import AirtableClient
+import functools
+import logging
+from clients.airtable_client import AirtableClient, AIRTABLE_BATCH_SIZE
+from clients.models import Card, Lead
 from clients.trello_client import TrelloClient
+from services.backfill import BackfillProgress, BackfillQueue, format_duration
+from services.link_index import LinkIndex
+from services.outbox import Outbox, CREATE_CARD, UPDATE_CARD, UPDATE_RECORDS_STATUS
+from services.pipelines import Pipeline
+from services.shard_coordinator import PARTITION_RECORD
+from services.sync_planner import SyncPlanner, CREATE, MOVE, UPDATE, UPDATE_DETAILS, SET_STATUS
+from services.sync_snapshot import SyncSnapshot
+from services.sync_state import SyncState
+from services.write_executor import WriteExecutor, WriteOperation
 from config import Config
-import time
+from logging_config import PER_RECORD
+from metrics import METRICS
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+AIRTABLE_WATERMARK_KEY = "airtable_watermark"
+TRELLO_ACTION_CURSOR_KEY = "trello_action_cursor"
+AIRTABLE_WEBHOOK_CURSOR_KEY = "airtable_webhook_cursor"
+TRELLO_REVERSE_ACTIVITY_KEY = "trello_reverse_activity"
+# Set once every footer-linked card also has its link custom field
+LINK_MIGRATED_KEY = "card_links_migrated"
+# Checkpoint of an unfinished backfill (its queue is in the outbox file)
+BACKFILL_KEY = "backfill"
+
+# The only fields the sync reads - fetches are projected to these
+AIRTABLE_SYNC_FIELDS = ("Name", "Status", "Email", "Source")
+TRELLO_SYNC_CARD_FIELDS = ("name", "desc", "idList", "dateLastActivity")
+# Once links live in a custom field (and every link has a details
+# fingerprint), descriptions aren't needed at all
+TRELLO_LINKED_CARD_FIELDS = ("name", "idList", "dateLastActivity")
+
+# Outbox replay looks for cards created this long before the oldest
+# journaled create (our clock vs Trello's)
+OUTBOX_CLOCK_SKEW_SECONDS = 300
 
 class SyncService:
     """
@@ -13,24 +49,115 @@ class SyncService:
     - Airtable QUALIFIED → Trello DONE list
     - Airtable LOST → No task created
     - Trello DONE → Airtable QUALIFIED
+    
+    (the defaults - each Pipeline can map statuses to its own lists)
     """
     
-    def __init__(self):
-        self.airtable = AirtableClient()
-        self.trello = TrelloClient()
+    def __init__(self, pipeline=None, writer=None, shards=None):
+        """
+        Args:
+            pipeline: Table/board pair to sync (default: the one in .env)
+            writer: WriteExecutor to send writes through (default: a
+                    private pool of WRITE_WORKERS)
+            shards: ShardCoordinator when several workers share the work
+                    (only leads in our shards are synced, creates are
+                    claimed first)
+        """
+        self.pipeline = pipeline or Pipeline.from_config()
+        self.shards = shards
+        self._shard_generation = shards.generation if shards else 0
+        owns_record = None
+        if shards is not None and shards.partition == PARTITION_RECORD:
+            owns_record = shards.owns
+        
+        airtable_fields = list(AIRTABLE_SYNC_FIELDS)
+        modified_field = None
+        if Config.AIRTABLE_INCREMENTAL:
+            # Needed to advance the watermark
+            modified_field = Config.AIRTABLE_LAST_MODIFIED_FIELD
+            airtable_fields.append(modified_field)
+        
+        # Cursors that survive restarts (incremental fetch watermark)
+        self.state = SyncState(self.pipeline.state_path)
+        
+        # Durable Airtable ID ↔ card ID links (rebuilt from the cards
+        # only when the database is missing or corrupt)
+        self.link_index = LinkIndex(self.pipeline.link_index_path)
+        
+        # Card links in a custom field: descriptions are only downloaded
+        # while some card may still be linked by its footer alone, or
+        # still has details the index has no fingerprint for
+        link_field_name = None
+        card_fields = TRELLO_SYNC_CARD_FIELDS
+        if Config.LINK_STORAGE == 'custom_field':
+            link_field_name = Config.TRELLO_LINK_FIELD_NAME
+            if (self.state.get(LINK_MIGRATED_KEY) and not self.link_index.needs_rebuild
+                    and not self.link_index.count_without_details()):
+                card_fields = TRELLO_LINKED_CARD_FIELDS
+        
+        # Responses are decoded straight into compact Lead / Card models
+        self.airtable = AirtableClient(
+            fields=airtable_fields,
+            base_id=self.pipeline.airtable_base_id,
+            table_name=self.pipeline.airtable_table_name,
+            api_key=self.pipeline.airtable_api_key,
+            decode=functools.partial(Lead.from_api, modified_field=modified_field)
+        )
+        self.trello = TrelloClient(
+            card_fields=card_fields,
+            board_id=self.pipeline.trello_board_id,
+            api_key=self.pipeline.trello_api_key,
+            token=self.pipeline.trello_token,
+            decode=self._decode_card,
+            link_field_name=link_field_name
+        )
         
         # Status mapping: Airtable → Trello List
-        self.status_to_list_map = {
-            "NEW": Config.TRELLO_LIST_TODO_ID,
-            "CONTACTED": Config.TRELLO_LIST_TODO_ID,
-            "IN_PROGRESS": Config.TRELLO_LIST_TODO_ID,
-            "QUALIFIED": Config.TRELLO_LIST_DONE_ID,
-        }
+        self.status_to_list_map = dict(self.pipeline.status_to_list)
         
         # Reverse mapping: Trello List → Airtable Status
-        self.list_to_status_map = {
-            Config.TRELLO_LIST_DONE_ID: "QUALIFIED",
+        self.list_to_status_map = dict(self.pipeline.list_to_status)
+        
+        # Writes in flight, journaled before they are sent so a run that
+        # dies mid-cycle can be finished on the next start
+        self.outbox = Outbox(self.pipeline.outbox_path)
+        
+        # {airtable_id: status} kept across cycles, so incremental cycles
+        # still know the status of leads that didn't change
+        self.record_status_cache = {}
+        
+        # {card_id: card} kept up to date from the Trello change feed.
+        # None until the first full listing of this process.
+        self.card_cache = None
+        
+        # Cards whose reverse-sync write failed - re-checked next cycle
+        self.retry_card_ids = set()
+        
+        # Worker pool for card creates/updates and Airtable batches
+        self.writer = writer or WriteExecutor(Config.WRITE_WORKERS)
+        
+        # Client write method ↔ outbox entry kind
+        self._write_kinds = {
+            self.trello.create_card: CREATE_CARD,
+            self.trello.update_card: UPDATE_CARD,
+            self.airtable.update_records_status: UPDATE_RECORDS_STATUS,
         }
+        self._write_fns = {kind: fn for fn, kind in self._write_kinds.items()}
+        
+        # Decides what to write; the methods below only execute its plans
+        self.planner = SyncPlanner(
+            self.status_to_list_map,
+            self.list_to_status_map,
+            default_list_id=self.pipeline.todo_list_id,
+            done_list_id=self.pipeline.done_list_id,
+            is_unchanged=self._is_unchanged,
+            record_changed_at=self._record_changed_at,
+            owns_record=owns_record,
+            details_changed=self._details_changed,
+            has_linked_card=self._has_linked_card,
+            # Notes are only ever logged at DEBUG - don't collect them otherwise
+            record_notes=lambda: logger.isEnabledFor(logging.DEBUG)
+        )
     
     def initial_sync(self):
         """
@@ -39,93 +166,411 @@ class SyncService:
         This is run once at startup or manually to establish the baseline.
         Idempotent: Won't create duplicates if tasks already exist.
         """
-        print("\n" + "="*60)
-        print("🚀 INITIAL SYNC: Airtable → Trello")
-        print("="*60)
+        logger.info("🚀 INITIAL SYNC: Airtable → Trello")
+        
+        snapshot = None
+        METRICS.start_cycle("initial", self.pipeline.name)
         
         try:
-            # Fetch all leads from Airtable
-            airtable_records = self.airtable.get_all_records()
+            # Fetch all leads and existing cards (to check for duplicates) once
+            snapshot = self._capture_snapshot()
+            airtable_records = snapshot.airtable_records
             
-            # Fetch existing Trello cards to check for duplicates
-            trello_cards = self.trello.get_all_cards_on_board()
+            logger.info("Found %d leads in Airtable, %d already synced to Trello",
+                        len(airtable_records), len(snapshot.card_by_airtable_id))
             
-            # Build map of existing Airtable IDs in Trello
-            existing_airtable_ids = set()
-            for card in trello_cards:
-                airtable_id = self.trello.extract_airtable_id_from_description(
-                    card.get('desc', '')
-                )
-                if airtable_id:
-                    existing_airtable_ids.add(airtable_id)
+            with METRICS.phase("plan"):
+                plan = self.planner.plan_initial(snapshot, airtable_records)
+            skipped_count = len(airtable_records) - len(plan)
             
-            print(f"Found {len(airtable_records)} leads in Airtable")
-            print(f"Found {len(existing_airtable_ids)} already synced to Trello\n")
+            # Creates run on the write pool
+            created_count = self._execute_card_operations(snapshot, plan)
             
-            created_count = 0
-            skipped_count = 0
+            self._log_initial_summary(created_count, skipped_count)
+            METRICS.finish_cycle(created_count)
             
-            # Process each lead
-            for record in airtable_records:
-                record_id = record['id']
-                fields = record.get('fields', {})
-                
-                # Extract lead data
-                lead_name = fields.get('Name', 'Unnamed Lead')
-                lead_status = fields.get('Status', 'NEW')
-                lead_email = fields.get('Email', '')
-                lead_source = fields.get('Source', '')
-                
-                # Skip if status is LOST (per assignment requirements)
-                if lead_status == "LOST":
-                    print(f"  ⊝ Skipping LOST lead: {lead_name}")
-                    skipped_count += 1
-                    continue
-                
-                # IDEMPOTENCY CHECK: Skip if already exists
-                if record_id in existing_airtable_ids:
-                    print(f"  ✓ Already synced: {lead_name}")
-                    skipped_count += 1
-                    continue
-                
-                # Determine which Trello list to use
-                target_list_id = self.status_to_list_map.get(
-                    lead_status,
-                    Config.TRELLO_LIST_TODO_ID  # Default to TODO
-                )
-                
-                # Build card description with lead details
-                card_description = self._build_task_description(
-                    email=lead_email,
-                    source=lead_source,
-                    airtable_id=record_id
-                )
-                
-                # Create Trello card (task)
-                card_title = f"{lead_name} - {lead_status}"
-                print(f"  + Creating task: {card_title}")
-                
-                result = self.trello.create_card(
-                    name=card_title,
-                    description=card_description,
-                    list_id=target_list_id
+        except Exception as e:
+            logger.error("❌ Initial sync failed: %s", e)
+            # Let creates that were already queued finish and get linked
+            operations = self.writer.drain()
+            if snapshot is not None:
+                self._apply_card_writes(snapshot, operations)
+            METRICS.finish_cycle(None, error=str(e))
+            raise
+    
+    def backfill(self, limit=None, since=None):
+        """
+        BACKFILL: initial sync for large bases, in resumable chunks.
+        
+        The first run reads Airtable once, lists the board once and queues
+        a create for every lead without a card. The queue is then worked
+        off in chunks of BACKFILL_CHUNK_SIZE creates, which run concurrently
+        on the write pool (as fast as the Trello rate limit allows). After
+        each chunk the checkpoint is saved and progress (throughput, ETA)
+        is logged.
+        
+        If the run stops (Ctrl+C, crash, failed creates), the next call
+        resumes the queue where it stopped. It does not read Airtable or
+        list the board again.
+        
+        Args:
+            limit: Create at most this many cards (stage a big backfill)
+            since: Only leads created after this time, as a normalised
+                   UTC timestamp ("2024-01-31T00:00:00.000Z") - it goes
+                   into the Airtable formula as is
+        
+        Returns:
+            Number of cards created by this run
+        """
+        queue = BackfillQueue(self.pipeline.outbox_path)
+        checkpoint = self.state.get(BACKFILL_KEY)
+        
+        METRICS.start_cycle("backfill", self.pipeline.name)
+        try:
+            if checkpoint is None:
+                checkpoint = self._queue_backfill(queue, limit, since)
+            else:
+                if (limit, since) not in ((None, None), (checkpoint['limit'], checkpoint['since'])):
+                    logger.warning("⚠ Finishing the unfinished backfill first (limit=%s, since=%s) - "
+                                   "run again afterwards for the new one",
+                                   checkpoint['limit'], checkpoint['since'])
+                logger.info("⏯ Resuming backfill: %d of %d creates left",
+                            queue.count(), checkpoint['total'])
+        
+            created = self._run_backfill(queue, checkpoint)
+            METRICS.finish_cycle(created)
+            return created
+        except BaseException as e:
+            METRICS.finish_cycle(None, error=str(e) or type(e).__name__)
+            raise
+    
+    def _queue_backfill(self, queue, limit, since):
+        """
+        First run of a backfill: plan a create for every lead without a
+        card (up to `limit`) and queue them.
+        
+        Returns:
+            The new checkpoint
+        """
+        logger.info("🚀 BACKFILL: queueing creates (limit=%s, since=%s)", limit, since)
+        queue.clear()
+        
+        # One full listing to skip leads that already have a card; a failed
+        # listing must stop the backfill, not look like an empty board
+        with METRICS.phase("trello_fetch"):
+            trello_cards = self.trello.get_board_cards()
+        snapshot = self._capture_snapshot(airtable_records=[], trello_cards=trello_cards)
+        
+        formula = None
+        if since:
+            formula = f"IS_AFTER(CREATED_TIME(), DATETIME_PARSE('{since}'))"
+        
+        leads = queued = 0
+        for page in self.airtable.iter_record_pages(formula):
+            leads += len(page)
+            with METRICS.phase("plan"):
+                plan = self.planner.plan_initial(snapshot, page)
+            creates = [op for op in plan.operations if op.kind == CREATE]
+            if limit is not None:
+                creates = creates[:max(0, limit - queued)]
+            queued += queue.add(creates)
+            if limit is not None and queued >= limit:
+                break
+        
+        checkpoint = {
+            'limit': limit,
+            'since': since,
+            'total': queued,
+            'queued_at': _format_timestamp(datetime.now(timezone.utc)),
+        }
+        self.state.set(BACKFILL_KEY, checkpoint)
+        logger.info("📥 Backfill queued %d creates from %d leads (%d cards already on the board)",
+                    queued, leads, len(trello_cards))
+        return checkpoint
+    
+    def _run_backfill(self, queue, checkpoint):
+        """
+        Work off the backfill queue chunk by chunk, saving the checkpoint
+        after each one.
+        
+        Returns:
+            Number of cards created by this run
+        """
+        progress = BackfillProgress(checkpoint['total'], done=checkpoint['total'] - queue.count())
+        # Creates only patch this empty snapshot; links go to the index
+        snapshot = self._capture_snapshot(
+            airtable_records=[],
+            trello_cards=[],
+            airtable_is_full=False,
+            changed_card_ids=set()
+        )
+        
+        position = 0
+        failed = 0
+        while True:
+            chunk = queue.next_chunk(position, Config.BACKFILL_CHUNK_SIZE)
+            if not chunk:
+                break
+            position = chunk[-1].position
+        
+            # Created meanwhile (outbox replay, a sync cycle) or another
+            # worker's - nothing left to do for these
+            done = {item.record_id for item in chunk if self.link_index.get(item.record_id)}
+            chunk = [item for item in chunk if item.record_id not in done]
+            if self.shards is not None and chunk:
+                claimed = self.shards.claim_creates(item.record_id for item in chunk)
+                done.update(item.record_id for item in chunk if item.record_id not in claimed)
+                chunk = [item for item in chunk if item.record_id in claimed]
+            queue.remove(done)
+        
+            writes = self._journal([
+                self._create_card_write(
+                    item.record_id, item.name, item.list_id, item.status,
+                    item.email, item.source, item.fingerprint,
+                    details_fingerprint=item.details_fingerprint
                 )
-                
-                if result:
-                    created_count += 1
-                
-                # Rate limiting: Be gentle with APIs
-                time.sleep(0.5)
+                for item in chunk
+            ])
+            interrupted = False
+            with METRICS.phase("write"):
+                try:
+                    for key, fn, kwargs, context in writes:
+                        self.writer.submit(key, fn, context=context, **kwargs)
+                    operations = self.writer.drain()
+                except KeyboardInterrupt:
+                    # Stop soon: creates already sent finish and get linked,
+                    # the rest stay queued for the next run
+                    interrupted = True
+                    self.writer.cancel()
+                    operations = self.writer.drain()
             
-            print(f"\n✅ Initial sync complete:")
-            print(f"   - Created: {created_count} tasks")
-            print(f"   - Skipped: {skipped_count} (already synced or LOST)")
+            cancelled = [op for op in operations if op.future.cancelled()]
+            self.outbox.complete(op.context.get('outbox_id') for op in cancelled)
+            operations = [op for op in operations if not op.future.cancelled()]
             
-        except Exception as e:
-            print(f"\n❌ Initial sync failed: {e}")
-            raise
+            created = self._apply_card_writes(snapshot, operations)
+            queue.remove(op.context['record_id'] for op in operations if op.ok)
+            failed += len(operations) - created
+            progress.update(checkpoint['total'] - queue.count(), created)
+            logger.info("📦 Backfill: %s", progress.describe(queue.count() - failed))
+            if interrupted:
+                raise KeyboardInterrupt
+        
+        remaining = queue.count()
+        if remaining:
+            logger.warning("⚠ Backfill stopped with %d failed creates still queued - "
+                           "run it again to retry them", remaining)
+        else:
+            self.state.delete(BACKFILL_KEY)
+            logger.info("✅ Backfill complete: %d cards created (%d this run, in %s)",
+                        progress.done, progress.done_this_run, format_duration(progress.elapsed))
+        return progress.done_this_run
+    
+    def recover_outbox(self):
+        """
+        Finish the writes the last run journaled but never completed
+        (it crashed or was killed mid-cycle). Call once before the first
+        cycle; costs one query when the outbox is empty.
+        
+        Replays are idempotent:
+        - a create may have gone through before the crash, so the board's
+          card actions since the oldest journaled create are checked for
+          the card first - only leads without one get a new card
+        - a card move is dropped if the card has been moved to DONE since
+          (DONE takes priority), or deleted
+        - status changes are simply sent again
+        
+        Returns:
+            Number of journaled writes that were resolved
+        """
+        entries = self.outbox.pending()
+        if not entries:
+            return 0
+        
+        logger.warning("♻ %d writes left unfinished by the last run - replaying them", len(entries))
+        
+        # Nothing is read in bulk: the replayed writes patch an empty snapshot
+        snapshot = self._capture_snapshot(
+            airtable_records=[],
+            trello_cards=[],
+            known_statuses=self.record_status_cache,
+            airtable_is_full=False,
+            changed_card_ids=set()
+        )
+        
+        creates = [entry for entry in entries if entry.kind == CREATE_CARD]
+        existing = self._find_created_cards(creates)
+        if existing is None:
+            # Can't tell which creates went through - keep them for next time
+            logger.warning("⚠ Could not check Trello for cards created before the crash - "
+                           "%d creates stay in the outbox", len(creates))
+            entries = [entry for entry in entries if entry.kind != CREATE_CARD]
+            creates, existing = [], {}
+        
+        claimed = None
+        if self.shards is not None:
+            claimed = self.shards.claim_creates(
+                entry.context['record_id'] for entry in creates
+                if entry.context['record_id'] not in existing
+            )
+        
+        found, writes, dropped = [], [], []
+        status_updates = {}
+        for entry in entries:
+            context = dict(entry.context, outbox_id=entry.id)
+            if entry.kind == CREATE_CARD:
+                record_id = context['record_id']
+                if record_id in existing:
+                    # Went through before the crash - just link it
+                    operation = WriteOperation(record_id, context, None)
+                    operation.result = existing[record_id]
+                    found.append(operation)
+                    continue
+                if claimed is not None and record_id not in claimed:
+                    # Another worker has claimed the lead since
+                    dropped.append(entry.id)
+                    continue
+            elif entry.kind == UPDATE_CARD and not self._card_update_still_wanted(context):
+                dropped.append(entry.id)
+                continue
+            elif entry.kind == UPDATE_RECORDS_STATUS:
+                status_updates.update(entry.kwargs['statuses'])
+            writes.append((entry.key, self._write_fns[entry.kind], entry.kwargs, context))
+        
+        self.outbox.complete(dropped)
+        self._apply_card_writes(snapshot, found)
+        
+        for key, fn, kwargs, context in writes:
+            self.writer.submit(key, fn, context=context, **kwargs)
+        operations = self.writer.drain()
+        
+        card_writes = [op for op in operations if 'record_ids' not in op.context]
+        status_writes = [op for op in operations if 'record_ids' in op.context]
+        self._apply_card_writes(snapshot, card_writes)
+        if status_writes:
+            card_ids = {
+                record_id: (self.link_index.get(record_id) or {}).get('card_id')
+                for record_id in status_updates
+            }
+            self._apply_status_writes(snapshot, status_updates, card_ids, status_writes)
+        self.link_index.commit()
+        
+        # Failed replays are picked up by the normal cycles
+        self.retry_card_ids |= snapshot.failed_card_ids
+        logger.info(
+            "✓ Outbox replayed: %d creates had gone through, %d writes re-sent "
+            "(%d failed), %d no longer wanted",
+            len(found), len(writes),
+            len(snapshot.failed_record_ids) + len(snapshot.failed_card_ids), len(dropped)
+        )
+        return len(found) + len(writes) + len(dropped)
+    
+    def _find_created_cards(self, creates):
+        """
+        Cards that journaled creates produced before the crash.
+        
+        Only the board's card actions since the oldest create are read,
+        and only cards with a journaled name are fetched - the cost grows
+        with the writes that were in flight, not with the board.
+        
+        Returns:
+            {record_id: card}, or None if Trello couldn't be read
+        """
+        found = {}
+        wanted = {}
+        for entry in creates:
+            record_id = entry.context['record_id']
+            link = self.link_index.get(record_id)
+            if link is not None:
+                # Linked before the crash, only the outbox wasn't updated
+                found[record_id] = Card(link['card_id'], name=link['name'], list_id=link['list_id'])
+            else:
+                wanted.setdefault(entry.kwargs['name'], set()).add(record_id)
+        if not wanted:
+            return found
+        
+        oldest = min(entry.created_at for entry in creates) - OUTBOX_CLOCK_SKEW_SECONDS
+        # Trello takes a date as well as an action ID for `since`
+        actions = self.trello.get_board_actions(
+            since=_format_timestamp(datetime.fromtimestamp(oldest, timezone.utc))
+        )
+        if actions is None:
+            return None
+        
+        for action in actions:
+            if action.get('type') not in ("createCard", "copyCard"):
+                continue
+            created = action.get('data', {}).get('card', {})
+            if created.get('name') not in wanted:
+                continue
+            # With the description: the crash may have come before the
+            # link field was set
+            card = self.trello.get_card(created['id'], card_fields=TRELLO_SYNC_CARD_FIELDS)
+            if card is None:
+                continue
+            record_id = self.trello.linked_airtable_id(card)
+            if record_id in wanted[created['name']]:
+                if self.trello.link_field_name and card.link is None:
+                    self.trello.set_card_link(card.id, record_id)
+                found[record_id] = card
+        return found
     
-    def sync_airtable_to_trello(self):
+    def _card_update_still_wanted(self, context):
+        """
+        False if a journaled card move/rename would now undo someone's
+        change: the card is gone, or was moved to DONE in the meantime.
+        """
+        card = self.trello.get_card(context['card_id'])
+        if card is None:
+            return False
+        done_list_id = self.pipeline.done_list_id
+        return card.list_id != done_list_id or context['list_id'] == done_list_id
+    
+    def migrate_links(self):
+        """
+        One-off migration to LINK_STORAGE=custom_field: copy the Airtable
+        ID of every card linked only by its description footer into the
+        link custom field.
+        
+        Safe to re-run (cards that already have the field are skipped).
+        Once every card is migrated, later runs stop downloading
+        descriptions.
+        
+        Returns:
+            Number of cards migrated
+        """
+        if not self.trello.link_field_name:
+            raise ValueError("LINK_STORAGE must be 'custom_field' to migrate card links")
+        
+        logger.info("🔗 Migrating card links to the '%s' custom field", self.trello.link_field_name)
+        cards = self.trello.get_board_cards(card_fields=TRELLO_SYNC_CARD_FIELDS)
+        
+        already_linked = 0
+        for card in cards:
+            if card.link:
+                already_linked += 1
+                continue
+            record_id = self.trello.extract_airtable_id_from_description(card.desc)
+            if record_id:
+                self.writer.submit(card.id, self.trello.set_card_link,
+                                   card_id=card.id, airtable_id=record_id)
+        operations = self.writer.drain()
+        
+        migrated = sum(1 for operation in operations if operation.ok)
+        failed = len(operations) - migrated
+        if failed:
+            logger.warning("⚠ Migrated %d card links, %d failed - run the migration again", migrated, failed)
+        else:
+            self.state.set(LINK_MIGRATED_KEY, True)
+            logger.info("✓ Migrated %d card links (%d cards already had one)",
+                        migrated, already_linked)
+        return migrated
+    
+    def _decode_card(self, data):
+        # Bound late: the link field ID is only known after the first request
+        return Card.from_api(data, link_field_id=self.trello.link_field_id)
+    
+    def sync_airtable_to_trello(self, snapshot=None, record_pages=None):
         """
         CONTINUOUS SYNC: Airtable → Trello
         
@@ -134,147 +579,686 @@ class SyncService:
         
         IMPORTANT: Does NOT move cards that are already in DONE list
         (DONE list = user manually marked complete, takes priority)
+        
+        Args:
+            snapshot: SyncSnapshot shared with the reverse pass. Captured
+                      fresh when called on its own.
+            record_pages: Optional iterator of record pages (streamed full
+                          scan). Each page is joined against the card index
+                          as it arrives and then dropped, so memory stays
+                          at one page plus the index.
         """
-        print("\n🔄 Syncing: Airtable → Trello...")
+        logger.debug("🔄 Syncing: Airtable → Trello...")
         
         try:
-            airtable_records = self.airtable.get_all_records()
-            trello_cards = self.trello.get_all_cards_on_board()
+            if snapshot is None:
+                snapshot = self._capture_snapshot()
             
-            # Build lookup map: {airtable_id: trello_card}
-            trello_card_map = {}
-            for card in trello_cards:
-                airtable_id = self.trello.extract_airtable_id_from_description(
-                    card.get('desc', '')
-                )
-                if airtable_id:
-                    trello_card_map[airtable_id] = card
+            if record_pages is None:
+                record_pages = [snapshot.airtable_records]
+            else:
+                record_pages = self._streamed_pages(snapshot, record_pages)
             
-            for record in airtable_records:
-                record_id = record['id']
-                fields = record.get('fields', {})
-                
-                lead_name = fields.get('Name', 'Unnamed Lead')
-                lead_status = fields.get('Status', 'NEW')
-                lead_email = fields.get('Email', '')
-                lead_source = fields.get('Source', '')
-                
-                # Skip LOST leads
-                if lead_status == "LOST":
-                    continue
-                
-                # Determine target list based on Airtable status
-                target_list_id = self.status_to_list_map.get(
-                    lead_status,
-                    Config.TRELLO_LIST_TODO_ID
-                )
-                
-                if record_id in trello_card_map:
-                    # EXISTS - check if update needed
-                    existing_card = trello_card_map[record_id]
-                    current_list_id = existing_card.get('idList')
-                    current_name = existing_card.get('name', '')
-                    
-                    # KEY FIX: Don't touch cards that are in DONE list
-                    # User manually moved them there - respect that decision
-                    if current_list_id == Config.TRELLO_LIST_DONE_ID:
-                        print(f"  🔒 Skipping (in DONE list): {lead_name}")
-                        continue
-                    
-                    new_name = f"{lead_name} - {lead_status}"
-                    
-                    # Update if status changed (list or name different)
-                    needs_update = (
-                        current_list_id != target_list_id or
-                        current_name != new_name
-                    )
-                    
-                    if needs_update:
-                        print(f"  ↻ Updating: {lead_name} (status: {lead_status})")
-                        self.trello.update_card(
-                            card_id=existing_card['id'],
-                            name=new_name,
-                            list_id=target_list_id
-                        )
-                    else:
-                        print(f"  ✓ Up-to-date: {lead_name}")
-                else:
-                    # DOESN'T EXIST - create new
-                    print(f"  + Creating: {lead_name} - {lead_status}")
-                    
-                    card_description = self._build_task_description(
-                        email=lead_email,
-                        source=lead_source,
-                        airtable_id=record_id
-                    )
-                    
-                    self.trello.create_card(
-                        name=f"{lead_name} - {lead_status}",
-                        description=card_description,
-                        list_id=target_list_id
-                    )
-                    
-                    time.sleep(0.5)  # Rate limiting
+            complete = True
+            for page in record_pages:
+                try:
+                    # Plan this page against the card index, then run the plan
+                    with METRICS.phase("plan"):
+                        plan = self.planner.plan_forward(snapshot, page)
+                    self._execute_card_operations(snapshot, plan)
+                except Exception as e:
+                    # One bad page doesn't cost the other pages their sync;
+                    # the watermark stays put so it is read again
+                    logger.error("✗ Airtable → Trello sync error (page of %d leads): %s", len(page), e)
+                    complete = False
+            
+            snapshot.forward_pass_complete = complete
             
         except Exception as e:
-            print(f"✗ Airtable → Trello sync error: {e}")
+            logger.error("✗ Airtable → Trello sync error: %s", e)
+            # Writes already queued still run - record what they did
+            if snapshot is not None:
+                self._apply_card_writes(snapshot, self.writer.drain())
+        finally:
+            # Flush the fast-path links recorded with commit=False
+            self.link_index.commit()
+        
+        if snapshot is not None:
+            self._log_forward_summary(snapshot)
+    
+    def _streamed_pages(self, snapshot, record_pages):
+        """
+        Index each streamed page in the snapshot before it is synced.
+        """
+        streamed = 0
+        for page in record_pages:
+            self._add_record_page(snapshot, page)
+            streamed += len(page)
+            yield page
+        
+        METRICS.count_records("airtable_records", streamed)
+        logger.info("✓ Streamed %d records from Airtable", streamed)
+    
+    def _add_record_page(self, snapshot, page):
+        snapshot.add_airtable_records(page, keep=False)
+        self._track_newest_modified(snapshot, page)
+    
+    def _execute_card_operations(self, snapshot, plan):
+        """
+        Run a plan's card creates/moves/renames on the write pool and patch
+        the snapshot / link index with the outcome.
+        
+        Returns:
+            Number of card writes that succeeded
+        """
+        self._begin_plan(plan)
+        snapshot.record_plan("forward", plan)
+        
+        with METRICS.phase("trello_writes"):
+            writes = self._journal([self._write_for_operation(op) for op in plan.card_operations()])
+            for key, fn, kwargs, context in writes:
+                self.writer.submit(key, fn, context=context, **kwargs)
+            
+            # Wait for the writes and patch the snapshot with them
+            return self._apply_card_writes(snapshot, self.writer.drain())
+    
+    def _journal(self, writes):
+        """
+        Record (key, fn, kwargs, context) writes in the outbox before they
+        are sent. Each context gets the 'outbox_id' of its entry.
+        
+        Returns:
+            The same writes
+        """
+        if not writes:
+            return writes
+        
+        entry_ids = self.outbox.add(
+            (self._write_kinds[fn], key, kwargs, context)
+            for key, fn, kwargs, context in writes
+        )
+        for (_, _, _, context), entry_id in zip(writes, entry_ids):
+            context['outbox_id'] = entry_id
+        return writes
+    
+    def _begin_plan(self, plan):
+        """
+        Log a plan's decisions and remember the leads it found in sync
+        (next cycle they take the link-index fast path).
+        """
+        self._claim_creates(plan)
+        self._log_notes(plan)
+        METRICS.count_records("planned_operations", len(plan))
+        
+        for record_id, card_id, status, list_id, name, fingerprint, details in plan.confirmed:
+            self.link_index.link(
+                record_id, card_id,
+                status=status,
+                list_id=list_id,
+                name=name,
+                fingerprint=fingerprint,
+                details_fingerprint=details,
+                commit=False
+            )
+    
+    def _claim_creates(self, plan):
+        """
+        Sharded mode: drop the creates another worker has already claimed
+        (e.g. the previous owner of a shard we just took over).
+        """
+        if self.shards is None:
+            return
+        
+        creates = [op.record_id for op in plan.operations if op.kind == CREATE]
+        if not creates:
+            return
+        
+        claimed = self.shards.claim_creates(creates)
+        if len(claimed) == len(creates):
+            return
+        
+        plan.operations = [
+            op for op in plan.operations
+            if op.kind != CREATE or op.record_id in claimed
+        ]
+        skipped = len(creates) - len(claimed)
+        plan.tally["claimed_elsewhere"] = plan.tally.get("claimed_elsewhere", 0) + skipped
+        logger.info("⏭ %d card creates left to the worker that claimed them first", skipped)
     
-    def sync_trello_to_airtable(self):
+    def _shards_gained(self):
+        """
+        True once after this worker took over shards: their leads may sit
+        behind our watermark / change-feed cursor, so read everything.
+        """
+        if self.shards is None or self.shards.generation == self._shard_generation:
+            return False
+        self._shard_generation = self.shards.generation
+        return True
+    
+    def _log_notes(self, plan):
+        """
+        A plan's per-record decisions - DEBUG only (sampled), and not even
+        formatted unless DEBUG is on.
+        """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        for template, args in plan.notes:
+            logger.debug(template, *args, extra=PER_RECORD)
+    
+    def _log_initial_summary(self, created_count, skipped_count):
+        logger.info(
+            "✅ Initial sync complete: %d created, %d skipped (already synced or LOST)",
+            created_count, skipped_count,
+            extra={"data": {"created": created_count, "skipped": skipped_count}}
+        )
+    
+    def _log_forward_summary(self, snapshot):
+        """
+        One INFO line for the whole Airtable → Trello pass.
+        """
+        totals = snapshot.plan_totals["forward"]
+        data = {
+            "direction": "airtable_to_trello",
+            "leads": totals.get("records", 0),
+            "created": totals.get(CREATE, 0),
+            "moved": totals.get(MOVE, 0),
+            "renamed": totals.get(UPDATE, 0),
+            "details_updated": totals.get(UPDATE_DETAILS, 0),
+            "up_to_date": totals.get("up_to_date", 0),
+            "in_done": totals.get("done_list", 0),
+            "lost": totals.get("lost", 0),
+            "failed": len(snapshot.failed_record_ids),
+            # Sharded mode: leads synced by other workers
+            "other_shards": totals.get("other_shard", 0),
+            "claimed_elsewhere": totals.get("claimed_elsewhere", 0),
+        }
+        logger.info(
+            "📋 Airtable → Trello: %(leads)d leads - %(created)d created, %(moved)d moved, "
+            "%(renamed)d renamed, %(details_updated)d details updated, %(up_to_date)d up to date, %(in_done)d in DONE, "
+            "%(lost)d LOST, %(failed)d failed",
+            data, extra={"data": data}
+        )
+    
+    def _log_reverse_summary(self, snapshot):
+        """
+        One INFO line for the whole Trello → Airtable pass.
+        """
+        totals = snapshot.plan_totals["reverse"]
+        data = {
+            "direction": "trello_to_airtable",
+            "cards": totals.get("checked", 0),
+            "status_changes": totals.get(SET_STATUS, 0),
+            "already_set": totals.get("already_status", 0),
+            "failed": len(snapshot.failed_card_ids),
+        }
+        logger.info(
+            "📋 Trello → Airtable: %(cards)d cards checked - %(status_changes)d status changes, "
+            "%(already_set)d already set, %(failed)d failed",
+            data, extra={"data": data}
+        )
+    
+    def _write_for_operation(self, op):
+        """
+        (key, fn, kwargs, context) for one planned card operation.
+        
+        Shared by the blocking and the asyncio engine.
+        """
+        if op.kind == CREATE:
+            return self._create_card_write(
+                op.record_id, op.name, op.list_id, op.status,
+                op.email, op.source, op.fingerprint, op.changed_at,
+                details_fingerprint=op.details_fingerprint
+            )
+        
+        kwargs = {
+            'card_id': op.card_id,
+            'name': op.name,
+            'list_id': op.list_id,
+        }
+        context = {
+            'action': 'update',
+            'record_id': op.record_id,
+            'card_id': op.card_id,
+            'status': op.status,
+            'list_id': op.list_id,
+            'name': op.name,
+            'fingerprint': op.fingerprint,
+            'details_fingerprint': op.details_fingerprint,
+            'changed_at': op.changed_at,
+        }
+        # Email / source changed: rewrite the details block in the same
+        # request (the rest of the description is left as the user wrote it)
+        if op.update_details:
+            kwargs['details'] = self._build_task_details(email=op.email, source=op.source)
+            kwargs['airtable_id'] = op.record_id
+        return op.card_id, self.trello.update_card, kwargs, context
+    
+    def _create_card_write(self, record_id, card_title, list_id, status,
+                           email, source, fingerprint, changed_at=None,
+                           details_fingerprint=None):
+        """
+        (key, fn, kwargs, context) for creating the card of a lead.
+        """
+        # Build card description with lead details
+        card_description = self._build_task_description(
+            email=email,
+            source=source,
+            airtable_id=record_id
+        )
+        
+        return (
+            record_id,
+            self.trello.create_card,
+            {
+                'name': card_title,
+                'description': card_description,
+                'list_id': list_id,
+                'link': record_id,
+            },
+            {
+                'action': 'create',
+                'record_id': record_id,
+                'status': status,
+                'list_id': list_id,
+                'name': card_title,
+                'fingerprint': fingerprint,
+                'details_fingerprint': details_fingerprint,
+                'changed_at': changed_at,
+            }
+        )
+    
+    def sync_trello_to_airtable(self, snapshot=None):
         """
         REVERSE SYNC: Trello → Airtable
         
         When a task is moved to DONE list, mark the lead as QUALIFIED.
         Implements idempotency: Won't update if already QUALIFIED.
+        
+        Status changes are queued while scanning cards and then flushed in
+        multi-record batches (10 records per Airtable request).
+        
+        Args:
+            snapshot: SyncSnapshot shared with the forward pass. When called
+                      on its own, only the trigger lists are fetched.
         """
-        print("\n🔄 Syncing: Trello → Airtable...")
+        logger.debug("🔄 Syncing: Trello → Airtable...")
+        
+        standalone = snapshot is None
         
         try:
-            trello_cards = self.trello.get_all_cards_on_board()
-            airtable_records = self.airtable.get_all_records()
+            if standalone:
+                METRICS.start_cycle("reverse", self.pipeline.name)
+                snapshot = self._capture_trigger_list_snapshot()
+                if snapshot is None:
+                    METRICS.finish_cycle(None, error="trigger lists unavailable")
+                    return
             
-            # Build status lookup
-            airtable_status_map = {
-                record['id']: record.get('fields', {}).get('Status')
-                for record in airtable_records
-            }
+            plan = self._plan_reverse(snapshot)
             
-            # Process each card
-            for card in trello_cards:
-                card_name = card.get('name', 'Unknown')
-                card_list_id = card.get('idList')
-                card_description = card.get('desc', '')
-                
-                # Extract linked Airtable ID
-                airtable_id = self.trello.extract_airtable_id_from_description(
-                    card_description
-                )
-                
-                if not airtable_id:
-                    continue
-                
-                # Check if this list triggers a status update
-                if card_list_id not in self.list_to_status_map:
-                    continue
-                
-                desired_status = self.list_to_status_map[card_list_id]
-                current_status = airtable_status_map.get(airtable_id)
-                
-                # IDEMPOTENCY: Only update if different
-                if current_status == desired_status:
-                    print(f"  ✓ Already {desired_status}: {card_name}")
-                    continue
-                
-                # Update Airtable
-                print(f"  ↻ Marking as {desired_status}: {card_name}")
-                self.airtable.update_record_status(
-                    record_id=airtable_id,
-                    status=desired_status
+        except Exception as e:
+            logger.error("✗ Trello → Airtable sync error: %s", e)
+            if standalone:
+                METRICS.finish_cycle(None, error=str(e))
+            return
+        
+        self._log_notes(plan)
+        METRICS.count_records("planned_operations", len(plan))
+        snapshot.record_plan("reverse", plan)
+        
+        status_updates, card_ids = self._status_updates_from_plan(plan)
+        if status_updates:
+            self._flush_status_updates(snapshot, status_updates, card_ids)
+        self._log_reverse_summary(snapshot)
+        
+        if standalone:
+            self._finish_cycle(snapshot)
+            self._advance_reverse_activity(snapshot)
+            METRICS.finish_cycle(snapshot.change_count)
+    
+    def _capture_trigger_list_snapshot(self):
+        """
+        Snapshot for a reverse pass run on its own.
+        
+        Only the lists that can trigger a status change are fetched (one
+        concurrent request per list), and their leads are looked up by ID,
+        so cards sitting in TODO are never downloaded. With
+        TRELLO_REVERSE_ACTIVITY_FILTER only cards active since the last
+        reverse pass (dateLastActivity) are considered.
+        
+        Returns:
+            SyncSnapshot, or None if a list couldn't be fetched
+        """
+        with METRICS.phase("trello_fetch"):
+            cards = self.trello.get_cards_in_lists(self.list_to_status_map)
+        if cards is None:
+            return None
+        METRICS.count_records("trello_cards", len(cards))
+        
+        changed_card_ids = {card.id for card in cards}
+        since = self.state.get(TRELLO_REVERSE_ACTIVITY_KEY)
+        if Config.TRELLO_REVERSE_ACTIVITY_FILTER and since:
+            since = _parse_timestamp(since)
+            changed_card_ids = {
+                card.id for card in cards
+                if card.last_activity
+                and _parse_timestamp(card.last_activity) >= since
+            } | self.retry_card_ids
+            logger.info("✓ %d of %d trigger-list cards active since last run",
+                        len(changed_card_ids), len(cards))
+        
+        # changed_card_ids is never None here: the index must not be
+        # rebuilt from a partial card listing
+        return self._capture_snapshot(
+            airtable_records=[],
+            trello_cards=cards,
+            known_statuses=self.record_status_cache,
+            airtable_is_full=False,
+            changed_card_ids=changed_card_ids
+        )
+    
+    def _advance_reverse_activity(self, snapshot):
+        """
+        Remember the newest card activity a standalone reverse pass has
+        handled (Trello's clock, not ours). Held back on failed writes.
+        """
+        if not Config.TRELLO_REVERSE_ACTIVITY_FILTER or snapshot.failed_card_ids:
+            return
+        
+        activity = [
+            _parse_timestamp(card.last_activity)
+            for card in snapshot.trello_cards
+            if card.last_activity
+        ]
+        if activity:
+            self.state.set(TRELLO_REVERSE_ACTIVITY_KEY, _format_timestamp(max(activity)))
+    
+    def _plan_reverse(self, snapshot, plan=None):
+        """
+        Plan the Airtable status changes the cards trigger.
+        
+        In incremental cycles the leads behind trigger-list cards that we
+        haven't seen yet are looked up first (cached for later cycles), so
+        the planner itself never has to call the API.
+        """
+        if not snapshot.airtable_is_full:
+            with METRICS.phase("airtable_fetch"):
+                snapshot.load_record_statuses(self.airtable, [
+                    snapshot.get_airtable_id(card.id)
+                    for card in snapshot.reverse_sync_candidates()
+                    if card.list_id in self.list_to_status_map
+                    and snapshot.get_airtable_id(card.id)
+                    and self.planner.owns_record(snapshot.get_airtable_id(card.id))
+                ])
+        
+        with METRICS.phase("plan"):
+            return self.planner.plan_reverse(snapshot, plan)
+    
+    def _status_updates_from_plan(self, plan):
+        """
+        Returns:
+            ({airtable_id: status}, {airtable_id: card_id}) for the plan's
+            set_status operations, ready for batched writes
+        """
+        status_updates = {}
+        card_ids = {}
+        for op in plan.status_operations():
+            status_updates[op.record_id] = op.status
+            card_ids[op.record_id] = op.card_id
+        return status_updates, card_ids
+    
+    def _status_update_slices(self, status_updates, slices=None):
+        """
+        Split queued status changes into one slice per worker (each slice is
+        still sent as 10-record batches), so several PATCHes are in flight.
+        """
+        slices = slices or self.writer.max_workers
+        items = list(status_updates.items())
+        slice_size = max(AIRTABLE_BATCH_SIZE, -(-len(items) // slices))
+        return [
+            dict(items[start:start + slice_size])
+            for start in range(0, len(items), slice_size)
+        ]
+    
+    def _flush_status_updates(self, snapshot, status_updates, card_ids):
+        """
+        Write queued status changes to Airtable in batches and patch the
+        snapshot / link index with the outcome.
+        """
+        with METRICS.phase("airtable_writes"):
+            writes = self._journal([
+                (
+                    next(iter(chunk)),
+                    self.airtable.update_records_status,
+                    {'statuses': chunk},
+                    {'record_ids': list(chunk)},
                 )
-                
-                time.sleep(0.5)  # Rate limiting
+                for chunk in self._status_update_slices(status_updates)
+            ])
+            for key, fn, kwargs, context in writes:
+                self.writer.submit(key, fn, context=context, **kwargs)
             
-        except Exception as e:
-            print(f"✗ Trello → Airtable sync error: {e}")
+            self._apply_status_writes(
+                snapshot, status_updates, card_ids, self.writer.drain()
+            )
+    
+    def _apply_status_writes(self, snapshot, status_updates, card_ids, operations):
+        """
+        Patch the snapshot / link index with the outcome of batched
+        status writes.
+        """
+        updated, failed = {}, {}
+        for operation in operations:
+            if operation.error:
+                logger.error("✗ Trello → Airtable batch update error: %s", operation.error)
+                failed.update(dict.fromkeys(operation.context['record_ids'], str(operation.error)))
+                continue
+            chunk_updated, chunk_failed = operation.result
+            updated.update(chunk_updated)
+            failed.update(chunk_failed)
+        
+        for airtable_id in updated:
+            snapshot.apply_record_status(airtable_id, status_updates[airtable_id])
+            self.link_index.set_status(airtable_id, status_updates[airtable_id])
+            card = snapshot.get_card(airtable_id)
+            self._record_propagation("trello_to_airtable", card and card.last_activity)
+        METRICS.count_records("status_writes", len(updated))
+        
+        # Failed cards are re-checked next cycle
+        for airtable_id in failed:
+            snapshot.failed_card_ids.add(card_ids[airtable_id])
+        
+        self.outbox.complete(operation.context.get('outbox_id') for operation in operations)
+    
+    def _apply_card_writes(self, snapshot, operations):
+        """
+        Apply drained card writes one by one and take them off the outbox.
+        
+        A write whose outcome can't be recorded (e.g. the link index is
+        locked) is logged and stays in the outbox for the next start to
+        replay; the writes after it are still applied.
+        
+        Returns:
+            Number of card writes that succeeded
+        """
+        succeeded = 0
+        applied = []
+        for operation in operations:
+            try:
+                if self._apply_card_write(snapshot, operation):
+                    succeeded += 1
+                applied.append(operation.context.get('outbox_id'))
+            except Exception as e:
+                logger.error("✗ Could not record the Trello write for %s: %s",
+                             operation.context.get('record_id'), e)
+                snapshot.failed_record_ids.add(operation.context.get('record_id'))
+        
+        self.outbox.complete(applied)
+        return succeeded
+    
+    def _apply_card_write(self, snapshot, operation):
+        """
+        Apply the outcome of a card create/update from the write pool.
+        
+        Runs on the main thread, so the snapshot is never touched by two
+        threads at once.
+        
+        Returns:
+            True if the write succeeded
+        """
+        context = operation.context
+        record_id = context['record_id']
+        
+        if not operation.ok:
+            if operation.error:
+                logger.error("✗ Trello write failed for %s: %s", record_id, operation.error)
+            snapshot.failed_record_ids.add(record_id)
+            if self.shards is not None and context['action'] == 'create':
+                self.shards.release_create(record_id)
+            return False
+        
+        if context['action'] == 'create':
+            card_id = operation.result.id
+            snapshot.apply_card_created(record_id, operation.result)
+            if self.shards is not None:
+                self.shards.complete_create(record_id, card_id)
+        else:
+            card_id = context['card_id']
+            snapshot.apply_card_updated(
+                card_id,
+                name=context['name'],
+                list_id=context['list_id'],
+                desc=operation.result.desc
+            )
+        
+        self.link_index.link(
+            record_id, card_id,
+            status=context['status'],
+            list_id=context['list_id'],
+            name=context['name'],
+            fingerprint=context['fingerprint'],
+            details_fingerprint=context.get('details_fingerprint')
+        )
+        METRICS.count_records("card_writes", 1)
+        self._record_propagation("airtable_to_trello", context.get('changed_at'))
+        return True
+    
+    def _capture_snapshot(self, trello_cards=None, **kwargs):
+        """
+        Build a SyncSnapshot whose card ↔ lead links come from the index.
+        
+        A full card listing (changed_card_ids is None) is also the moment
+        to rebuild the index from descriptions if it was missing or corrupt.
+        The listing raises on failure: an empty result from a failed call
+        would wipe the index and make every lead look card-less.
+        """
+        if kwargs.get('airtable_records') is None:
+            with METRICS.phase("airtable_fetch"):
+                kwargs['airtable_records'] = self.airtable.get_all_records()
+            METRICS.count_records("airtable_records", len(kwargs['airtable_records']))
+        if trello_cards is None:
+            with METRICS.phase("trello_fetch"):
+                trello_cards = self.trello.get_board_cards()
+            METRICS.count_records("trello_cards", len(trello_cards))
+        
+        # Link resolution: index lookups, the cards' own links as fallback
+        with METRICS.phase("parse"):
+            if self.link_index.needs_rebuild and kwargs.get('changed_card_ids') is None:
+                self.link_index.rebuild(trello_cards, self.trello.linked_airtable_id)
+                self._check_links_migrated(trello_cards)
+            
+            snapshot = SyncSnapshot.capture(
+                self.airtable,
+                self.trello,
+                trello_cards=trello_cards,
+                resolve_airtable_id=self._resolve_airtable_id,
+                **kwargs
+            )
+            self._track_newest_modified(snapshot, snapshot.airtable_records)
+        return snapshot
+    
+    def _check_links_migrated(self, trello_cards):
+        """
+        A board whose footer-linked cards all have the link field too
+        (e.g. every card was created in custom_field mode) needs no
+        migration: stop downloading descriptions from the next start.
+        """
+        if not self.trello.link_field_name or self.state.get(LINK_MIGRATED_KEY):
+            return
+        extract = self.trello.extract_airtable_id_from_description
+        if all(card.link or not extract(card.desc) for card in trello_cards):
+            self.state.set(LINK_MIGRATED_KEY, True)
+    
+    def _resolve_airtable_id(self, card):
+        """
+        Linked Airtable ID for a card: index first, then the card's link
+        field or description footer.
+        
+        Only cards the index doesn't know (e.g. made outside this sync) pay
+        for the footer parse, and they are added to the index once found.
+        """
+        airtable_id = self.link_index.get_record_id(card.id)
+        if airtable_id:
+            return airtable_id
+        
+        airtable_id = self.trello.linked_airtable_id(card)
+        if airtable_id:
+            self.link_index.link(
+                airtable_id, card.id,
+                list_id=card.list_id,
+                name=card.name
+            )
+        return airtable_id
+    
+    def _lookup_airtable_id(self, card):
+        """
+        Read-only _resolve_airtable_id (dry runs): index, then the card's
+        own link, without adding anything to the index.
+        """
+        return self.link_index.get_record_id(card.id) or self.trello.linked_airtable_id(card)
+    
+    def _is_unchanged(self, record_id, card, fingerprint):
+        """
+        True when the lead's synced fields match what we last pushed and the
+        card hasn't been changed on Trello since.
+        """
+        link = self.link_index.get(record_id)
+        return (
+            link is not None
+            and link['fingerprint'] == fingerprint
+            and link['card_id'] == card.id
+            and link['list_id'] == card.list_id
+            and link['name'] == card.name
+        )
+    
+    def _has_linked_card(self, record_id):
+        """
+        True when the index links the lead to a card (stops the planner
+        from creating a second one).
+        """
+        link = self.link_index.get(record_id)
+        return link is not None and bool(link['card_id'])
+    
+    def _details_changed(self, record_id, card, details_fingerprint):
+        """
+        True when the lead's email / source no longer match the details we
+        last wrote into its card description.
+        
+        Links from before details were tracked (or rebuilt from the board)
+        have no details fingerprint. For those the details block of the
+        card description itself is compared - descriptions are listed
+        while such links exist, so no API call is needed here (the planner
+        stays pure). A card with no generated block is adopted as in sync.
+        """
+        link = self.link_index.get(record_id)
+        if link is None:
+            return False
+        if link['details_fingerprint'] is not None:
+            return link['details_fingerprint'] != details_fingerprint
+        
+        details = self._parse_task_details(card.desc)
+        if details is None:
+            return False
+        return LinkIndex.details_fingerprint(*details) != details_fingerprint
     
     def _build_task_description(self, email, source, airtable_id):
         """
@@ -287,6 +1271,15 @@ class SyncService:
         ---METADATA---
         AIRTABLE_ID: rec123abc
         """
+        return self.trello.build_card_description_with_metadata(
+            content=self._build_task_details(email, source),
+            airtable_id=airtable_id
+        )
+    
+    def _build_task_details(self, email, source):
+        """
+        The lead details block of a task description (no footer).
+        """
         parts = []
         
         if email:
@@ -294,21 +1287,420 @@ class SyncService:
         if source:
             parts.append(f"Source: {source}")
         
-        content = "\n".join(parts) if parts else "No additional details"
+        return "\n".join(parts) if parts else "No additional details"
+    
+    def _parse_task_details(self, description):
+        """
+        (email, source) from the details block of a task description, or
+        None if the description has no generated block.
+        """
+        parts = self.trello.split_generated_description(description)
+        if parts is None:
+            return None
+        
+        fields = {}
+        for line in parts[1].split("\n"):
+            label, separator, value = line.partition(": ")
+            if separator:
+                fields[label] = value
+        return fields.get("Email", ""), fields.get("Source", "")
+    
+    def _fetch_airtable_records(self, full_scan=False):
+        """
+        Fetch the Airtable records for this cycle.
         
-        return self.trello.build_card_description_with_metadata(
-            content=content,
-            airtable_id=airtable_id
+        Incremental mode only asks for records modified since the stored
+        watermark (minus an overlap window for clock skew). A full scan runs
+        when incremental mode is off, on first start (no watermark yet) or
+        when explicitly requested.
+        
+        Returns:
+            (records, is_full) - is_full is False when records is a delta
+        """
+        if self._needs_full_airtable_scan(full_scan):
+            return self.airtable.get_all_records(), True
+        
+        watermark = self.state.get(AIRTABLE_WATERMARK_KEY)
+        since = _parse_timestamp(watermark) - timedelta(
+            seconds=Config.AIRTABLE_WATERMARK_OVERLAP_SECONDS
+        )
+        records = self.airtable.get_records_modified_since(
+            _format_timestamp(since),
+            Config.AIRTABLE_LAST_MODIFIED_FIELD
         )
+        return records, False
     
-    def run_sync_cycle(self):
+    def _needs_full_airtable_scan(self, full_scan=False):
+        """
+        True when this cycle has to read the whole Airtable table.
+        """
+        return (
+            not Config.AIRTABLE_INCREMENTAL
+            or full_scan
+            or not self.state.get(AIRTABLE_WATERMARK_KEY)
+        )
+    
+    def _advance_airtable_watermark(self, snapshot):
+        """
+        Move the watermark to the newest modification time we've synced.
+        
+        Uses Airtable's own timestamps (not our clock). Held back if any
+        write failed, so those records are fetched again next cycle.
+        """
+        if not Config.AIRTABLE_INCREMENTAL:
+            return
+        if not snapshot.forward_pass_complete or snapshot.failed_record_ids:
+            logger.warning("⚠ Airtable watermark held back (some records failed to sync)")
+            return
+        
+        newest = snapshot.newest_modified
+        if newest is None:
+            return
+        
+        current = self.state.get(AIRTABLE_WATERMARK_KEY)
+        if current and _parse_timestamp(current) >= newest:
+            return
+        
+        self.state.set(AIRTABLE_WATERMARK_KEY, _format_timestamp(newest))
+    
+    def _track_newest_modified(self, snapshot, records):
+        """
+        Keep the newest "Last modified" time of the synced records on the
+        snapshot (the next watermark), without holding on to the records.
+        """
+        if not Config.AIRTABLE_INCREMENTAL:
+            return
+        
+        for lead in records:
+            if not lead.modified:
+                continue
+            modified = _parse_timestamp(lead.modified)
+            if snapshot.newest_modified is None or modified > snapshot.newest_modified:
+                snapshot.newest_modified = modified
+    
+    def _record_changed_at(self, lead):
+        """
+        When a lead was last edited in Airtable (raw timestamp), or None.
+        Only known in incremental mode, where the field is fetched.
+        """
+        return lead.modified
+    
+    def _record_propagation(self, direction, changed_at):
+        """
+        Report how long a change took to reach the other system.
+        
+        Args:
+            changed_at: Source timestamp (Airtable "Last modified" or Trello
+                        dateLastActivity), or None if unknown
+        """
+        if changed_at:
+            METRICS.record_propagation(direction, _parse_timestamp(changed_at))
+    
+    def _fetch_trello_cards(self, full_scan=False):
+        """
+        Fetch the Trello cards for this cycle.
+        
+        Change-feed mode reads the board's actions since the stored cursor
+        and folds them into a card cache, so steady-state traffic grows with
+        the number of edits instead of the board size. The cache is seeded
+        by one full listing per process (it is what maps cards back to leads).
+        
+        Returns:
+            (cards, changed_card_ids) - changed_card_ids is None when every
+            card should be treated as changed (full listing)
+        
+        Raises:
+            requests.exceptions.RequestException if the listing fails (the
+            cycle is aborted rather than run against an empty board)
+        """
+        if not Config.TRELLO_CHANGE_FEED:
+            return self.trello.get_board_cards(), None
+        
+        cursor = self.state.get(TRELLO_ACTION_CURSOR_KEY)
+        if full_scan or not cursor:
+            return self._seed_card_cache(), None
+        
+        if self.card_cache is None and not self._load_card_cache():
+            return self._seed_card_cache(), None
+        
+        actions = self.trello.get_board_actions(since=cursor)
+        if actions is None:
+            # Feed unavailable - a full listing is always correct
+            return self._seed_card_cache(), None
+        
+        changes, removed_ids = self.trello.card_changes_from_actions(actions)
+        complete = self._apply_card_changes(changes, removed_ids)
+        
+        # Only move the cursor once every action has been applied
+        if actions and complete:
+            self.state.set(TRELLO_ACTION_CURSOR_KEY, actions[0]['id'])
+        
+        logger.info("✓ Trello change feed: %d actions, %d changed cards", len(actions), len(changes))
+        return list(self.card_cache.values()), set(changes) | self.retry_card_ids
+    
+    def _load_card_cache(self):
+        """
+        Restart: take the linked cards straight from the index, so no
+        listing (and no description download) is needed.
+        
+        Returns:
+            False if the index can't be trusted, or some links still need
+            their card descriptions for a details check (caller lists the
+            board)
+        """
+        if self.link_index.needs_rebuild or self.link_index.count_without_details():
+            return False
+        self.card_cache = self.link_index.cards()
+        return True
+    
+    def _apply_card_changes(self, changes, removed_ids):
+        """
+        Fold card changes (from the feed or webhooks) into the card cache
+        and the link index.
+        
+        Returns:
+            True if every change was applied (new cards could be fetched)
+        """
+        for card_id in removed_ids:
+            self.card_cache.pop(card_id, None)
+            self.link_index.remove_card(card_id)
+        
+        complete = True
+        for card_id, change in changes.items():
+            self.link_index.observe_card(
+                card_id,
+                name=change.get('name'),
+                list_id=change.get('idList')
+            )
+            
+            card = self.card_cache.get(card_id)
+            if card is not None:
+                card.apply_change(change)
+                continue
+            
+            # First time we see this card - fetch it once for its description
+            card = self.trello.get_card(card_id)
+            if card is None:
+                complete = False
+                continue
+            self.card_cache[card_id] = card
+        
+        return complete
+    
+    def _seed_card_cache(self):
+        """
+        Full board listing that (re)starts the change feed.
+        
+        The cursor is taken BEFORE listing, so edits made while we list are
+        replayed next cycle rather than lost. It is only saved once the
+        listing succeeded: a failed listing raises and leaves both the
+        cache and the cursor as they were, so the next cycle seeds again.
+        
+        Raises:
+            requests.exceptions.RequestException if the listing fails
+        """
+        latest = self.trello.get_board_actions(limit=1)
+        cards = self.trello.get_board_cards()
+        
+        self.card_cache = {card.id: card for card in cards}
+        if latest:
+            self.state.set(TRELLO_ACTION_CURSOR_KEY, latest[0]['id'])
+        
+        return cards
+    
+    def _finish_cycle(self, snapshot):
+        """
+        Carry cycle results over to the next cycle.
+        """
+        # Keep the change-feed cache in step with cards we created
+        if self.card_cache is not None:
+            for card in snapshot.trello_cards:
+                self.card_cache.setdefault(card.id, card)
+        self.retry_card_ids = snapshot.failed_card_ids
+    
+    def plan_cycle(self):
+        """
+        Dry run: the plan a full cycle would execute right now.
+        
+        Reads both systems in full (no watermark / change feed, so no
+        cursor moves) and sends no writes to either API. Local state is
+        left alone too: links are resolved read-only (no index rebuild,
+        nothing linked or marked migrated), so a dry run never changes
+        what the next real cycle does.
+        
+        Returns:
+            SyncPlan with the card operations followed by the status changes
+        
+        Raises:
+            requests.exceptions.RequestException if either read fails
+        """
+        # Raising reads: an outage must not look like "nothing to do"
+        airtable_records = [
+            lead for page in self.airtable.iter_record_pages() for lead in page
+        ]
+        snapshot = SyncSnapshot.capture(
+            self.airtable,
+            self.trello,
+            airtable_records=airtable_records,
+            trello_cards=self.trello.get_board_cards(),
+            resolve_airtable_id=self._lookup_airtable_id
+        )
+        
+        plan = self.planner.plan_forward(snapshot, airtable_records)
+        # Judged against where the cards will be after the card operations
+        return self.planner.plan_reverse(snapshot, plan)
+    
+    def sync_changes(self, card_actions=(), airtable_webhook_ids=()):
+        """
+        Targeted sync for webhook events (serve mode).
+        
+        Only the leads listed in the Airtable webhook payloads and the cards
+        touched by the Trello actions are synced. Cards come from the same
+        cache as the change feed, so no board listing or table scan is
+        needed per event.
+        
+        Args:
+            card_actions: Trello webhook actions, oldest first
+            airtable_webhook_ids: Airtable webhooks that pinged us
+        """
+        METRICS.start_cycle("webhook", self.pipeline.name)
+        try:
+            changed_card_ids = set()
+            if self.card_cache is None and not self._load_card_cache():
+                self._seed_card_cache()
+                changed_card_ids = None
+            
+            with METRICS.phase("trello_fetch"):
+                changes, removed_ids = self.trello.card_changes_from_actions(
+                    list(reversed(card_actions))
+                )
+                self._apply_card_changes(changes, removed_ids)
+            if changed_card_ids is not None:
+                changed_card_ids = set(changes) | self.retry_card_ids
+            
+            with METRICS.phase("airtable_fetch"):
+                record_ids, cursors = self._airtable_webhook_changes(airtable_webhook_ids)
+                airtable_records = (
+                    self.airtable.get_records_by_ids(sorted(record_ids)) if record_ids else []
+                )
+            METRICS.count_records("airtable_records", len(airtable_records))
+            
+            snapshot = self._capture_snapshot(
+                airtable_records=airtable_records,
+                trello_cards=list(self.card_cache.values()),
+                known_statuses=self.record_status_cache,
+                airtable_is_full=False,
+                changed_card_ids=changed_card_ids
+            )
+            self.sync_airtable_to_trello(snapshot)
+            self.sync_trello_to_airtable(snapshot)
+            self._finish_cycle(snapshot)
+            
+            # Failed leads keep their payloads for the next ping
+            if snapshot.forward_pass_complete and not snapshot.failed_record_ids:
+                for key, cursor in cursors.items():
+                    self.state.set(key, cursor)
+            
+            logger.info("✅ Synced %d leads / %d cards from webhooks", len(record_ids), len(changes))
+            METRICS.finish_cycle(snapshot.change_count)
+        except Exception as e:
+            logger.error("❌ Webhook sync error: %s", e)
+            METRICS.finish_cycle(None, error=str(e))
+    
+    def _airtable_webhook_changes(self, webhook_ids):
+        """
+        Record IDs created or changed since each webhook's stored cursor.
+        
+        Returns:
+            (record_ids, cursors) - cursors is {state_key: new_cursor},
+            saved by the caller once the records are synced
+        """
+        record_ids = set()
+        cursors = {}
+        
+        for webhook_id in webhook_ids:
+            key = f"{AIRTABLE_WEBHOOK_CURSOR_KEY}:{webhook_id}"
+            cursor = self.state.get(key)
+            
+            while True:
+                page = self.airtable.get_webhook_payloads(webhook_id, cursor)
+                if page is None:
+                    break
+                payloads, cursor, might_have_more = page
+                cursors[key] = cursor
+                
+                for payload in payloads:
+                    for table in payload.get('changedTablesById', {}).values():
+                        record_ids.update(table.get('createdRecordsById', {}))
+                        record_ids.update(table.get('changedRecordsById', {}))
+                
+                if not might_have_more:
+                    break
+        
+        return record_ids, cursors
+    
+    def run_sync_cycle(self, full_scan=False):
         """
         Execute one complete bi-directional sync cycle.
+        
+        Both directions share one snapshot, so each API is read once per
+        cycle instead of once per direction.
+        
+        Args:
+            full_scan: Ignore the incremental watermark and read every record
+        
+        Returns:
+            Number of changes the cycle found (None if the cycle failed)
         """
+        METRICS.start_cycle("poll", self.pipeline.name)
         try:
-            self.sync_airtable_to_trello()
-            self.sync_trello_to_airtable()
-            print("\n✅ Sync cycle completed\n")
+            full_scan = full_scan or self._shards_gained()
+            is_full = self._needs_full_airtable_scan(full_scan)
+            if is_full:
+                # A full read is authoritative - drop stale cached statuses
+                self.record_status_cache.clear()
+                # Streamed: pages are synced as they arrive, never all held.
+                # Only the wait for each page counts as fetch time.
+                airtable_records = []
+                record_pages = METRICS.timed_pages("airtable_fetch", self.airtable.iter_record_pages())
+            else:
+                with METRICS.phase("airtable_fetch"):
+                    airtable_records, _ = self._fetch_airtable_records(full_scan)
+                METRICS.count_records("airtable_records", len(airtable_records))
+                record_pages = None
+            
+            with METRICS.phase("trello_fetch"):
+                trello_cards, changed_card_ids = self._fetch_trello_cards(full_scan)
+            METRICS.count_records("trello_cards", len(trello_cards))
+            
+            snapshot = self._capture_snapshot(
+                airtable_records=airtable_records,
+                trello_cards=trello_cards,
+                known_statuses=self.record_status_cache,
+                airtable_is_full=is_full,
+                changed_card_ids=changed_card_ids
+            )
+            self.sync_airtable_to_trello(snapshot, record_pages=record_pages)
+            self._advance_airtable_watermark(snapshot)
+            self.sync_trello_to_airtable(snapshot)
+            self._finish_cycle(snapshot)
+            logger.info("✅ Sync cycle completed")
+            METRICS.finish_cycle(snapshot.change_count)
+            return snapshot.change_count
         except Exception as e:
-            print(f"\n❌ Sync cycle error: {e}\n")
+            logger.error("❌ Sync cycle error: %s", e)
+            METRICS.finish_cycle(None, error=str(e))
             # Log but don't crash - continue to next cycle
+            return None
+
+
+def _parse_timestamp(value):
+    """
+    Parse an Airtable ISO-8601 timestamp ("2024-01-31T12:00:00.000Z").
+    """
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _format_timestamp(value):
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + \
+        f"{value.microsecond // 1000:03d}Z"
@@ -0,0 +1,198 @@
+class SyncSnapshot:
+    """
+    Cycle-scoped view of both systems.
+
+    Fetches Airtable records and Trello cards ONCE per cycle and builds the
+    lookup maps both sync directions need. Writes made during the cycle are
+    patched back into the snapshot, so the reverse pass sees the forward
+    pass's effects without re-reading either API.
+    """
+
+    def __init__(self, airtable_records, trello_cards, resolve_airtable_id,
+                 known_statuses=None, airtable_is_full=True, changed_card_ids=None):
+        """
+        Args:
+            airtable_records: Leads to sync this cycle (all of them, or
+                              only the changed ones in incremental mode)
+            trello_cards: All Cards on the board
+            resolve_airtable_id: card -> linked Airtable ID (link index
+                                 lookup, falling back to the card's link
+                                 field or description footer)
+            known_statuses: {airtable_id: status} carried over from earlier
+                            cycles - updated in place
+            airtable_is_full: False when airtable_records is only a delta
+            changed_card_ids: Cards the Trello change feed reported since the
+                              last cycle (None = treat every card as changed)
+        """
+        self.airtable_records = airtable_records
+        self.trello_cards = trello_cards
+        self.airtable_is_full = airtable_is_full
+        self.changed_card_ids = changed_card_ids
+
+        # {airtable_id: status}
+        self.record_status_map = known_statuses if known_statuses is not None else {}
+        # IDs of the leads synced this cycle (kept even when the records
+        # themselves are streamed and dropped page by page)
+        self.cycle_record_ids = []
+        self._index_records(airtable_records)
+
+        # Newest "Last modified" time seen this cycle (set by SyncService)
+        self.newest_modified = None
+
+        # Records / cards whose write failed this cycle (retried next cycle)
+        self.failed_record_ids = set()
+        self.failed_card_ids = set()
+        self.forward_pass_complete = False
+
+        # Writes applied this cycle (cards created/updated, statuses set)
+        self.applied_changes = 0
+
+        # Totals of the cycle's plans per direction ("forward", "reverse"):
+        # operation kinds plus the planners' tallies - for the summary log
+        self.plan_totals = {"forward": {}, "reverse": {}}
+
+        # {airtable_id: trello_card} and the reverse {card_id: airtable_id}
+        # Links are resolved exactly once here, not once per direction.
+        self.card_by_airtable_id = {}
+        self.airtable_id_by_card_id = {}
+        for card in trello_cards:
+            airtable_id = resolve_airtable_id(card)
+            if airtable_id:
+                self.card_by_airtable_id[airtable_id] = card
+                self.airtable_id_by_card_id[card.id] = airtable_id
+
+    @classmethod
+    def capture(cls, airtable, trello, airtable_records=None, trello_cards=None,
+                resolve_airtable_id=None, **kwargs):
+        """
+        Fetch both sides once and build the snapshot.
+        
+        Pass airtable_records / trello_cards to reuse data that was already
+        fetched (e.g. an incremental delta or the change-feed card cache)
+        instead of reading everything again.
+        """
+        if airtable_records is None:
+            airtable_records = airtable.get_all_records()
+        if trello_cards is None:
+            trello_cards = trello.get_board_cards()
+        if resolve_airtable_id is None:
+            resolve_airtable_id = trello.linked_airtable_id
+        return cls(
+            airtable_records,
+            trello_cards,
+            resolve_airtable_id,
+            **kwargs
+        )
+
+    def reverse_sync_candidates(self):
+        """
+        Cards the Trello → Airtable pass needs to look at.
+        
+        Everything on a full read. With the change feed: cards that changed
+        on Trello, cards whose lead changed on Airtable this cycle, and cards
+        whose write failed last time (passed in via changed_card_ids).
+        """
+        if self.changed_card_ids is None:
+            return self.trello_cards
+
+        card_ids = set(self.changed_card_ids)
+        for record_id in self.cycle_record_ids:
+            card = self.card_by_airtable_id.get(record_id)
+            if card:
+                card_ids.add(card.id)
+
+        return [card for card in self.trello_cards if card.id in card_ids]
+
+    def add_airtable_records(self, records, keep=True):
+        """
+        Add records that arrived after the snapshot was built (e.g. the
+        next page of a streamed fetch).
+
+        Args:
+            keep: False to index the page (status, ID) without holding on
+                  to the records - memory then stays at one page
+        """
+        if keep:
+            self.airtable_records.extend(records)
+        self._index_records(records)
+
+    def _index_records(self, records):
+        for lead in records:
+            self.record_status_map[lead.id] = lead.status
+            self.cycle_record_ids.append(lead.id)
+
+    def get_card(self, airtable_id):
+        return self.card_by_airtable_id.get(airtable_id)
+
+    def get_airtable_id(self, card_id):
+        return self.airtable_id_by_card_id.get(card_id)
+
+    def get_record_status(self, airtable_id):
+        return self.record_status_map.get(airtable_id)
+
+    def has_record(self, airtable_id):
+        return airtable_id in self.record_status_map
+
+    def load_record_statuses(self, airtable, record_ids):
+        """
+        Fill in statuses for records that weren't part of an incremental
+        delta. Only IDs we have never seen are fetched.
+        """
+        missing = [
+            record_id for record_id in record_ids
+            if record_id not in self.record_status_map
+        ]
+        if not missing:
+            return
+
+        for lead in airtable.get_records_by_ids(missing):
+            self.record_status_map[lead.id] = lead.status
+
+    def apply_card_created(self, airtable_id, card):
+        """
+        Patch in a card we just created so later lookups find it.
+        """
+        self.trello_cards.append(card)
+        self.card_by_airtable_id[airtable_id] = card
+        self.airtable_id_by_card_id[card.id] = airtable_id
+        self.applied_changes += 1
+
+    def apply_card_updated(self, card_id, name=None, list_id=None, desc=None):
+        """
+        Patch a card we just updated. Card objects are shared between the
+        list and the lookup maps, so updating in place covers both.
+        """
+        self.applied_changes += 1
+        airtable_id = self.airtable_id_by_card_id.get(card_id)
+        card = self.card_by_airtable_id.get(airtable_id)
+        if card is None:
+            return
+
+        if name is not None:
+            card.name = name
+        if list_id is not None:
+            card.list_id = list_id
+        if desc is not None:
+            card.desc = desc
+
+    def apply_record_status(self, record_id, status):
+        """
+        Patch an Airtable record whose status we just changed.
+        """
+        self.record_status_map[record_id] = status
+        self.applied_changes += 1
+
+    def record_plan(self, direction, plan):
+        """
+        Add a plan (or one page's plan) to the direction's totals.
+        """
+        totals = self.plan_totals[direction]
+        for key, count in list(plan.counts().items()) + list(plan.tally.items()):
+            totals[key] = totals.get(key, 0) + count
+
+    @property
+    def change_count(self):
+        """
+        Changes this cycle found, whether the write succeeded or not.
+        """
+        return self.applied_changes + len(self.failed_record_ids) + len(self.failed_card_ids)
@@ -0,0 +1,56 @@
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SyncState:
+    """
+    Small JSON file that keeps sync cursors (watermarks etc.) across restarts.
+
+    Writes go to a temp file first and are then renamed over the real one,
+    so a crash mid-write never leaves a half-written state file behind.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._data = self._load()
+        # Cursors may be saved from several threads (e.g. async fetches)
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            # Corrupt state only costs us a full scan - don't crash over it
+            logger.warning("✗ Ignoring unreadable sync state %s: %s", self.path, e)
+            return {}
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def set(self, key, value):
+        """
+        Store a value and persist immediately.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._save()
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                del self._data[key]
+                self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,211 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+TRELLO_WEBHOOK_PATH = "/webhooks/trello"
+AIRTABLE_WEBHOOK_PATH = "/webhooks/airtable"
+
+# Webhook bodies are small; anything bigger is not a real notification
+MAX_BODY_BYTES = 1024 * 1024
+
+
+def verify_trello_signature(body, callback_url, secret, signature):
+    """
+    Trello signs base64(HMAC-SHA1(app secret, body + callback URL)).
+    """
+    if not signature:
+        return False
+    digest = hmac.new(
+        secret.encode('utf-8'),
+        body + callback_url.encode('utf-8'),
+        hashlib.sha1
+    ).digest()
+    return hmac.compare_digest(base64.b64encode(digest).decode('ascii'), signature)
+
+
+def verify_airtable_signature(body, mac_secret, signature):
+    """
+    Airtable signs "hmac-sha256=" + hex(HMAC-SHA256(macSecret, body)),
+    where the secret is handed out base64 encoded.
+    """
+    if not signature:
+        return False
+    digest = hmac.new(base64.b64decode(mac_secret), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(f"hmac-sha256={digest}", signature)
+
+
+class WebhookReceiver(ThreadingHTTPServer):
+    """
+    Small HTTP receiver for Trello and Airtable webhooks.
+
+    Requests are only validated and queued here - syncing happens on the
+    WebhookWorker, so webhook calls are answered right away (both APIs
+    disable webhooks that keep timing out).
+
+    Events put on the queue:
+        ("trello", action)        - one Trello board action
+        ("airtable", webhook_id)  - Airtable ping (payloads fetched later)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, events, public_url=None,
+                 trello_secret=None, airtable_mac_secret=None):
+        super().__init__(address, _WebhookHandler)
+        self.events = events
+        self.trello_callback_url = f"{public_url}{TRELLO_WEBHOOK_PATH}" if public_url else None
+        self.trello_secret = trello_secret
+        self.airtable_mac_secret = airtable_mac_secret
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+
+    def do_HEAD(self):
+        # Trello checks the callback URL with a HEAD before creating a webhook
+        self._reply(200 if self._enabled() else 404)
+
+    def do_POST(self):
+        if not self._enabled():
+            self._reply(404)
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self._reply(413)
+            return
+        body = self.rfile.read(length)
+
+        if self.path == TRELLO_WEBHOOK_PATH:
+            self._handle_trello(body)
+        else:
+            self._handle_airtable(body)
+
+    def _handle_trello(self, body):
+        server = self.server
+        if not verify_trello_signature(
+            body, server.trello_callback_url, server.trello_secret,
+            self.headers.get('X-Trello-Webhook')
+        ):
+            logger.warning("✗ Rejected Trello webhook with a bad signature")
+            self._reply(401)
+            return
+
+        try:
+            action = json.loads(body).get('action')
+        except ValueError:
+            self._reply(400)
+            return
+
+        if action:
+            server.events.put(("trello", action))
+        self._reply(200)
+
+    def _handle_airtable(self, body):
+        server = self.server
+        if not verify_airtable_signature(
+            body, server.airtable_mac_secret,
+            self.headers.get('X-Airtable-Content-MAC')
+        ):
+            logger.warning("✗ Rejected Airtable webhook with a bad signature")
+            self._reply(401)
+            return
+
+        try:
+            webhook_id = (json.loads(body).get('webhook') or {}).get('id')
+        except ValueError:
+            self._reply(400)
+            return
+
+        if webhook_id:
+            server.events.put(("airtable", webhook_id))
+        self._reply(200)
+
+    def _enabled(self):
+        # Each source is only accepted when its secret is configured
+        if self.path == TRELLO_WEBHOOK_PATH:
+            return bool(self.server.trello_secret)
+        if self.path == AIRTABLE_WEBHOOK_PATH:
+            return bool(self.server.airtable_mac_secret)
+        return False
+
+    def _reply(self, status):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        # Accepted events are logged by the worker; skip per-request lines
+        pass
+
+
+class WebhookWorker:
+    """
+    Drains the webhook queue and syncs only what changed.
+
+    Events are debounced: after the first event we keep collecting until
+    the queue has been quiet for `debounce` seconds (or `max_delay` has
+    passed), then sync the whole burst at once. A full reconcile cycle
+    runs on start and every `reconcile_interval` seconds as a safety net
+    for missed or dropped webhooks.
+    """
+
+    def __init__(self, events, sync_changes, reconcile,
+                 debounce, max_delay, reconcile_interval):
+        self.events = events
+        self.sync_changes = sync_changes
+        self.reconcile = reconcile
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.reconcile_interval = reconcile_interval
+
+    def run_forever(self):
+        next_reconcile = time.monotonic()
+
+        while True:
+            wait = next_reconcile - time.monotonic()
+            if wait <= 0:
+                logger.info("🔁 Reconcile cycle")
+                self.reconcile()
+                next_reconcile = time.monotonic() + self.reconcile_interval
+                continue
+
+            try:
+                event = self.events.get(timeout=wait)
+            except queue.Empty:
+                continue
+
+            self._dispatch(self._collect(event))
+
+    def _collect(self, first_event):
+        """
+        Gather the rest of a burst (debounce window, capped by max_delay).
+        """
+        batch = [first_event]
+        deadline = time.monotonic() + self.max_delay
+
+        while True:
+            timeout = min(self.debounce, deadline - time.monotonic())
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.events.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _dispatch(self, batch):
+        card_actions = [payload for source, payload in batch if source == "trello"]
+        # A ping only says "fetch payloads" - one fetch per webhook is enough
+        webhook_ids = sorted({payload for source, payload in batch if source == "airtable"})
+
+        logger.info("📨 %d webhook events (%d Trello, %d Airtable)",
+                    len(batch), len(card_actions), len(batch) - len(card_actions))
+        self.sync_changes(card_actions=card_actions, airtable_webhook_ids=webhook_ids)
@@ -0,0 +1,94 @@
+import contextvars
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+
+class WriteOperation:
+    """
+    One outbound mutation and, once drained, its outcome.
+    """
+
+    def __init__(self, key, context, future):
+        self.key = key
+        # Whatever the caller needs to apply the result (ids, names, ...)
+        self.context = context
+        self.future = future
+        self.result = None
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.error is None and bool(self.result)
+
+
+class WriteExecutor:
+    """
+    Bounded pool of worker threads for outbound API writes.
+
+    Each worker is a single-thread "lane"; writes are routed to a lane by
+    key (record or card ID), so writes to the same record/card always run
+    in submission order while different records go out in parallel. Rate
+    limits are enforced by the clients' shared limiters, which are
+    thread-safe, so workers simply block there when we hit the ceiling.
+    """
+
+    def __init__(self, max_workers, lanes=None):
+        self._lanes = lanes or [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sync-write-{i}")
+            for i in range(max(1, int(max_workers)))
+        ]
+        self.max_workers = len(self._lanes)
+        self._pending = []
+
+    def share(self):
+        """
+        Another executor on the same worker threads, with its own queue of
+        pending writes - drain() on it only waits for its own writes. Lets
+        several pipelines share one pool.
+        """
+        return WriteExecutor(self.max_workers, lanes=self._lanes)
+
+    def submit(self, key, fn, *args, context=None, **kwargs):
+        """
+        Queue fn(*args, **kwargs) on the lane that owns `key`.
+        """
+        # crc32 rather than hash(): stable across processes and runs
+        lane = self._lanes[zlib.crc32(str(key).encode('utf-8')) % self.max_workers]
+        # The worker runs in the caller's context (current cycle, pipeline)
+        future = lane.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        operation = WriteOperation(key, context or {}, future)
+        self._pending.append(operation)
+        return operation
+
+    def drain(self):
+        """
+        Wait for every queued write.
+
+        Returns:
+            The WriteOperations in submission order, with result / error
+            filled in. An exception in one write never hides the others.
+        """
+        # Only cleared once every write is done, so a drain interrupted by
+        # Ctrl+C can be called again
+        operations = self._pending
+
+        for operation in operations:
+            try:
+                operation.result = operation.future.result()
+            except Exception as e:
+                operation.error = e
+
+        self._pending = []
+        return operations
+
+    def cancel(self):
+        """
+        Cancel the queued writes that haven't started yet (e.g. on Ctrl+C).
+        The next drain() returns them with a CancelledError.
+        """
+        for operation in self._pending:
+            operation.future.cancel()
+
+    def shutdown(self):
+        for lane in self._lanes:
+            lane.shutdown(wait=True)
@@ -0,0 +1,47 @@
+import json
+
+import requests
+
+from clients.airtable_client import AirtableClient
+
+
+class FakeAirtableSession:
+    """
+    Answers multi-record PATCHes like Airtable: the whole batch is
+    rejected with a 422 if any of its records doesn't exist.
+    """
+
+    def __init__(self, existing):
+        self.existing = set(existing)
+        self.batches = []
+
+    def request(self, method, url, json=None, **kwargs):
+        records = json["records"]
+        self.batches.append([record["id"] for record in records])
+        if any(record["id"] not in self.existing for record in records):
+            return _response(url, 422, {"error": {"type": "ROW_DOES_NOT_EXIST"}})
+        return _response(url, 200, {"records": records})
+
+
+def _response(url, status_code, payload):
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = url
+    response._content = json.dumps(payload).encode("utf-8")
+    return response
+
+
+def test_one_bad_record_does_not_fail_its_batch():
+    good = [f"rec{i:014d}" for i in range(9)]
+    client = AirtableClient(base_id="appTest", table_name="Leads", api_key="patTest")
+    client.session = FakeAirtableSession(existing=good)
+
+    updated, failed = client.update_records_status(
+        {record_id: "QUALIFIED" for record_id in good + ["recDeleted0000000"]}
+    )
+
+    assert sorted(updated) == good
+    assert list(failed) == ["recDeleted0000000"]
+    # One batch, then each record once on its own - the rejected single
+    # record is not retried again
+    assert len(client.session.batches) == 11